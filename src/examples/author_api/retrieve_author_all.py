@@ -1,8 +1,9 @@
 """Retrieve information about an author using various retrievers.
 
 This script demonstrates the use of different retrievers from the scholar_retriever module
-to obtain information about an author. It utilizes the :class:`~scholar_retriever.AuthorInfoRetriever`, 
-:class:`~scholar_retriever.AuthorArticlesRetriever`and :class:`~scholar_retriever.CoAuthorsRetriever`
+to obtain information about an author. It utilizes the :class:`~scholar_retriever.AuthorRetriever`,
+which reads the author information and the articles from the same pages, and
+the :class:`~scholar_retriever.CoAuthorsRetriever`
 
 Usage:
 ------
@@ -20,23 +21,20 @@ python retrieve_author_all.py
 import json
 import scholar_retriever
 from scholar_retriever import (
-    AuthorInfoRetriever,
-    AuthorArticlesRetriever,
+    AuthorRetriever,
     CoAuthorsRetriever,
 )
 
 # Identifier of the author for which information is desired
 AUTHOR_IDENTIFIER = "M4l534gAAAAJ"
 
-# Create instances of retrievers for author information, publications, and co-authors
-author_info_retriever = AuthorInfoRetriever(AUTHOR_IDENTIFIER, "en")
-author_pub_retriever = AuthorArticlesRetriever( author_id=AUTHOR_IDENTIFIER)
+# Create instances of retrievers for author information with publications, and co-authors
+author_retriever = AuthorRetriever(AUTHOR_IDENTIFIER, "en")
 author_coauthor_retriever = CoAuthorsRetriever(AUTHOR_IDENTIFIER)
 
 # Combine all retrievers into a list
 author_retrievers: "list[scholar_retriever.author_retriever.AuthorBase]" = [
-    author_info_retriever,
-    author_pub_retriever,
+    author_retriever,
     author_coauthor_retriever,
 ]
 
@@ -0,0 +1,86 @@
+"""Differential check and timing of the fast article table extraction.
+
+This script runs :class:`~scholar_retriever.author_parser.AuthorArticlesParser`
+with and without ``fast_extraction`` over the bundled author page and over
+variants of it (articles without citations or year, entities and nested tags in
+titles, unexpected markup, 100 row pages). It fails if both engines do not
+return identical articles, reports which variants fell back to the tree parser
+and times both engines.
+
+Usage:
+------
+
+    1. Ensure you have the scholar_retriever module installed.
+    2. Run the script.
+
+Example usage:
+--------------
+
+python articles_fast_extraction.py
+
+"""
+
+import re
+import time
+
+from scholar_retriever import fast_extract
+from scholar_retriever.author_parser import AuthorArticlesParser
+from scholar_retriever.utils import html_test_author
+
+ROUNDS = 20
+
+PAGE = html_test_author.html_text
+
+ROW = re.compile(r'<tr class="gsc_a_tr">.*?</tr>', re.S)
+rows = ROW.findall(PAGE)
+first_row, last_row = rows[0], rows[-1]
+
+# 100 rows page, the size requested by the retrievers
+page_100 = PAGE.replace(last_row, last_row + "".join(rows[i % len(rows)] for i in range(100 - len(rows))))
+
+no_citations = re.sub(
+    r'<td class="gsc_a_c">.*?</td>',
+    '<td class="gsc_a_c"><a href="javascript:void(0)" class="gsc_a_ac gs_ibl gsc_a_acm"></a></td>',
+    PAGE,
+    count=1,
+)
+
+VARIANTS = {
+    "bundled page": PAGE,
+    "100 rows": page_100,
+    "no citations": no_citations,
+    "no year": re.sub(r'(<td class="gsc_a_y"><span class="[^"]*">)\d+(</span>)', r"\1\2", PAGE, count=1),
+    "entities and tags": PAGE.replace(
+        'class="gsc_a_at">The ATLAS', 'class="gsc_a_at"><b>R&amp;D</b> &lt;of&gt; The ATLAS', 1
+    ),
+    "unexpected markup": PAGE.replace(first_row, first_row.replace('<td class="gsc_a_t">', '<td class="gsc_a_t" dir="ltr">'), 1),
+    "comment in table": PAGE.replace('</a><div class="gs_gray">', '</a><!-- x --><div class="gs_gray">', 1),
+}
+
+
+def parse(html: bytes, fast: bool):
+    parser = AuthorArticlesParser(html, "utf-8")
+    parser.fast_extraction = fast
+    return parser.parse()
+
+
+def timed(html: bytes, fast: bool) -> float:
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        parse(html, fast)
+    return (time.perf_counter() - start) / ROUNDS * 1000
+
+
+if __name__ == "__main__":
+    print(f"{'variant':<20} {'engine':<8} {'rows':>5} {'tree (ms)':>10} {'fast (ms)':>10}")
+    for name, page in VARIANTS.items():
+        html = page.encode("utf-8")
+        expected = parse(html, fast=False)
+        got = parse(html, fast=True)
+        if got != expected:
+            raise AssertionError(f"fast extraction differs from the tree parser on '{name}'")
+
+        engine = "fast" if fast_extract.article_rows(page) is not None else "fallback"
+        print(
+            f"{name:<20} {engine:<8} {len(expected):>5} {timed(html, False):>10.2f} {timed(html, True):>10.2f}"
+        )
@@ -0,0 +1,119 @@
+"""Citation metrics of a batch of authors: Python loops against NumPy arrays.
+
+This script generates ``AUTHORS`` synthetic authors shaped like the output of
+the retrievers (articles with ``cited_by.value`` and ``year``, and a
+``cited_by.graph``), then computes the h-index, the i10-index, the total
+citations, the h-index of the articles published since ``SINCE`` and the
+per-year citation deltas and growth rates, once with plain loops over the dicts
+and once with :mod:`scholar_retriever.analytics`. It checks that both give the
+same values and reports the time of each, with the time spent building the
+arrays reported separately.
+
+Usage:
+------
+
+    1. Ensure you have the scholar_retriever module and numpy installed
+       (``pip install scholar_retriever[analytics]``).
+    2. Optionally modify the constants `AUTHORS` and `SINCE`.
+    3. Run the script.
+
+Example usage:
+--------------
+
+python citation_metrics.py
+
+"""
+
+import random
+import time
+
+import numpy as np
+
+from scholar_retriever.analytics import ArticleBatch, GraphBatch
+
+AUTHORS = 100000
+SINCE = 2015
+
+
+def make_authors(n: int, seed: int = 0):
+    rnd = random.Random(seed)
+    authors = []
+    graphs = []
+    for _ in range(n):
+        articles = [
+            {
+                "cited_by": {"value": int(rnd.paretovariate(1.2)) - 1},
+                "year": str(rnd.randint(1990, 2024)) if rnd.random() > 0.05 else "",
+            }
+            for _ in range(rnd.randint(0, 60))
+        ]
+        first = rnd.randint(2000, 2020)
+        graph = [
+            {"year": year, "citations": rnd.randint(0, 500)}
+            for year in range(first, 2025)
+        ]
+        authors.append(articles)
+        graphs.append(graph)
+    return authors, graphs
+
+
+def naive(authors, graphs):
+    h_index, i10, totals, h_since, deltas, growth = [], [], [], [], [], []
+    for articles, graph in zip(authors, graphs):
+        cites = sorted((a["cited_by"]["value"] for a in articles), reverse=True)
+        h_index.append(sum(1 for i, c in enumerate(cites, 1) if c >= i))
+        i10.append(sum(1 for c in cites if c >= 10))
+        totals.append(sum(cites))
+
+        recent = sorted(
+            (a["cited_by"]["value"] for a in articles if a["year"] and int(a["year"]) >= SINCE),
+            reverse=True,
+        )
+        h_since.append(sum(1 for i, c in enumerate(recent, 1) if c >= i))
+
+        values = [p["citations"] for p in graph]
+        d = [b - a for a, b in zip(values, values[1:])]
+        deltas.append(d)
+        growth.append([x / a if a else float("nan") for x, a in zip(d, values)])
+    return h_index, i10, totals, h_since, deltas, growth
+
+
+def main() -> None:
+    print(f"generating {AUTHORS} authors...")
+    authors, graphs = make_authors(AUTHORS)
+    print(f"{sum(len(a) for a in authors)} articles")
+
+    start = time.perf_counter()
+    h_index, i10, totals, h_since, deltas, growth = naive(authors, graphs)
+    t_naive = time.perf_counter() - start
+
+    start = time.perf_counter()
+    articles = ArticleBatch.from_authors(authors)
+    graph_batch = GraphBatch.from_graphs(graphs)
+    t_build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    metrics = articles.metrics()
+    v_since = articles.window(SINCE).h_index()
+    v_deltas = graph_batch.deltas()
+    v_growth = graph_batch.growth_rates()
+    t_vector = time.perf_counter() - start
+
+    assert metrics["h_index"].tolist() == h_index
+    assert metrics["i10_index"].tolist() == i10
+    assert metrics["citations"].tolist() == totals
+    assert v_since.tolist() == h_since
+    # the graphs of the batch are aligned on the last year, compare the tails
+    for k in range(0, AUTHORS, max(1, AUTHORS // 1000)):
+        n = len(deltas[k])
+        if n:
+            assert v_deltas[k, -n:].tolist() == deltas[k]
+            assert np.allclose(v_growth[k, -n:], growth[k], equal_nan=True)
+
+    print(f"loops over dicts:      {t_naive:8.3f} s")
+    print(f"building the arrays:   {t_build:8.3f} s")
+    print(f"vectorized metrics:    {t_vector:8.3f} s  ({t_naive / t_vector:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
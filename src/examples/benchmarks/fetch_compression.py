@@ -0,0 +1,126 @@
+"""Bytes on the wire and end-to-end latency with and without compression.
+
+This script starts a local HTTP server that answers like Google Scholar with
+the bundled test pages, honouring the ``Accept-Encoding`` header of each
+request (gzip, deflate and, when the ``brotli`` package is installed, br). It
+then fetches and parses every page type with the retrievers, once negotiating
+compression (the default) and once forcing ``identity``, and reports the mean
+bytes on the wire and the mean latency per page type.
+
+Usage:
+------
+
+    1. Ensure you have the scholar_retriever module installed.
+    2. Optionally modify the constant `ROUNDS`.
+    3. Run the script.
+
+Example usage:
+--------------
+
+python fetch_compression.py
+
+"""
+
+import gzip
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from scholar_retriever import AuthorArticlesRetriever, AuthorInfoRetriever, ProfileSearch
+from scholar_retriever.utils import html_test, html_test_author
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ROUNDS = 50
+
+PAGES = {
+    "author": html_test_author.html_text.encode("utf-8"),
+    "search": html_test.html_text.encode("utf-8"),
+}
+
+ENCODERS = {
+    "gzip": gzip.compress,
+    "deflate": zlib.compress,
+}
+if brotli is not None:
+    ENCODERS["br"] = brotli.compress
+
+# compress once, so the server cost does not blur the client latency
+ENCODED = {
+    (page, coding): encode(body)
+    for page, body in PAGES.items()
+    for coding, encode in ENCODERS.items()
+}
+
+
+class ScholarPageHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        params = parse_qs(urlparse(self.path).query)
+        page = "search" if params.get("view_op") == ["search_authors"] else "author"
+        body = PAGES[page]
+
+        accepted = [e.strip() for e in self.headers.get("Accept-Encoding", "").split(",")]
+        coding = next((e for e in ("br", "gzip", "deflate") if e in accepted and e in ENCODERS), None)
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        if coding is not None:
+            body = ENCODED[(page, coding)]
+            self.send_header("Content-Encoding", coding)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def run_page_type(make_retriever, fetch, accept_encoding):
+    wire_bytes = 0
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        retriever = make_retriever()
+        retriever.ACCEPT_ENCODING = accept_encoding
+        success, reason = fetch(retriever)
+        if not success:
+            raise RuntimeError(reason)
+        wire_bytes += retriever.wire_bytes
+    elapsed = time.perf_counter() - start
+    return wire_bytes / ROUNDS, elapsed / ROUNDS * 1000
+
+
+if __name__ == "__main__":
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ScholarPageHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    endpoint = f"http://127.0.0.1:{server.server_port}/citations"
+
+    def with_endpoint(cls, *args):
+        def make():
+            retriever = cls(*args)
+            retriever.URL_ENDPOINT = endpoint
+            return retriever
+        return make
+
+    page_types = {
+        "author info": (with_endpoint(AuthorInfoRetriever, "0YLthRAAAAAJ"), lambda r: r.fetch()),
+        "author articles": (
+            with_endpoint(AuthorArticlesRetriever, "0YLthRAAAAAJ"),
+            lambda r: r.fetch_citations(num=20),
+        ),
+        "profile search": (with_endpoint(ProfileSearch), lambda r: r.search_by_author("mike")),
+    }
+
+    print(f"Negotiated encodings: {AuthorInfoRetriever.ACCEPT_ENCODING}")
+    print(f"{'page type':<16} {'encoding':<10} {'wire bytes':>12} {'latency (ms)':>14}")
+    for name, (make, fetch) in page_types.items():
+        for accept_encoding in (AuthorInfoRetriever.ACCEPT_ENCODING, "identity"):
+            wire, latency = run_page_type(make, fetch, accept_encoding)
+            label = "identity" if accept_encoding == "identity" else "negotiated"
+            print(f"{name:<16} {label:<10} {wire:>12.0f} {latency:>14.2f}")
+
+    server.shutdown()
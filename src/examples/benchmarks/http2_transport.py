@@ -0,0 +1,177 @@
+"""Throughput and connections of the HTTP/1.1 and HTTP/2 transports.
+
+This script sends ``JOBS`` requests of co-author lists on ``THREADS`` threads
+straight through ``transport.request``, twice: with the default
+:class:`~scholar_retriever.transport.RequestsTransport` against a
+:class:`~scholar_retriever.utils.mock_server.MockScholarServer`, and with
+:class:`~scholar_retriever.transport.HTTP2Transport` against a cleartext HTTP/2
+stand-in server (built with ``h2``) that answers the same pages. No retriever
+and no parser is involved, so the figures are those of the connections:
+opening them, reusing them and multiplexing the requests over them. Both
+servers add ``LATENCY`` seconds to every answer. It reports the requests per
+second, the median request time and the connections accepted by each server.
+
+Usage:
+------
+
+    1. Ensure you have the scholar_retriever module installed with HTTP/2
+       support (``pip install scholar_retriever[http2]``).
+    2. Optionally modify the constants `JOBS`, `THREADS` and `LATENCY`.
+    3. Run the script.
+
+Example usage:
+--------------
+
+python http2_transport.py
+
+"""
+
+import asyncio
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Tuple
+
+from h2.config import H2Configuration
+from h2.connection import H2Connection
+from h2.events import ConnectionTerminated, RequestReceived, StreamReset, WindowUpdated
+
+from scholar_retriever.transport import HTTP2Transport, RequestsTransport
+from scholar_retriever.utils.mock_server import MockScholarServer, synthetic_author_id
+from scholar_retriever.utils.tools import HttpHeadersTemplate
+
+JOBS = 1000
+THREADS = 64
+LATENCY = 0.05
+
+REQUEST_ARGS = {"headers": {"Accept-Encoding": HttpHeadersTemplate.ACCEPT_ENCODING}, "timeout": (10.0, 30.0)}
+
+
+class H2Protocol(asyncio.Protocol):
+    """
+    One HTTP/2 connection of the stand-in server.
+    """
+
+    def __init__(self, server: "H2StandIn") -> None:
+        self.server = server
+        self.conn = H2Connection(config=H2Configuration(client_side=False))
+        self.windows = {}
+
+    def connection_made(self, transport) -> None:
+        self.server.connections += 1
+        self.transport = transport
+        self.conn.initiate_connection()
+        self.transport.write(self.conn.data_to_send())
+
+    def data_received(self, data: bytes) -> None:
+        for event in self.conn.receive_data(data):
+            if isinstance(event, RequestReceived):
+                headers = dict(event.headers)
+                asyncio.ensure_future(self.respond(event.stream_id, headers[b":path"].decode()))
+            elif isinstance(event, WindowUpdated):
+                for waiter in self.windows.values():
+                    waiter.set()
+            elif isinstance(event, StreamReset):
+                self.windows.pop(event.stream_id, None)
+            elif isinstance(event, ConnectionTerminated):
+                self.transport.close()
+        self.transport.write(self.conn.data_to_send())
+
+    async def respond(self, stream_id: int, path: str) -> None:
+        await asyncio.sleep(LATENCY)
+        status, body = self.server.mock.synthesize(path)
+        self.conn.send_headers(
+            stream_id,
+            [
+                (":status", str(status)),
+                ("content-type", "text/html; charset=utf-8"),
+                ("content-length", str(len(body))),
+            ],
+        )
+
+        # send the body as the flow control windows allow
+        waiter = self.windows[stream_id] = asyncio.Event()
+        while body:
+            size = min(
+                self.conn.local_flow_control_window(stream_id),
+                self.conn.max_outbound_frame_size,
+                len(body),
+            )
+            if size <= 0:
+                waiter.clear()
+                self.transport.write(self.conn.data_to_send())
+                await waiter.wait()
+                continue
+            self.conn.send_data(stream_id, body[:size], end_stream=size == len(body))
+            body = body[size:]
+            self.transport.write(self.conn.data_to_send())
+        self.windows.pop(stream_id, None)
+
+
+class H2StandIn(object):
+    """
+    A cleartext (prior knowledge) HTTP/2 server answering the pages of a mock server.
+    """
+
+    def __init__(self, mock: MockScholarServer) -> None:
+        self.mock = mock
+        self.connections = 0
+        self.loop = asyncio.new_event_loop()
+        self.server = self.loop.run_until_complete(
+            self.loop.create_server(lambda: H2Protocol(self), "127.0.0.1", 0)
+        )
+        self.port = self.server.sockets[0].getsockname()[1]
+        threading.Thread(target=self.loop.run_forever, daemon=True).start()
+
+    @property
+    def endpoint(self) -> str:
+        return f"http://127.0.0.1:{self.port}/citations"
+
+    def stop(self) -> None:
+        self.loop.call_soon_threadsafe(self.server.close)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+
+def run(endpoint: str, transport) -> Tuple[float, float]:
+    """
+    Send the requests and return the requests per second and the median
+    request time in milliseconds.
+    """
+
+    def job(n: int) -> float:
+        params = {"view_op": "list_colleagues", "hl": "en", "user": synthetic_author_id(n)}
+        start = time.perf_counter()
+        resp = transport.request(endpoint, params, REQUEST_ARGS)
+        elapsed = time.perf_counter() - start
+        assert resp.status_code == 200 and resp.content
+        return elapsed
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=THREADS) as pool:
+        times = list(pool.map(job, range(JOBS)))
+    elapsed = time.perf_counter() - start
+    return JOBS / elapsed, statistics.median(times) * 1000
+
+
+def main() -> None:
+    with MockScholarServer(latency=LATENCY) as http1:
+        rate, median = run(http1.endpoint, RequestsTransport())
+        print(
+            f"HTTP/1.1 requests: {rate:7.1f} requests/s  median {median:6.1f} ms  "
+            f"{http1.stats()['connections']:4d} connections"
+        )
+
+    h2 = H2StandIn(MockScholarServer())
+    transport = HTTP2Transport(max_connections=2, http1=False)
+    try:
+        rate, median = run(h2.endpoint, transport)
+        print(f"HTTP/2 httpx:      {rate:7.1f} requests/s  median {median:6.1f} ms  {h2.connections:4d} connections")
+    finally:
+        transport.close()
+        h2.stop()
+        h2.mock.stop()
+
+
+if __name__ == "__main__":
+    main()
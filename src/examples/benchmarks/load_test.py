@@ -0,0 +1,180 @@
+"""End-to-end throughput of every retriever at several concurrency levels.
+
+This script starts a :class:`~scholar_retriever.utils.mock_server.MockScholarServer`
+(or targets the endpoint given with ``--endpoint``) and, for every retriever
+and every concurrency level, runs ``--jobs`` fetches on a thread pool. Every
+job uses a different author id, so concurrent jobs are real requests and not
+collapsed by the single-flight table. It reports jobs per second, the median
+and 95th percentile latency of a job and the failed jobs.
+
+The mock server can inject latency, ``500`` errors and ``429`` answers, or
+replay responses recorded from Google Scholar with ``--mode record``.
+``--operation-timeout`` bounds every job (see
+:attr:`~scholar_retriever.scholar_retriever.ScholarWebRetriever.operation_timeout`).
+
+Usage:
+------
+
+    1. Ensure you have the scholar_retriever module installed.
+    2. Run the script, see ``--help`` for the options.
+
+Example usage:
+--------------
+
+python load_test.py --latency 0.05 --jitter 0.05 --throttle-rate 0.01 --concurrency 1 4 16
+
+python load_test.py --mode record --record-dir recorded --retrievers author_info --jobs 5 --concurrency 1
+
+python load_test.py --mode replay --record-dir recorded --retrievers author_info
+
+"""
+
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Tuple
+
+from scholar_retriever import (
+    ArticleDetailRetriever,
+    AuthorArticlesRetriever,
+    AuthorInfoRetriever,
+    AuthorRetriever,
+    CitingArticlesRetriever,
+    CoAuthorsRetriever,
+    ProfileSearch,
+)
+from scholar_retriever.scholar_retriever import ScholarWebRetriever
+from scholar_retriever.utils.mock_server import MockScholarServer, synthetic_author_id
+
+
+def _author_job(cls) -> Callable[[str, int], bool]:
+    def job(endpoint: str, n: int) -> bool:
+        retriever = cls(synthetic_author_id(n))
+        retriever.URL_ENDPOINT = endpoint
+        success, _ = retriever.fetch()
+        return success
+
+    return job
+
+
+def _search_job(endpoint: str, n: int) -> bool:
+    search = ProfileSearch()
+    search.URL_ENDPOINT = endpoint
+    success, _ = search.search_by_organization(str(n))
+    if not success:
+        return False
+    for _ in search.iter_pages():
+        pass
+    return True
+
+
+def _citing_job(endpoint: str, n: int) -> bool:
+    retriever = CitingArticlesRetriever(str(n))
+    # the lists of results live next to /citations, in /scholar
+    retriever.URL_ENDPOINT = endpoint.rsplit("/", 1)[0] + "/scholar"
+    success, _ = retriever.fetch(prefetch=2)
+    return success
+
+
+def _article_detail_job(endpoint: str, n: int) -> bool:
+    retriever = ArticleDetailRetriever(f"{synthetic_author_id(n)}:{n % 100:012d}")
+    retriever.URL_ENDPOINT = endpoint
+    success, _ = retriever.fetch()
+    return success
+
+
+JOBS: Dict[str, Callable[[str, int], bool]] = {
+    "author_info": _author_job(AuthorInfoRetriever),
+    "author_articles": _author_job(AuthorArticlesRetriever),
+    "author": _author_job(AuthorRetriever),
+    "coauthors": _author_job(CoAuthorsRetriever),
+    "profile_search": _search_job,
+    "citing_articles": _citing_job,
+    "article_detail": _article_detail_job,
+}
+
+
+def run_level(
+    job: Callable[[str, int], bool], endpoint: str, concurrency: int, jobs: int, first_id: int
+) -> Tuple[float, List[float], int]:
+    """
+    Run ``jobs`` jobs on ``concurrency`` threads.
+
+    :return: Wall time, latency of every job and number of failed jobs.
+    """
+    def timed(n: int) -> Tuple[float, bool]:
+        start = time.perf_counter()
+        try:
+            success = job(endpoint, n)
+        except Exception:
+            success = False
+        return time.perf_counter() - start, success
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(timed, range(first_id, first_id + jobs)))
+    wall = time.perf_counter() - start
+
+    latencies = [r[0] for r in results]
+    failures = sum(1 for r in results if not r[1])
+    return wall, latencies, failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--endpoint", help="Target this endpoint instead of a local mock server.")
+    parser.add_argument("--retrievers", nargs="+", choices=sorted(JOBS), default=sorted(JOBS))
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 2, 4, 8, 16])
+    parser.add_argument("--jobs", type=int, default=64, help="Jobs per retriever and level.")
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--captcha-rate", type=float, default=0.0)
+    parser.add_argument("--mode", choices=["synthetic", "record", "replay"], default="synthetic")
+    parser.add_argument("--record-dir")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--operation-timeout", type=float, help="Seconds a job may take.")
+    args = parser.parse_args()
+
+    ScholarWebRetriever.operation_timeout = args.operation_timeout
+
+    server = None
+    endpoint = args.endpoint
+    if endpoint is None:
+        server = MockScholarServer(
+            latency=args.latency,
+            jitter=args.jitter,
+            error_rate=args.error_rate,
+            throttle_rate=args.throttle_rate,
+            captcha_rate=args.captcha_rate,
+            mode=args.mode,
+            record_dir=args.record_dir,
+            seed=args.seed,
+        ).start()
+        endpoint = server.endpoint
+
+    print(f"{'retriever':<16} {'threads':>7} {'jobs/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'failed':>6}")
+    try:
+        for name in args.retrievers:
+            for level, concurrency in enumerate(args.concurrency):
+                # replayed runs must request the same ids as the recorded one
+                first_id = 0 if args.mode != "synthetic" else level * args.jobs
+                wall, latencies, failures = run_level(
+                    JOBS[name], endpoint, concurrency, args.jobs, first_id
+                )
+                latencies.sort()
+                p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+                print(
+                    f"{name:<16} {concurrency:>7} {args.jobs / wall:>8.1f} "
+                    f"{statistics.median(latencies) * 1e3:>8.1f} {p95 * 1e3:>8.1f} {failures:>6}"
+                )
+    finally:
+        if server is not None:
+            print("server answers:", server.stats())
+            server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""Steady-state memory of a long crawl, with and without ``low_memory``.
+
+This script simulates a batch worker: it creates one retriever per author
+(author information, articles and co-authors in turn, plus a profile search
+page every few authors), fetches it and keeps the last ``--window`` retrievers
+alive, as a worker holding its recent results would. Pages are built by
+:class:`~scholar_retriever.utils.mock_server.MockScholarServer` and answered in
+process by :class:`~scholar_retriever.utils.mock_server.MockTransport`, without
+a socket, so only the client side is measured.
+
+The regression check, a short crawl whose steady state must not grow, is
+``tests/test_low_memory.py``. This script is the longer benchmark, with peak
+and steady-state figures for larger windows.
+
+Memory is traced with ``tracemalloc``. The script fails (exit status 1) if the
+peak of the ``low_memory`` crawl is above ``--cap-mb``; the steady state is
+sampled every ``--sample`` pages once the window is full. With ``--compare`` it
+first runs the same crawl in the default mode, for reference.
+
+The default crawl (100 pages, 40 retrievers alive) takes about ten seconds.
+``--full`` runs the long one: 10000 pages with 500 retrievers alive, which
+takes about twenty minutes under ``tracemalloc``.
+
+Usage:
+------
+
+    1. Ensure you have the scholar_retriever module installed.
+    2. Run the script.
+
+Example usage:
+--------------
+
+python low_memory_crawl.py
+
+python low_memory_crawl.py --compare
+
+python low_memory_crawl.py --full
+
+"""
+
+import argparse
+import gc
+import sys
+import time
+import tracemalloc
+from collections import deque
+from typing import List, Tuple
+
+from scholar_retriever import (
+    AuthorArticlesRetriever,
+    AuthorInfoRetriever,
+    CoAuthorsRetriever,
+    ProfileSearch,
+)
+from scholar_retriever.author_parser import ParserBase
+from scholar_retriever.scholar_retriever import ScholarWebRetriever
+from scholar_retriever.utils.mock_server import MockScholarServer, MockTransport, synthetic_author_id
+
+DEFAULTS = {"pages": 100, "window": 40, "sample": 20, "cap_mb": 13.5}
+FULL = {"pages": 10000, "window": 500, "sample": 500, "cap_mb": 45.0}
+
+
+def crawl(pages: int, window: int, sample: int) -> Tuple[float, List[float]]:
+    """
+    Crawl ``pages`` pages and return the peak of traced memory (MB) and the
+    traced memory (MB) of every steady-state sample.
+    """
+    server = MockScholarServer(articles_per_author=20, coauthors_per_author=10, search_pages=3)
+    transport = MockTransport(server)
+    ScholarWebRetriever.transport = transport
+
+    alive = deque(maxlen=window)
+    samples = []
+    next_sample = None
+    n = 0
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        while transport.requests < pages:
+            if n % 10 == 9:
+                retriever = ProfileSearch()
+                success, _ = retriever.search_by_organization(str(n))
+                for _ in retriever.iter_pages(prefetch=1):
+                    pass
+            else:
+                cls = (AuthorInfoRetriever, AuthorArticlesRetriever, CoAuthorsRetriever)[n % 3]
+                retriever = cls(synthetic_author_id(n))
+                success, _ = retriever.fetch()
+            if not success:
+                raise RuntimeError(f"fetch {n} failed")
+
+            alive.append(retriever)
+            n += 1
+
+            if len(alive) == window and next_sample is None:
+                next_sample = transport.requests
+            if next_sample is not None and transport.requests >= next_sample:
+                samples.append(tracemalloc.get_traced_memory()[0] / 2**20)
+                next_sample += sample
+        peak = tracemalloc.get_traced_memory()[1] / 2**20
+    finally:
+        tracemalloc.stop()
+        server.stop()
+
+    return peak, samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--full", action="store_true", help="Run the long crawl.")
+    parser.add_argument("--pages", type=int, help=f"Defaults to {DEFAULTS['pages']} ({FULL['pages']} with --full).")
+    parser.add_argument(
+        "--window", type=int, help=f"Retrievers kept alive. Defaults to {DEFAULTS['window']} ({FULL['window']} with --full)."
+    )
+    parser.add_argument(
+        "--sample", type=int, help=f"Pages between samples. Defaults to {DEFAULTS['sample']} ({FULL['sample']} with --full)."
+    )
+    parser.add_argument(
+        "--cap-mb",
+        type=float,
+        help=f"Bound of the peak memory in low_memory mode. Defaults to {DEFAULTS['cap_mb']} ({FULL['cap_mb']} with --full).",
+    )
+    parser.add_argument("--compare", action="store_true", help="Also run in the default mode.")
+    args = parser.parse_args()
+    for name, value in (FULL if args.full else DEFAULTS).items():
+        if getattr(args, name) is None:
+            setattr(args, name, value)
+
+    modes = [False, True] if args.compare else [True]
+    failed = False
+
+    for low_memory in modes:
+        ScholarWebRetriever.low_memory = low_memory
+        ParserBase.low_memory = low_memory
+
+        start = time.perf_counter()
+        peak, samples = crawl(args.pages, args.window, args.sample)
+        elapsed = time.perf_counter() - start
+
+        name = "low_memory" if low_memory else "default"
+        if not samples:
+            print(f"{name}: the window never filled, use more --pages or a smaller --window")
+            failed = True
+            continue
+
+        print(
+            f"{name:<10} pages={args.pages} window={args.window} time={elapsed:.1f}s "
+            f"peak={peak:.1f} MB steady state: min={min(samples):.1f} MB "
+            f"max={max(samples):.1f} MB last={samples[-1]:.1f} MB"
+        )
+        if low_memory and peak > args.cap_mb:
+            print(f"FAIL: the peak of {peak:.1f} MB is above the cap of {args.cap_mb} MB")
+            failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Latency of interactive lookups during a bulk crawl, with and without the scheduler.
+
+This script keeps ``CRAWLERS`` threads fetching pages of articles with
+:class:`~scholar_retriever.AuthorArticlesRetriever` (set to the ``batch`` class) against a
+:class:`~scholar_retriever.utils.mock_server.MockScholarServer`, while one
+thread runs ``LOOKUPS`` :class:`~scholar_retriever.AuthorInfoRetriever` lookups
+(set to the ``interactive`` class) one after the other. Every request also waits for a
+shared rate limiter of ``RATE`` requests per second, like a real crawl would.
+It reports the latency of the lookups and the authors the crawl fetched, first
+with no scheduler and then with a
+:class:`~scholar_retriever.utils.concurrency.PriorityScheduler` of ``SLOTS`` slots.
+
+Usage:
+------
+
+    1. Ensure you have the scholar_retriever module installed.
+    2. Optionally modify the constants `CRAWLERS`, `LOOKUPS`, `SLOTS`, `RATE` and `LATENCY`.
+    3. Run the script.
+
+Example usage:
+--------------
+
+python priority_scheduler.py
+
+"""
+
+import statistics
+import threading
+import time
+
+from scholar_retriever import AuthorArticlesRetriever, AuthorInfoRetriever
+from scholar_retriever.scholar_retriever import ScholarWebRetriever
+from scholar_retriever.utils.concurrency import PriorityScheduler, RateLimiter
+from scholar_retriever.utils.mock_server import MockScholarServer, synthetic_author_id
+
+CRAWLERS = 32
+LOOKUPS = 40
+SLOTS = 8
+RATE = 100.0
+LATENCY = 0.05
+
+
+def run(endpoint: str) -> None:
+    stop = threading.Event()
+    crawled = [0]
+
+    def crawl(worker: int) -> None:
+        n = worker
+        while not stop.is_set():
+            retriever = AuthorArticlesRetriever(synthetic_author_id(n))
+            retriever.URL_ENDPOINT = endpoint
+            retriever.priority = "batch"
+            retriever.page_size = 20
+            if retriever.fetch()[0]:
+                crawled[0] += 1
+            n += CRAWLERS
+
+    crawlers = [threading.Thread(target=crawl, args=(i,)) for i in range(CRAWLERS)]
+    for t in crawlers:
+        t.start()
+    time.sleep(1.0)
+
+    latencies = []
+    start = time.perf_counter()
+    for n in range(LOOKUPS):
+        retriever = AuthorInfoRetriever(synthetic_author_id(100000 + n))
+        retriever.URL_ENDPOINT = endpoint
+        retriever.priority = "interactive"
+        t0 = time.perf_counter()
+        assert retriever.fetch()[0]
+        latencies.append((time.perf_counter() - t0) * 1000)
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    for t in crawlers:
+        t.join()
+
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(
+        f"  lookups p50 {statistics.median(latencies):7.1f} ms  p95 {p95:7.1f} ms"
+        f"  crawl {crawled[0] / (elapsed + 1.0):6.1f} authors/s"
+    )
+
+
+def main() -> None:
+    ScholarWebRetriever.rate_limiter = RateLimiter(RATE, burst=SLOTS)
+    with MockScholarServer(latency=LATENCY, articles_per_author=20) as server:
+        print("no scheduler")
+        run(server.endpoint)
+
+        ScholarWebRetriever.scheduler = PriorityScheduler(max_concurrency=SLOTS)
+        print(f"PriorityScheduler({SLOTS} slots)")
+        run(server.endpoint)
+        for name, stats in ScholarWebRetriever.scheduler.stats().items():
+            print(f"  {name:12s} admitted {stats['admitted']:6d}  mean wait {stats['mean_wait'] * 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
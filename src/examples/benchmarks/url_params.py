@@ -0,0 +1,83 @@
+"""Benchmark of the GET parameter extraction of UrlUtilities.
+
+This script builds ``URLS`` synthetic Google Scholar urls (article, cited by,
+co-author and pagination links, with ``DISTINCT`` different urls so repeated
+urls exercise the memoization) and compares:
+
+- the previous implementation, ``parse_qs(urlparse(url).query)``;
+- ``UrlUtilities.url_extract_get_param`` without its cache (first sight of every url);
+- ``UrlUtilities.url_extract_get_param`` with its cache;
+- ``UrlUtilities.url_extract_get_param_many`` extracting two keys at once.
+
+Usage:
+------
+
+    1. Ensure you have the scholar_retriever module installed.
+    2. Optionally modify the constants `URLS` and `DISTINCT`.
+    3. Run the script.
+
+Example usage:
+--------------
+
+python url_params.py
+
+"""
+
+import random
+import string
+import time
+from urllib.parse import parse_qs, urlparse
+
+from scholar_retriever.utils import tools
+from scholar_retriever.utils.tools import UrlUtilities
+
+URLS = 1_000_000
+DISTINCT = 20_000
+
+
+def random_id(n=12):
+    return "".join(random.choice(string.ascii_letters + string.digits + "-_") for _ in range(n))
+
+
+def make_url():
+    kind = random.randrange(4)
+    user = random_id()
+    if kind == 0:
+        return ("https://scholar.google.com/citations?view_op=view_citation&hl=en"
+                f"&user={user}&citation_for_view={user}:{random_id()}", "citation_for_view")
+    if kind == 1:
+        cites = ",".join(str(random.getrandbits(63)) for _ in range(random.randint(1, 3)))
+        return f"https://scholar.google.com/scholar?oi=bibs&hl=en&cites={cites}", "cites"
+    if kind == 2:
+        return f"https://scholar.google.com/citations?hl=en&user={user}", "user"
+    return ("https://scholar.google.com/citations?view_op=search_authors&hl=en&mauthors=label:x"
+            f"&after_author={random_id()}&astart={random.randrange(1000)}", "after_author")
+
+
+def old_extract(url, param):
+    p = parse_qs(urlparse(url).query).get(param)
+    return p[0] if p is not None else None
+
+
+def run(label, fn, urls):
+    start = time.perf_counter()
+    for url, param in urls:
+        fn(url, param)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed:>8.2f} s {elapsed / len(urls) * 1e9:>8.0f} ns/url")
+
+
+if __name__ == "__main__":
+    random.seed(0)
+    distinct = [make_url() for _ in range(DISTINCT)]
+    urls = [random.choice(distinct) for _ in range(URLS)]
+
+    for url, param in distinct[:1000]:
+        assert old_extract(url, param) == UrlUtilities.url_extract_get_param(url, param)
+
+    print(f"{URLS} urls, {DISTINCT} distinct")
+    run("parse_qs + urlparse", old_extract, urls)
+    run("fast, uncached", tools._extract_get_param.__wrapped__, urls)
+    tools._extract_get_param.cache_clear()
+    run("fast, memoized", UrlUtilities.url_extract_get_param, urls)
+    run("bulk, two keys", lambda u, p: UrlUtilities.url_extract_get_param_many(u, (p, "hl")), urls)
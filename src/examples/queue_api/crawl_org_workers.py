@@ -0,0 +1,103 @@
+"""Share the crawl of one organization between several worker processes.
+
+This script uses a :class:`~scholar_retriever.work_queue.SQLiteWorkQueue` to
+distribute the pages of an organization listing and the authors found on them
+between ``WORKERS`` processes. Every author is fetched only once, even when the
+script is started again or on several nodes sharing the queue file.
+
+Usage:
+------
+
+    1. Ensure you have the scholar_retriever module installed.
+    2. Modify the constants `ORGANIZATION_ID` and `WORKERS`.
+    3. Optionally set `ENDPOINT` to a local stand-in server for testing.
+    4. Run the script.
+
+Example usage:
+--------------
+
+python crawl_org_workers.py
+
+"""
+
+import json
+import os
+from multiprocessing import Process
+
+from scholar_retriever import AuthorInfoRetriever, ProfileSearch
+from scholar_retriever.work_queue import QueueWorker, SQLiteWorkQueue, TaskKind
+
+# Universitat Politècnica de València
+ORGANIZATION_ID = "13086801797746034500"
+
+WORKERS = 4
+QUEUE_PATH = "crawl_queue.sqlite"
+OUTPUT_DIR = "authors"
+
+# e.g. "http://127.0.0.1:8000/citations" to crawl a local stand-in server
+ENDPOINT = None
+
+
+def handle_org_page(queue, task):
+    org_id, _, after_author = task.key.partition(":")
+
+    search = ProfileSearch()
+    if ENDPOINT is not None:
+        search.URL_ENDPOINT = ENDPOINT
+
+    success, reason = search.search_by_organization(
+        org_id, after_author=after_author or None
+    )
+    if not success:
+        return success, reason
+
+    results = search.get_json()
+    queue.put_many(TaskKind.AUTHOR, [p["author_id"] for p in results["profiles"]])
+
+    token = results["pagination"].get("next_page_token")
+    if token is not None:
+        queue.put(TaskKind.ORG_PAGE, f"{org_id}:{token}")
+
+    return True, "Success"
+
+
+def handle_author(queue, task):
+    retriever = AuthorInfoRetriever(task.key)
+    retriever.priority = "batch"
+    if ENDPOINT is not None:
+        retriever.URL_ENDPOINT = ENDPOINT
+
+    success, reason = retriever.fetch()
+    if not success:
+        return success, reason
+
+    with open(os.path.join(OUTPUT_DIR, f"{task.key}.json"), "w") as f_out:
+        f_out.write(json.dumps(retriever.get_json(), ensure_ascii=False, indent=2))
+
+    return True, "Success"
+
+
+def worker():
+    queue = SQLiteWorkQueue(QUEUE_PATH)
+    QueueWorker(
+        queue,
+        {
+            TaskKind.ORG_PAGE: handle_org_page,
+            TaskKind.AUTHOR: handle_author,
+        },
+    ).run()
+
+
+if __name__ == "__main__":
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+
+    # Seed the crawl. Does nothing if the organization was already queued.
+    SQLiteWorkQueue(QUEUE_PATH).put(TaskKind.ORG_PAGE, ORGANIZATION_ID)
+
+    processes = [Process(target=worker) for _ in range(WORKERS)]
+    for p in processes:
+        p.start()
+    for p in processes:
+        p.join()
+
+    print(SQLiteWorkQueue(QUEUE_PATH).stats())
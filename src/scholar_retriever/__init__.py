@@ -9,10 +9,12 @@
 from .profile_search import ProfileSearch
 from .author_retriever import (
     AuthorInfoRetriever,
+    AuthorRetriever,
     CoAuthorsRetriever,
     AuthorArticlesRetriever,
     ArticlesOrder,
 )
+from .article_retriever import ArticleDetailRetriever, CitingArticlesRetriever
 
 
 VERSION = "0.1.0"
@@ -22,7 +24,10 @@ __version__ = VERSION
 __all__ = [
     "ProfileSearch",
     "AuthorInfoRetriever",
+    "AuthorRetriever",
     "AuthorArticlesRetriever",
     "CoAuthorsRetriever",
     "ArticlesOrder",
+    "CitingArticlesRetriever",
+    "ArticleDetailRetriever",
 ]
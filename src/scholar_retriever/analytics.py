@@ -0,0 +1,342 @@
+"""Citation metrics computed with NumPy over one author or large batches of authors.
+
+The articles of :class:`~scholar_retriever.author_retriever.AuthorArticlesRetriever`
+are turned into flat arrays of citation counts and publication years (one
+segment per author, as in a CSR matrix) and the ``cited_by.graph`` of
+:class:`~scholar_retriever.author_retriever.AuthorInfoRetriever` into a dense
+authors x years matrix. Every metric is then computed for all the authors at
+once, without Python loops::
+
+    from scholar_retriever.analytics import ArticleBatch, GraphBatch
+
+    articles = ArticleBatch.from_authors(r.get_json()["publications"] for r in retrievers)
+    articles.h_index()                      # one value per author
+    articles.window(2019).h_index()         # only articles published since 2019
+
+    graphs = GraphBatch.from_graphs(info["cited_by"]["graph"] for info in infos)
+    graphs.deltas(), graphs.growth_rates(), graphs.window_sums(3)
+
+Google Scholar only gives the total citations of every article, so windowed
+article metrics select articles by publication year. Citations received in a
+period come from the graph (:meth:`GraphBatch.since`).
+
+NumPy is an optional dependency: ``pip install scholar_retriever[analytics]``.
+"""
+
+from typing import Any, Dict, Iterable, List
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ImportError(
+            "scholar_retriever.analytics needs numpy: pip install scholar_retriever[analytics]"
+        )
+
+
+def _year(value: Any) -> int:
+    """
+    Publication year of an article, 0 if unknown.
+    """
+    if isinstance(value, int):
+        return value
+    value = str(value).strip()
+    return int(value) if value.isdigit() else 0
+
+
+class ArticleBatch(object):
+    """
+    Citation counts and publication years of the articles of several authors.
+
+    The articles of author ``i`` are ``citations[offsets[i]:offsets[i + 1]]``.
+    """
+
+    def __init__(self, citations: "np.ndarray", years: "np.ndarray", offsets: "np.ndarray") -> None:
+        """
+        Initialize the ArticleBatch object.
+
+        :param citations: Citations of every article.
+        :type citations: numpy.ndarray
+        :param years: Publication year of every article, 0 if unknown.
+        :type years: numpy.ndarray
+        :param offsets: Start of the articles of every author, plus the total (``n_authors + 1`` values).
+        :type offsets: numpy.ndarray
+        """
+        _require_numpy()
+        self.citations = np.asarray(citations, dtype=np.int64)
+        self.years = np.asarray(years, dtype=np.int32)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self._owner_cache = None
+
+    @classmethod
+    def from_authors(cls, authors: Iterable[List[Dict[str, Any]]]) -> "ArticleBatch":
+        """
+        Build the arrays from the articles of every author.
+
+        :param authors: For every author, a list of articles as returned in
+            ``AuthorArticlesRetriever.get_json()['publications']``.
+        :type authors: Iterable[List[Dict[str, Any]]]
+        """
+        _require_numpy()
+        citations: List[int] = []
+        years: List[Any] = []
+        offsets = [0]
+        for articles in authors:
+            citations.extend([art["cited_by"]["value"] or 0 for art in articles])
+            years.extend([art["year"] for art in articles])
+            offsets.append(len(citations))
+
+        # few distinct years: convert each one once
+        year_values = {y: _year(y) for y in set(years)}
+        years = [year_values[y] for y in years]
+
+        return cls(
+            np.array(citations, dtype=np.int64),
+            np.array(years, dtype=np.int32),
+            np.array(offsets, dtype=np.int64),
+        )
+
+    @classmethod
+    def from_articles(cls, articles: List[Dict[str, Any]]) -> "ArticleBatch":
+        """
+        A batch with the articles of a single author.
+        """
+        return cls.from_authors([articles])
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def _owner(self) -> "np.ndarray":
+        """
+        Index of the author of every article.
+        """
+        if self._owner_cache is None:
+            self._owner_cache = np.repeat(np.arange(len(self), dtype=np.int64), np.diff(self.offsets))
+        return self._owner_cache
+
+    def window(self, start: int = None, end: int = None) -> "ArticleBatch":
+        """
+        The articles published from ``start`` to ``end`` (both included).
+
+        Articles of unknown year are dropped when a bound is given.
+
+        :param start: First year. Defaults to no bound.
+        :type start: int, optional
+        :param end: Last year. Defaults to no bound.
+        :type end: int, optional
+        """
+        mask = np.ones(len(self.years), dtype=bool)
+        if start is not None:
+            mask &= self.years >= start
+        if end is not None:
+            mask &= (self.years <= end) & (self.years > 0)
+
+        counts = np.bincount(self._owner()[mask], minlength=len(self))
+        offsets = np.zeros(len(self) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        return ArticleBatch(self.citations[mask], self.years[mask], offsets)
+
+    def total_citations(self) -> "np.ndarray":
+        """
+        Sum of the citations of the articles of every author.
+        """
+        return np.bincount(self._owner(), weights=self.citations, minlength=len(self)).astype(np.int64)
+
+    def article_count(self) -> "np.ndarray":
+        """
+        Number of articles of every author.
+        """
+        return np.diff(self.offsets)
+
+    def h_index(self) -> "np.ndarray":
+        """
+        h-index of every author: the largest h such that h articles have at
+        least h citations each.
+        """
+        owner = self._owner()
+        # one sort by author, then by citations descending: the author in the
+        # high bits and the complement of the (clipped) citations in the low bits
+        low = np.int64(2**32 - 1)
+        keys = (owner << 32) | (low - np.minimum(self.citations, low))
+        keys.sort()
+        ranked = low - (keys & low)
+        rank = np.arange(1, len(ranked) + 1, dtype=np.int64) - self.offsets[owner]
+        return np.bincount(owner, weights=ranked >= rank, minlength=len(self)).astype(np.int64)
+
+    def i10_index(self) -> "np.ndarray":
+        """
+        i10-index of every author: the number of articles with at least 10 citations.
+        """
+        return np.bincount(
+            self._owner(), weights=self.citations >= 10, minlength=len(self)
+        ).astype(np.int64)
+
+    def metrics(self) -> Dict[str, "np.ndarray"]:
+        """
+        ``citations``, ``h_index``, ``i10_index`` and ``articles`` of every author.
+        """
+        return {
+            "citations": self.total_citations(),
+            "h_index": self.h_index(),
+            "i10_index": self.i10_index(),
+            "articles": self.article_count(),
+        }
+
+
+class GraphBatch(object):
+    """
+    Citations per year of several authors, as a dense authors x years matrix.
+
+    Years missing from the graph of an author count as 0 citations.
+    """
+
+    def __init__(self, years: "np.ndarray", citations: "np.ndarray") -> None:
+        """
+        Initialize the GraphBatch object.
+
+        :param years: Consecutive years of the columns.
+        :type years: numpy.ndarray
+        :param citations: Matrix of citations, one row per author and one column per year.
+        :type citations: numpy.ndarray
+        """
+        _require_numpy()
+        self.years = np.asarray(years, dtype=np.int32)
+        self.citations = np.asarray(citations, dtype=np.int64)
+
+    @classmethod
+    def from_graphs(cls, graphs: Iterable[List[Dict[str, int]]]) -> "GraphBatch":
+        """
+        Build the matrix from the ``cited_by.graph`` of every author.
+
+        :param graphs: For every author, a list of ``{'year': ..., 'citations': ...}``
+            as returned in ``AuthorInfoRetriever.get_json()['cited_by']['graph']``.
+        :type graphs: Iterable[List[Dict[str, int]]]
+        """
+        _require_numpy()
+        rows: List[int] = []
+        years: List[int] = []
+        values: List[int] = []
+        n = 0
+        for n, graph in enumerate(graphs, start=1):
+            for point in graph or []:
+                rows.append(n - 1)
+                years.append(point["year"])
+                values.append(point["citations"])
+
+        if not years:
+            return cls(np.zeros(0, dtype=np.int32), np.zeros((n, 0), dtype=np.int64))
+
+        years_arr = np.array(years, dtype=np.int32)
+        first = int(years_arr.min())
+        matrix = np.zeros((n, int(years_arr.max()) - first + 1), dtype=np.int64)
+        matrix[np.array(rows), years_arr - first] = values
+        return cls(np.arange(first, first + matrix.shape[1], dtype=np.int32), matrix)
+
+    @classmethod
+    def from_graph(cls, graph: List[Dict[str, int]]) -> "GraphBatch":
+        """
+        A batch with the graph of a single author.
+        """
+        return cls.from_graphs([graph])
+
+    def __len__(self) -> int:
+        return self.citations.shape[0]
+
+    def deltas(self) -> "np.ndarray":
+        """
+        Change of the citations of every author from one year to the next.
+
+        Column ``j`` is the change from ``years[j]`` to ``years[j + 1]``.
+        """
+        return np.diff(self.citations, axis=1)
+
+    def growth_rates(self) -> "np.ndarray":
+        """
+        :meth:`deltas` relative to the citations of the previous year. NaN
+        where the previous year had no citations.
+        """
+        previous = self.citations[:, :-1].astype(np.float64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rates = self.deltas() / previous
+        rates[previous == 0] = np.nan
+        return rates
+
+    def window_sums(self, width: int) -> "np.ndarray":
+        """
+        Citations of every author over the last ``width`` years, ending in each year.
+
+        Column ``j`` sums ``years[j - width + 1]`` to ``years[j]``; earlier
+        years are taken as 0.
+        """
+        cumulative = np.zeros((len(self), self.citations.shape[1] + 1), dtype=np.int64)
+        np.cumsum(self.citations, axis=1, out=cumulative[:, 1:])
+        start = np.maximum(np.arange(1, cumulative.shape[1]) - width, 0)
+        return cumulative[:, 1:] - cumulative[:, start]
+
+    def since(self, year: int) -> "np.ndarray":
+        """
+        Citations of every author from ``year`` on.
+        """
+        return self.citations[:, self.years >= year].sum(axis=1)
+
+    def total(self) -> "np.ndarray":
+        """
+        Citations of every author over all the years of the graph.
+        """
+        return self.citations.sum(axis=1)
+
+
+def author_metrics(
+    articles: List[Dict[str, Any]], graph: List[Dict[str, int]] = None, since: int = None
+) -> Dict[str, Any]:
+    """
+    Metrics of a single author.
+
+    :param articles: The articles, as in ``AuthorArticlesRetriever.get_json()['publications']``.
+    :type articles: List[Dict[str, Any]]
+    :param graph: The citations per year, as in ``AuthorInfoRetriever.get_json()['cited_by']['graph']``. Defaults to None.
+    :type graph: List[Dict[str, int]], optional
+    :param since: Also compute the metrics of the articles published since this year
+        (and, with a graph, the citations received since it). Defaults to None.
+    :type since: int, optional
+    :return: ``citations``, ``h_index``, ``i10_index`` and ``articles``, plus
+        ``since`` with the same keys and, with a graph, ``years``, ``deltas``
+        and ``growth_rates``.
+    :rtype: dict
+    """
+    batch = ArticleBatch.from_articles(articles)
+    ret: Dict[str, Any] = {k: int(v[0]) for k, v in batch.metrics().items()}
+
+    if since is not None:
+        ret["since"] = {k: int(v[0]) for k, v in batch.window(since).metrics().items()}
+
+    if graph is not None:
+        graphs = GraphBatch.from_graph(graph)
+        ret["years"] = graphs.years.tolist()
+        ret["deltas"] = graphs.deltas()[0].tolist()
+        ret["growth_rates"] = graphs.growth_rates()[0].tolist()
+        if since is not None:
+            ret["since"]["graph_citations"] = int(graphs.since(since)[0])
+
+    return ret
+
+
+def h_index(citations: Iterable[int]) -> int:
+    """
+    h-index of a list of citation counts.
+    """
+    _require_numpy()
+    ranked = np.sort(np.fromiter(citations, dtype=np.int64))[::-1]
+    return int(np.count_nonzero(ranked >= np.arange(1, len(ranked) + 1)))
+
+
+def i10_index(citations: Iterable[int]) -> int:
+    """
+    Number of citation counts of at least 10.
+    """
+    _require_numpy()
+    return int(np.count_nonzero(np.fromiter(citations, dtype=np.int64) >= 10))
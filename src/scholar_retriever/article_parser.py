@@ -0,0 +1,253 @@
+"""Parsers of the Google Scholar article pages.
+
+:class:`CitingArticlesParser` parses a page of the result list of
+``scholar?cites=<cites_id>``: the articles that cite an article.
+:class:`ArticleDetailParser` parses the page of one article of a profile
+(``citations?view_op=view_citation&citation_for_view=<citation_id>``).
+"""
+
+import re
+from typing import Any, Dict, List, Union
+
+from bs4 import Tag
+
+from .author_parser import ParserBase
+from .utils.tools import NumberUtilities, UrlUtilities
+
+SCHOLAR_URL_BASE = 'https://scholar.google.com'
+
+_YEAR = re.compile(r'(?<!\d)(1[5-9]\d\d|20\d\d)(?!\d)')
+
+
+def _absolute(link: Union[str, None]) -> Union[str, None]:
+    if link and link.startswith('/'):
+        return SCHOLAR_URL_BASE + link
+    return link
+
+
+class CitingArticlesParser(ParserBase):
+    """
+    Parse a page of results of ``scholar?cites=<cites_id>``.
+
+    ``parse()`` returns ``{'total': ..., 'articles': [...], 'next_start': ...}``:
+    the number of results announced by the page (None if it is not shown), the
+    results of the page and the ``start`` of the next page (None on the last one).
+    """
+
+    def __init__(self, html: Union[str, bytes] = '', encoding: str = None) -> None:
+        super().__init__(html, encoding)
+
+    @staticmethod
+    def _parse_byline(byline: str) -> Dict[str, Any]:
+        # "A Author, B Author - Journal, 2020 - publisher.org"
+        parts = [p.strip() for p in byline.replace('\xa0', ' ').split(' - ')]
+        m = _YEAR.search(parts[1]) if len(parts) > 1 else None
+        return {
+            'authors': parts[0],
+            'publication': parts[1] if len(parts) > 1 else '',
+            'source': parts[2] if len(parts) > 2 else '',
+            'year': m.group(1) if m else '',
+        }
+
+    def _parse_one_result(self, res: Tag) -> Dict[str, Any]:
+
+        #### title ####
+        title_bs = res.find('h3', class_='gs_rt')
+        link = None
+        kind = None
+        title = ''
+        if title_bs is not None:
+            # [PDF], [BOOK], [CITATION]...
+            kind_bs = title_bs.find('span', class_=['gs_ctc', 'gs_ctu'])
+            if kind_bs is not None:
+                kind = kind_bs.text.strip('[] ')
+            anchor = title_bs.find('a')
+            if anchor is not None:
+                link = anchor.get('href')
+                title = anchor.text.strip()
+            else:
+                title = title_bs.text.replace(kind_bs.text if kind_bs is not None else '', '', 1).strip()
+
+        #### authors, publication, year ####
+        byline_bs = res.find('div', class_='gs_a')
+        byline = self._parse_byline(byline_bs.text if byline_bs is not None else '')
+        year = byline['year']
+        if self.typed_numbers:
+            year = NumberUtilities.parse_int(year)
+
+        snippet_bs = res.find('div', class_='gs_rs')
+
+        #### full text ####
+        full_text = res.find('div', class_='gs_or_ggsm')
+        full_text_link = None
+        if full_text is not None and full_text.find('a') is not None:
+            full_text_link = full_text.find('a').get('href')
+
+        #### cited_by and versions ####
+        cby_value, cby_link, cites_id = 0, None, None
+        versions_value, cluster_id = 0, None
+        footer = res.find('div', class_='gs_flb') or res.find('div', class_='gs_fl')
+        if footer is not None:
+            for a in footer.find_all('a', href=True):
+                href = a['href']
+                if 'cites=' in href:
+                    cby_value = NumberUtilities.parse_int(a.text) or 0
+                    cby_link = _absolute(href)
+                    cites_id = UrlUtilities.url_extract_get_param(cby_link, 'cites')
+                elif 'cluster=' in href:
+                    versions_value = NumberUtilities.parse_int(a.text) or 0
+                    cluster_id = UrlUtilities.url_extract_get_param(_absolute(href), 'cluster')
+
+        return {
+            'title': title,
+            'link': link,
+            'kind': kind,
+            'result_id': res.get('data-cid'),
+            'authors': byline['authors'],
+            'publication': byline['publication'],
+            'source': byline['source'],
+            'year': year,
+            'snippet': snippet_bs.text.strip() if snippet_bs is not None else '',
+            'full_text_link': full_text_link,
+            'cited_by': {
+                'value': cby_value,
+                'link': cby_link,
+                'cites_id': cites_id,
+            },
+            'versions': {
+                'value': versions_value,
+                'cluster_id': cluster_id,
+            },
+        }
+
+    def _parse_total(self) -> Union[int, None]:
+        summary = self.document.find('div', id='gs_ab_md')
+        if summary is None:
+            return None
+        # "About 1,230 results (0.03 sec)" or "Page 3 of about 1,230 results",
+        # the time is in a <b>
+        text = ''.join(s for s in summary.find_all(string=True) if s.parent.name != 'b')
+        numbers = NumberUtilities.parse_ints(text)
+        return max(numbers) if numbers else None
+
+    def _parse_next_start(self) -> Union[int, None]:
+        pager = self.document.find('div', id='gs_n')
+        if pager is None:
+            return None
+        nxt = pager.find('span', class_='gs_ico_nav_next')
+        anchor = nxt.find_parent('a') if nxt is not None else None
+        if anchor is None or not anchor.get('href'):
+            return None
+        start = UrlUtilities.url_extract_get_param(_absolute(anchor['href']), 'start')
+        return int(start) if start and start.isdigit() else None
+
+    def _parse(self) -> Dict[str, Any]:
+        results = self.document.find('div', id='gs_res_ccl_mid')
+        rows: List[Tag] = []
+        if results is not None:
+            rows = results.find_all('div', class_='gs_r', recursive=False)
+
+        return {
+            'total': self._parse_total(),
+            'articles': [self._parse_one_result(r) for r in rows if r.get('data-cid')],
+            'next_start': self._parse_next_start(),
+        }
+
+    def parse(self) -> Dict[str, Any]:
+        return self._memoized(self._parse)
+
+
+class ArticleDetailParser(ParserBase):
+    """
+    Parse the page of an article of a profile (``view_op=view_citation``).
+
+    ``parse()`` returns the title and its link, every field of the table of the
+    page under its label in snake case (``authors``, ``publication_date``,
+    ``journal``, ``volume``, ``pages``, ``publisher``, ``description``... in
+    English, the labels follow the ``hl`` of the page), the ``cited_by`` count
+    with its ``cites_id``, the citations per year (``graph``) and the link to
+    the full text.
+    """
+
+    SKIPPED_FIELDS = ('total_citations', 'scholar_articles')
+    """Fields given in another form (``cited_by`` and ``graph``)."""
+
+    def __init__(self, html: Union[str, bytes] = '', encoding: str = None) -> None:
+        super().__init__(html, encoding)
+
+    @staticmethod
+    def _field_name(label: str) -> str:
+        return re.sub(r'\W+', '_', label.strip().lower()).strip('_')
+
+    def _parse_graph(self) -> List[Dict[str, int]]:
+        graph_bs = self.document.find('div', id='gsc_oci_graph_bars')
+        if graph_bs is None:
+            return []
+
+        years = [
+            NumberUtilities.parse_int(y.text) for y in graph_bs.find_all('span', class_='gsc_oci_g_t')
+        ]
+        citations = {y: 0 for y in years if y is not None}
+
+        # every bar links to the citations of its year; years without
+        # citations have no bar
+        bars = graph_bs.find_all('a', class_='gsc_oci_g_a')
+        for i, bar in enumerate(bars):
+            value = NumberUtilities.parse_int(bar.text) or 0
+            year = UrlUtilities.url_extract_get_param(_absolute(bar.get('href', '')), 'as_ylo')
+            if year is not None and year.isdigit():
+                citations[int(year)] = value
+            elif len(bars) == len(years) and years[i] is not None:
+                citations[years[i]] = value
+
+        return [{'year': y, 'citations': c} for y, c in sorted(citations.items())]
+
+    def _parse(self) -> Dict[str, Any]:
+        title_bs = self.document.find('div', id='gsc_oci_title')
+        title, link = '', None
+        if title_bs is not None:
+            title = title_bs.text.strip()
+            anchor = title_bs.find('a')
+            if anchor is not None:
+                link = anchor.get('href')
+
+        fields: Dict[str, Any] = {}
+        cby_value, cby_link, cites_id = 0, None, None
+        table_bs = self.document.find('div', id='gsc_oci_table')
+        if table_bs is not None:
+            for row in table_bs.find_all('div', class_='gs_scl', recursive=False):
+                label = row.find('div', class_='gsc_oci_field')
+                value = row.find('div', class_='gsc_oci_value')
+                if label is None or value is None:
+                    continue
+
+                cited_by = value.find('a', href=re.compile('cites='))
+                if cited_by is not None:
+                    cby_value = NumberUtilities.parse_int(cited_by.text) or 0
+                    cby_link = _absolute(cited_by['href'])
+                    cites_id = UrlUtilities.url_extract_get_param(cby_link, 'cites')
+
+                name = self._field_name(label.text)
+                if name and name not in self.SKIPPED_FIELDS and cited_by is None:
+                    fields[name] = value.text.strip()
+
+        full_text_bs = self.document.find('div', class_='gsc_oci_title_ggi')
+        full_text_link = None
+        if full_text_bs is not None and full_text_bs.find('a') is not None:
+            full_text_link = full_text_bs.find('a').get('href')
+
+        return {
+            'title': title,
+            'link': link,
+            **fields,
+            'cited_by': {
+                'value': cby_value,
+                'link': cby_link,
+                'cites_id': cites_id,
+            },
+            'graph': self._parse_graph(),
+            'full_text_link': full_text_link,
+        }
+
+    def parse(self) -> Dict[str, Any]:
+        return self._memoized(self._parse)
@@ -0,0 +1,519 @@
+import itertools
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from logging import NullHandler
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple, Union
+
+from .article_parser import ArticleDetailParser, CitingArticlesParser
+from .http_cache import content_hash
+from .parse_cache import ParseCache
+from .scholar_retriever import FetchResult, ScholarWebRetriever
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+logger.addHandler(NullHandler())
+
+
+class CitingArticlesRetriever(ScholarWebRetriever):
+    """
+    A class for retrieving the articles that cite an article from Google Scholar.
+
+    The list is the one linked by the "Cited by" count of an article, identified
+    by the ``cites_id`` that :class:`~scholar_retriever.AuthorArticlesRetriever`
+    gives in ``cited_by.cites_id``. Results come ten per page; after the first
+    page the following ones are requested ahead of the consumer, up to
+    ``prefetch`` at a time, through the same :attr:`rate_limiter` as every retriever.
+
+    .. code::
+
+        retriever = CitingArticlesRetriever(article['cited_by']['cites_id'])
+        for citing in retriever.iter_articles(prefetch=2):
+            ...
+
+    This class inherits from ScholarWebRetriever.
+    """
+
+    URL_ENDPOINT = "https://scholar.google.com/scholar"
+    """The URL endpoint for the lists of results."""
+
+    PAGE_MARKERS = (b' id="gs_res_ccl"',)
+    """Found on the list of results, even when it is empty."""
+
+    PAGE_SIZE = 10
+    """Results per page. Google Scholar does not allow more."""
+
+    MAX_RESULTS = 1000
+    """Google Scholar does not show results past this one."""
+
+    def __init__(
+        self,
+        cites_id: str = None,
+        hl: str = ScholarWebRetriever.HL_DEFAULT,
+        get_request_args: Callable[[], dict] = None,
+    ) -> None:
+        """
+        Initialize the CitingArticlesRetriever object.
+
+        :param cites_id: Identifier of the cited article (``cited_by.cites_id`` of an article).
+        :type cites_id: str, optional
+        :param hl: The language for the request. Defaults to ScholarWebRetriever.HL_DEFAULT.
+        :type hl: str, optional
+        :param get_request_args: A callable that returns arguments for the GET request. Defaults to None.
+        :type get_request_args: Callable[[], dict], optional
+        """
+        super().__init__(get_request_args)
+
+        self.language = hl
+        self.cites_id = cites_id
+        self._total = None
+        self._results: List[Dict[str, Any]] = []
+
+    @property
+    def cites_id(self) -> str:
+        """
+        Identifier of the cited article.
+        """
+        return self._cites_id
+
+    @cites_id.setter
+    def cites_id(self, new_cites_id: str) -> None:
+        self._cites_id = new_cites_id
+        self.add_params(cites=self._cites_id, start=None)
+
+    def _load_page(self, params: dict, result: FetchResult) -> Dict[str, Any]:
+        """
+        Position the object on a fetched page and parse it.
+        """
+        self.params = params
+        self._load_result(result)
+        page = self._parse_content(
+            "citing_articles", CitingArticlesParser.from_document(self.document).parse
+        )
+        self._release_content()
+        return page
+
+    def _iter_pages(
+        self, prefetch: int = 1, max_results: int = None
+    ) -> Iterator[Tuple[bool, Union[Dict[str, Any], str]]]:
+        """
+        Iterate over ``(True, page)``, ending with ``(False, reason)`` if a page fails.
+        """
+        base_params = dict(self.params)
+        base_params.pop("start", None)
+
+        def fetch_page(start: int) -> Tuple[dict, Tuple[bool, Union[FetchResult, str]]]:
+            params = dict(base_params, start=start) if start else base_params
+            return params, self._fetch(params)
+
+        # the pages count against one operation_timeout
+        with self._deadline_scope():
+            params, (success, result) = fetch_page(0)
+            if not success:
+                yield (False, result)
+                return
+
+            page = self._load_page(params, result)
+            yield (True, page)
+
+            limit = self.MAX_RESULTS
+            if max_results is not None:
+                limit = min(limit, max_results)
+            if page["total"] is not None:
+                limit = min(limit, page["total"])
+            if page["next_start"] is None or not page["articles"]:
+                return
+
+            # the start of every page is known, so the next ones are requested
+            # before the current one is consumed
+            starts = iter(range(self.PAGE_SIZE, limit, self.PAGE_SIZE))
+            pending = deque()
+            with ThreadPoolExecutor(max_workers=max(1, prefetch)) as pool:
+                try:
+                    for start in itertools.islice(starts, max(1, prefetch)):
+                        pending.append(pool.submit(fetch_page, start))
+
+                    while pending:
+                        params, (success, result) = pending.popleft().result()
+                        if not success:
+                            yield (False, result)
+                            return
+
+                        page = self._load_page(params, result)
+                        yield (True, page)
+                        if page["next_start"] is None or not page["articles"]:
+                            return
+
+                        start = next(starts, None)
+                        if start is not None:
+                            pending.append(pool.submit(fetch_page, start))
+                finally:
+                    for f in pending:
+                        f.cancel()
+
+    def iter_pages(self, prefetch: int = 1, max_results: int = None) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over the pages of results.
+
+        After every page is yielded the object is positioned on it, so
+        :meth:`get_html` returns it. A page that can not be fetched ends the iteration.
+
+        :param prefetch: Pages requested ahead of the consumer. Defaults to 1.
+        :type prefetch: int, optional
+        :param max_results: Stop once this number of results is reached. Defaults to all of them.
+        :type max_results: int, optional
+        :return: Pages as ``{'total': ..., 'articles': [...], 'next_start': ...}``
+            (see :class:`~scholar_retriever.article_parser.CitingArticlesParser`).
+        :rtype: Iterator[Dict[str, Any]]
+        """
+        for success, page in self._iter_pages(prefetch, max_results):
+            if not success:
+                logger.info(f"Page iteration stopped: {page}")
+                return
+            yield page
+
+    def iter_articles(self, prefetch: int = 1, max_results: int = None) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over the citing articles as soon as their page is parsed.
+
+        See :meth:`iter_pages` for the parameters.
+
+        :return: Articles with the structure of ``get_json()['articles']``.
+        :rtype: Iterator[Dict[str, Any]]
+        """
+        count = 0
+        for page in self.iter_pages(prefetch, max_results):
+            for article in page["articles"]:
+                if max_results is not None and count >= max_results:
+                    return
+                count += 1
+                yield article
+
+    def fetch(self, prefetch: int = 1, max_results: int = None) -> Tuple[bool, str]:
+        """
+        Fetch every page of citing articles.
+
+        :param prefetch: Pages requested ahead. Defaults to 1.
+        :type prefetch: int, optional
+        :param max_results: Stop once this number of results is reached. Defaults to all of them.
+        :type max_results: int, optional
+        :return: A tuple indicating success (``True``) or failure (``False``) along with an error message.
+        :rtype: tuple[bool, str]
+        """
+        self._total = None
+        self._results = []
+
+        for success, page in self._iter_pages(prefetch, max_results):
+            if not success:
+                return (False, page)
+            if self._total is None:
+                self._total = page["total"]
+            self._results.extend(page["articles"])
+
+        if max_results is not None:
+            self._results = self._results[:max_results]
+
+        return (True, "Success")
+
+    def get_json(self) -> Dict[str, Any]:
+        """
+        Get the results as a JSON object.
+
+        :return: ``{'cites_id': ..., 'total': ..., 'articles': [...]}``, where
+            ``total`` is the number of results announced by Google Scholar.
+        :rtype: dict
+        """
+        return {
+            "cites_id": self.cites_id,
+            "total": self._total,
+            "articles": self._results,
+        }
+
+    @classmethod
+    def iter_many(
+        cls,
+        cites_ids: Iterable[str],
+        max_workers: int = 4,
+        prefetch: int = 1,
+        max_results: int = None,
+        hl: str = ScholarWebRetriever.HL_DEFAULT,
+        get_request_args: Callable[[], dict] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Fetch the citing articles of many articles at once.
+
+        Every ``cites_id`` is fetched once, by a pool of ``max_workers`` threads
+        (each one requesting ``prefetch`` pages ahead), and yielded as soon as all
+        its pages are in. Requests go through the same :attr:`rate_limiter` as
+        every retriever.
+
+        :param cites_ids: Identifiers of the cited articles. Repeated ones and None are skipped.
+        :type cites_ids: Iterable[str]
+        :param max_workers: Lists fetched at the same time. Defaults to 4.
+        :type max_workers: int, optional
+        :param prefetch: Pages requested ahead in every list. Defaults to 1.
+        :type prefetch: int, optional
+        :param max_results: Results of every list. Defaults to all of them.
+        :type max_results: int, optional
+        :param hl: The language for the requests. Defaults to ScholarWebRetriever.HL_DEFAULT.
+        :type hl: str, optional
+        :param get_request_args: A callable that returns arguments for the GET requests. Defaults to None.
+        :type get_request_args: Callable[[], dict], optional
+        :return: ``get_json()`` of every list, or ``{'cites_id': ..., 'total': None,
+            'articles': None, 'error': reason}`` if it failed.
+        :rtype: Iterator[Dict[str, Any]]
+        """
+
+        def fetch_one(cites_id: str) -> Dict[str, Any]:
+            retriever = cls(cites_id, hl, get_request_args)
+            try:
+                success, reason = retriever.fetch(prefetch, max_results)
+            except Exception as e:
+                success, reason = False, repr(e)
+            if not success:
+                return {"cites_id": cites_id, "total": None, "articles": None, "error": reason}
+            return retriever.get_json()
+
+        # bound the lists waiting to be consumed, so a long input is not read at once
+        max_pending = max_workers * 4
+        seen = set()
+        pending = set()
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            try:
+                for cites_id in cites_ids:
+                    if cites_id is None or cites_id in seen:
+                        continue
+                    seen.add(cites_id)
+                    pending.add(pool.submit(fetch_one, cites_id))
+
+                    if len(pending) >= max_pending:
+                        done = next(as_completed(pending))
+                        pending.remove(done)
+                        yield done.result()
+
+                for f in as_completed(list(pending)):
+                    pending.remove(f)
+                    yield f.result()
+            finally:
+                for f in pending:
+                    f.cancel()
+
+
+class ArticleDetailRetriever(ScholarWebRetriever):
+    """
+    A class for retrieving the page of an article of a profile from Google Scholar.
+
+    The page (``view_op=view_citation``) has the full list of authors, the
+    abstract, the venue details and the citations per year. Articles are
+    identified by the ``citation_id`` that
+    :class:`~scholar_retriever.AuthorArticlesRetriever` gives for each article.
+
+    This class inherits from ScholarWebRetriever.
+    """
+
+    URL_ENDPOINT = "https://scholar.google.com/citations"
+    """The URL endpoint for article pages."""
+
+    PAGE_MARKERS = (b' id="gsc_oci_title"',)
+    """Found on the title of the article."""
+
+    detail_cache: ParseCache = None
+    """Parsed article pages shared by the retrievers, by ``citation_id`` and by
+    ``cites_id`` (the same article in the profiles of its co-authors). An
+    article in the cache is not requested again. Disabled if None.
+    """
+
+    def __init__(
+        self,
+        citation_id: str = None,
+        hl: str = ScholarWebRetriever.HL_DEFAULT,
+        get_request_args: Callable[[], dict] = None,
+    ) -> None:
+        """
+        Initialize the ArticleDetailRetriever object.
+
+        :param citation_id: Identifier of the article in a profile (``citation_id`` of an article).
+        :type citation_id: str, optional
+        :param hl: The language for the request. Defaults to ScholarWebRetriever.HL_DEFAULT.
+        :type hl: str, optional
+        :param get_request_args: A callable that returns arguments for the GET request. Defaults to None.
+        :type get_request_args: Callable[[], dict], optional
+        """
+        super().__init__(get_request_args)
+
+        self.add_params(view_op="view_citation")
+        self.language = hl
+        self.citation_id = citation_id
+        self.from_cache = False
+        """Whether the last :meth:`fetch` was answered by :attr:`detail_cache`."""
+        self._result: Dict[str, Any] = None
+
+    @property
+    def citation_id(self) -> str:
+        """
+        Identifier of the article.
+        """
+        return self._citation_id
+
+    @citation_id.setter
+    def citation_id(self, new_citation_id: str) -> None:
+        self._citation_id = new_citation_id
+        self.add_params(citation_for_view=self._citation_id)
+
+    @staticmethod
+    def _cache_key(kind: str, value: str, hl: str) -> str:
+        # hashed, so any id is a valid file name for the disk tier
+        return content_hash(f"article_detail-{ArticleDetailParser.PARSER_VERSION}-{hl}-{kind}-{value}")
+
+    @classmethod
+    def _cached(cls, hl: str, citation_id: str = None, cites_id: str = None) -> Union[Dict[str, Any], None]:
+        cache = cls.detail_cache
+        if cache is None:
+            return None
+        if cites_id:
+            detail = cache.get(cls._cache_key("cites", cites_id, hl))
+            if detail is not None:
+                return detail
+        if citation_id:
+            return cache.get(cls._cache_key("citation", citation_id, hl))
+        return None
+
+    def fetch(self) -> Tuple[bool, str]:
+        """
+        Fetch the page of the article, unless it is in :attr:`detail_cache`.
+
+        :return: A tuple indicating success (``True``) or failure (``False``) along with an error message.
+        :rtype: tuple[bool, str]
+        """
+        hl = self.language
+        detail = self._cached(hl, self.citation_id)
+        self.from_cache = detail is not None
+        if detail is not None:
+            self._result = detail
+            return (True, "Success")
+
+        success, reason = self.reload_web_content()
+        if not success:
+            self._result = None
+            return (False, reason)
+
+        self._result = self._parse_content(
+            "article_detail", ArticleDetailParser.from_document(self.document).parse
+        )
+        self._release_content()
+
+        cache = self.detail_cache
+        if cache is not None:
+            cache.put(self._cache_key("citation", self.citation_id, hl), self._result)
+            cites_id = self._result["cited_by"]["cites_id"]
+            if cites_id:
+                cache.put(self._cache_key("cites", cites_id, hl), self._result)
+
+        return (True, "Success")
+
+    def get_json(self) -> Dict[str, Any]:
+        """
+        Get the article as a JSON object.
+
+        :return: ``{'citation_id': ...}`` plus the fields of
+            :class:`~scholar_retriever.article_parser.ArticleDetailParser`, or
+            None if nothing was fetched.
+        :rtype: dict
+        """
+        if self._result is None:
+            return None
+        return {"citation_id": self.citation_id, **self._result}
+
+    @classmethod
+    def iter_many(
+        cls,
+        articles: Iterable[Union[str, Dict[str, Any]]],
+        max_workers: int = 8,
+        hl: str = ScholarWebRetriever.HL_DEFAULT,
+        get_request_args: Callable[[], dict] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Fetch the pages of many articles at once.
+
+        ``articles`` are ``citation_id`` strings or the article dicts of
+        :class:`~scholar_retriever.AuthorArticlesRetriever`. The same article
+        shows up in the profile of each of its co-authors under a different
+        ``citation_id`` but with the same ``cited_by.cites_id``, so article
+        dicts sharing a ``cites_id`` (or a ``citation_id``) are fetched once. The
+        pages are fetched by a pool of ``max_workers`` threads, through the same
+        :attr:`rate_limiter` as every retriever, and :attr:`detail_cache` is
+        checked first if set.
+
+        :param articles: The articles.
+        :type articles: Iterable[Union[str, dict]]
+        :param max_workers: Pages fetched at the same time. Defaults to 8.
+        :type max_workers: int, optional
+        :param hl: The language for the requests. Defaults to ScholarWebRetriever.HL_DEFAULT.
+        :type hl: str, optional
+        :param get_request_args: A callable that returns arguments for the GET requests. Defaults to None.
+        :type get_request_args: Callable[[], dict], optional
+        :return: One ``get_json()`` per input article, with the ``citation_id``
+            of that article, as soon as its page is in. Duplicates share the
+            fields of one page. ``{'citation_id': ..., 'error': reason}`` if it failed.
+        :rtype: Iterator[Dict[str, Any]]
+        """
+
+        def fetch_one(citation_id: str, cites_id: str) -> Tuple[bool, Union[Dict[str, Any], str]]:
+            detail = cls._cached(hl, citation_id, cites_id)
+            if detail is not None:
+                return (True, detail)
+
+            retriever = cls(citation_id, hl, get_request_args)
+            try:
+                success, reason = retriever.fetch()
+            except Exception as e:
+                success, reason = False, repr(e)
+            return (True, retriever._result) if success else (False, reason)
+
+        def results(future) -> Iterator[Dict[str, Any]]:
+            success, detail = future.result()
+            for citation_id in waiting.pop(future):
+                if success:
+                    yield {"citation_id": citation_id, **detail}
+                else:
+                    yield {"citation_id": citation_id, "error": detail}
+
+        # one future per article, and the citation ids waiting for it
+        futures: Dict[str, Any] = {}
+        waiting: Dict[Any, List[str]] = {}
+        max_pending = max_workers * 4
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            try:
+                for article in articles:
+                    if isinstance(article, dict):
+                        citation_id = article.get("citation_id")
+                        cites_id = (article.get("cited_by") or {}).get("cites_id")
+                    else:
+                        citation_id, cites_id = article, None
+                    if not citation_id:
+                        continue
+
+                    key = f"cites:{cites_id}" if cites_id else f"citation:{citation_id}"
+                    future = futures.get(key)
+                    if future is None:
+                        future = futures[key] = pool.submit(fetch_one, citation_id, cites_id)
+                        waiting[future] = [citation_id]
+                    elif future in waiting:
+                        waiting[future].append(citation_id)
+                        continue
+                    else:
+                        # the page was already yielded for another article
+                        waiting[future] = [citation_id]
+                        yield from results(future)
+                        continue
+
+                    if len(waiting) >= max_pending:
+                        yield from results(next(as_completed(list(waiting))))
+
+                while waiting:
+                    yield from results(next(as_completed(list(waiting))))
+            finally:
+                for f in waiting:
+                    f.cancel()
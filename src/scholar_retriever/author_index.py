@@ -0,0 +1,323 @@
+"""On-disk index of the authors of a crawl, read through ``mmap``.
+
+:class:`AuthorIndexWriter` streams the results of the retrievers to one file:
+the records of every author (its information, its articles and its
+co-authors, each one a JSON blob) are appended as they come, and a table of
+fixed-width entries sorted by ``author_id`` is written at the end::
+
+    from scholar_retriever.author_index import AuthorIndex, AuthorIndexWriter
+
+    with AuthorIndexWriter("crawl.idx") as writer:
+        for author_id in author_ids:
+            retriever = AuthorRetriever(author_id)
+            coauthors = CoAuthorsRetriever(author_id)
+            if retriever.fetch()[0] and coauthors.fetch()[0]:
+                writer.add_retrievers(retriever, coauthors)
+
+    with AuthorIndex("crawl.idx") as index:
+        index.info(author_id), index.articles(author_id), index.coauthors(author_id)
+
+:class:`AuthorIndex` maps the file and finds an author with a binary search
+over the entries, so a lookup reads a few pages and only decodes the records
+asked for, whatever the size of the file. The pages are the ones of the page
+cache of the system: every process reading the same file shares them.
+
+Layout (little endian)::
+
+    header   "SRAI", version (u32), authors (u64), offset of the entries (u64)
+    records  JSON blobs, in order of arrival
+    entries  author_id (16 bytes, NUL padded), offset of its records (u64),
+             lengths of its info, articles and co-authors records (3 x u32),
+             sorted by author_id
+
+A record of length 0 was not given for the author.
+"""
+
+import json
+import mmap
+import os
+import struct
+import tempfile
+from typing import Any, Dict, Iterator, List, Tuple, Union
+
+_HEADER = struct.Struct("<4sIQQ")
+_MAGIC = b"SRAI"
+_VERSION = 1
+
+KEY_SIZE = 16
+"""Bytes of the ``author_id`` of the entries. Google Scholar ids have 12."""
+
+_ENTRY = struct.Struct(f"<{KEY_SIZE}sQIII")
+
+SECTIONS = ("info", "articles", "coauthors")
+"""Records kept for every author, in the order of their blobs."""
+
+_INFO_KEYS = ("author", "cited_by", "public_access")
+
+
+def _key(author_id: str) -> bytes:
+    key = author_id.encode("ascii")
+    if not key or len(key) > KEY_SIZE:
+        raise ValueError(f"Invalid author_id for the index: {author_id!r}")
+    return key.ljust(KEY_SIZE, b"\0")
+
+
+class AuthorIndexWriter(object):
+    """
+    Builds an index file from the results of the retrievers, one author at a time.
+
+    The records go to a temporary file next to ``path`` as they are added;
+    :meth:`close` appends the sorted entries and renames it to ``path``, so
+    readers never see a partial index. Only the entries (under 100 bytes per
+    author) are kept in memory. An author added twice keeps its last records.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Initialize the AuthorIndexWriter object.
+
+        :param path: The index file, replaced on :meth:`close`.
+        :type path: str
+        """
+        self.path = path
+        fd, self._tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)))
+        self._file = os.fdopen(fd, "wb")
+        self._file.write(_HEADER.pack(_MAGIC, _VERSION, 0, 0))
+        self._offset = _HEADER.size
+        self._entries: Dict[bytes, Tuple[int, int, int, int]] = {}
+
+    @staticmethod
+    def _encode(record: Any) -> bytes:
+        if record is None:
+            return b""
+        return json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    def add(
+        self,
+        author_id: str,
+        info: Dict[str, Any] = None,
+        articles: List[Dict[str, Any]] = None,
+        coauthors: List[Dict[str, Any]] = None,
+    ) -> None:
+        """
+        Add the records of an author.
+
+        :param author_id: The unique identifier of the author.
+        :type author_id: str
+        :param info: The ``get_json()`` of :class:`~scholar_retriever.AuthorInfoRetriever`.
+        :type info: dict, optional
+        :param articles: The ``get_json()['publications']`` of :class:`~scholar_retriever.AuthorArticlesRetriever`.
+        :type articles: List[dict], optional
+        :param coauthors: The ``get_json()['coauthors']`` of :class:`~scholar_retriever.CoAuthorsRetriever`.
+        :type coauthors: List[dict], optional
+        :raises ValueError: If ``author_id`` is longer than :data:`KEY_SIZE` bytes.
+        """
+        key = _key(author_id)
+        blobs = [self._encode(info), self._encode(articles), self._encode(coauthors)]
+
+        self._entries[key] = (self._offset, *(len(b) for b in blobs))
+        for blob in blobs:
+            self._file.write(blob)
+            self._offset += len(blob)
+
+    def add_retrievers(self, *retrievers: Any) -> None:
+        """
+        Add the records of an author from the retrievers that fetched it: any of
+        :class:`~scholar_retriever.AuthorInfoRetriever`,
+        :class:`~scholar_retriever.AuthorArticlesRetriever`,
+        :class:`~scholar_retriever.CoAuthorsRetriever` and
+        :class:`~scholar_retriever.AuthorRetriever`, all for the same author.
+
+        :raises ValueError: If the retrievers are for different authors.
+        """
+        author_ids = {r.author_id for r in retrievers}
+        if len(author_ids) != 1:
+            raise ValueError(f"The retrievers are for several authors: {sorted(author_ids)}")
+
+        info = articles = coauthors = None
+        for retriever in retrievers:
+            result = retriever.get_json()
+            if "author" in result:
+                info = {k: result.get(k) for k in _INFO_KEYS}
+            if result.get("publications") is not None:
+                articles = result["publications"]
+            if result.get("coauthors") is not None:
+                coauthors = result["coauthors"]
+
+        self.add(author_ids.pop(), info, articles, coauthors)
+
+    def close(self) -> None:
+        """
+        Write the entries and publish the index at ``path``.
+        """
+        if self._file is None:
+            return
+
+        f, self._file = self._file, None
+        try:
+            with f:
+                for key in sorted(self._entries):
+                    f.write(_ENTRY.pack(key, *self._entries[key]))
+                f.seek(0)
+                f.write(_HEADER.pack(_MAGIC, _VERSION, len(self._entries), self._offset))
+                # mkstemp creates the file 0600, the index is for every reader
+                if hasattr(os, "fchmod"):
+                    umask = os.umask(0)
+                    os.umask(umask)
+                    os.fchmod(f.fileno(), 0o644 & ~umask)
+            os.replace(self._tmp, self.path)
+        except Exception:
+            os.unlink(self._tmp)
+            raise
+
+    def abort(self) -> None:
+        """
+        Drop the index being written. ``path`` is left untouched.
+        """
+        if self._file is None:
+            return
+        f, self._file = self._file, None
+        f.close()
+        os.unlink(self._tmp)
+
+    def __enter__(self) -> "AuthorIndexWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class AuthorIndex(object):
+    """
+    Read-only lookups of the authors of an index file written by :class:`AuthorIndexWriter`.
+
+    The object can be shared by threads; every process opens its own.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Map an index file.
+
+        :param path: The index file.
+        :type path: str
+        :raises ValueError: If the file is not an index.
+        """
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, self._count, self._entries = _HEADER.unpack_from(self._mm, 0)
+        if magic != _MAGIC or version != _VERSION:
+            self._mm.close()
+            raise ValueError(f"{path} is not an author index")
+
+    def _key_at(self, i: int) -> bytes:
+        start = self._entries + i * _ENTRY.size
+        return self._mm[start : start + KEY_SIZE]
+
+    def _find(self, author_id: str) -> Union[Tuple[int, int, int, int], None]:
+        """
+        Offset and record lengths of an author, None if it is not in the index.
+        """
+        try:
+            key = _key(author_id)
+        except (ValueError, UnicodeEncodeError):
+            return None
+
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key_at(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo == self._count or self._key_at(lo) != key:
+            return None
+        return _ENTRY.unpack_from(self._mm, self._entries + lo * _ENTRY.size)[1:]
+
+    def raw(self, author_id: str, section: str) -> Union[memoryview, None]:
+        """
+        The JSON bytes of a record, without copying them out of the mapping.
+
+        :param author_id: The unique identifier of the author.
+        :type author_id: str
+        :param section: One of :data:`SECTIONS`.
+        :type section: str
+        :return: The bytes, or None if the author or the record is not in the index.
+        :rtype: memoryview
+        """
+        entry = self._find(author_id)
+        if entry is None:
+            return None
+
+        offset, lengths = entry[0], entry[1:]
+        i = SECTIONS.index(section)
+        if not lengths[i]:
+            return None
+        start = offset + sum(lengths[:i])
+        return memoryview(self._mm)[start : start + lengths[i]]
+
+    def _load(self, author_id: str, section: str) -> Any:
+        blob = self.raw(author_id, section)
+        if blob is None:
+            return None
+        with blob:
+            return json.loads(bytes(blob))
+
+    def info(self, author_id: str) -> Union[Dict[str, Any], None]:
+        """
+        The record of :class:`~scholar_retriever.AuthorInfoRetriever` of an author, or None.
+        """
+        return self._load(author_id, "info")
+
+    def articles(self, author_id: str) -> Union[List[Dict[str, Any]], None]:
+        """
+        The articles of an author, or None.
+        """
+        return self._load(author_id, "articles")
+
+    def coauthors(self, author_id: str) -> Union[List[Dict[str, Any]], None]:
+        """
+        The co-authors of an author, or None.
+        """
+        return self._load(author_id, "coauthors")
+
+    def get(self, author_id: str) -> Union[Dict[str, Any], None]:
+        """
+        Every record of an author.
+
+        :return: ``{'author_id', 'info', 'articles', 'coauthors'}``, or None if
+            the author is not in the index.
+        :rtype: dict
+        """
+        if self._find(author_id) is None:
+            return None
+        return {"author_id": author_id, **{s: self._load(author_id, s) for s in SECTIONS}}
+
+    def __contains__(self, author_id: str) -> bool:
+        return self._find(author_id) is not None
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[str]:
+        """
+        The ``author_id`` of every author, in order.
+        """
+        for i in range(self._count):
+            yield self._key_at(i).rstrip(b"\0").decode("ascii")
+
+    def close(self) -> None:
+        """
+        Unmap the file. Memoryviews returned by :meth:`raw` must be released first.
+        """
+        self._mm.close()
+
+    def __enter__(self) -> "AuthorIndex":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
@@ -1,33 +1,222 @@
 from bs4 import BeautifulSoup, Tag
-from .utils.tools import UrlUtilities
-from typing import List, Dict, Any
+from .utils.tools import NumberUtilities, UrlUtilities
+from typing import Any, Callable, Dict, List, Union
+from . import fast_extract
+from .http_cache import content_hash
+from .page_classifier import PageError, PageKind
+from .parse_cache import ParseCache
 
 PROFILE_URL_BASE = 'https://scholar.google.com'
 
+class ParsedDocument:
+    """
+    An HTML page parsed once and shared by several parsers.
+
+    The parse tree, the content hash and the lookups of containers (elements
+    with an ``id`` such as ``gsc_prf`` or ``gsc_a_t``, and :meth:`find` calls)
+    are computed on first use and reused by every parser of the page.
+    """
+
+    def __init__(self, html: Union[str, bytes] = '', encoding: str = None) -> None:
+        """
+        Initialize the ParsedDocument object.
+
+        :param html: The page, preferably the raw bytes of the response.
+        :type html: str or bytes
+        :param encoding: Charset of ``html`` when it is bytes. Detected from the document if None.
+        :type encoding: str, optional
+        """
+        self.html = html
+        self.encoding = encoding
+        self._soup = None
+        self._content_hash = None
+        self._text = None
+        self._ids = None
+        self._found = {}
+
+    @property
+    def soup(self) -> BeautifulSoup:
+        """
+        The parse tree, built on first use.
+        """
+        if self._soup is None:
+            if self.html is None:
+                raise Exception("The document was released")
+            if isinstance(self.html, bytes):
+                self._soup = BeautifulSoup(self.html, 'html.parser', from_encoding=self.encoding)
+            else:
+                self._soup = BeautifulSoup(self.html, 'html.parser')
+        return self._soup
+
+    @property
+    def text(self) -> Union[str, None]:
+        """
+        :attr:`html` as str, for extractors that do not need the tree.
+
+        Bytes are decoded with :attr:`encoding` (utf-8 if unknown). None if
+        they cannot be decoded that way.
+        """
+        if isinstance(self.html, str):
+            return self.html
+        if self._text is None:
+            try:
+                self._text = self.html.decode(self.encoding or 'utf-8')
+            except (UnicodeDecodeError, LookupError):
+                self._text = False
+        return self._text or None
+
+    @property
+    def content_hash(self) -> str:
+        """
+        Hash of :attr:`html`, computed on first use.
+        """
+        if self._content_hash is None:
+            if self.html is None:
+                raise Exception("The document was released")
+            self._content_hash = content_hash(self.html)
+        return self._content_hash
+
+    def release(self) -> None:
+        """
+        Drop the html and decompose the parse tree, so their memory is freed
+        right away instead of waiting for the garbage collector to break the
+        cycles of the tree. The document can not be parsed afterwards.
+        """
+        if self._soup is not None:
+            self._soup.decompose()
+        self.html = None
+        self._soup = None
+        self._text = None
+        self._ids = None
+        self._found = {}
+
+    def by_id(self, element_id: str) -> Union[Tag, None]:
+        """
+        The first element with the given ``id``.
+
+        All the ids of the page are indexed in one pass the first time.
+        """
+        if self._ids is None:
+            self._ids = {}
+            for tag in self.soup.find_all(id=True):
+                self._ids.setdefault(tag['id'], tag)
+        return self._ids.get(element_id)
+
+    def find(self, name: str = None, id: str = None, class_: str = None) -> Union[Tag, None]:
+        """
+        Like ``BeautifulSoup.find`` restricted to a tag name, an id and a class,
+        with the result cached for the next parsers.
+        """
+        if id is not None:
+            tag = self.by_id(id)
+            if tag is None or (name is not None and tag.name != name):
+                return None
+            if class_ is not None and class_ not in tag.get('class', []):
+                return None
+            return tag
+
+        key = (name, class_)
+        if key not in self._found:
+            self._found[key] = self.soup.find(name, class_=class_)
+        return self._found[key]
+
+
 class ParserBase:
-    def __init__(self, html: str = '') -> None:
-        self._html = html
-        self._soup = BeautifulSoup(self._html, 'html.parser')
+    PARSER_VERSION = "1"
+    """Version of the parse output. Bump it when the output of a parser changes."""
+
+    parse_cache: ParseCache = None
+    """Memoizes parse results by content hash. Disabled if None."""
+
+    low_memory: bool = False
+    """Release the html and the parse tree after ``parse()``. Documents shared
+    with other parsers are left to their owner (see :meth:`release`)."""
+
+    typed_numbers: bool = False
+    """Give the numbers of the page (article years, the cells of the citation
+    table, the public access counts) as ``int`` instead of the text of the page,
+    or None when there is no number. Thousands separators of any ``hl`` are accepted."""
+
+    def __init__(self, html: Union[str, bytes] = '', encoding: str = None) -> None:
+        self.document = ParsedDocument(html, encoding)
+        self._owns_document = True
+
+    @classmethod
+    def from_document(cls, document: ParsedDocument) -> "ParserBase":
+        """
+        Create a parser over a document that may be shared with other parsers.
+        """
+        parser = cls()
+        parser.document = document
+        parser._owns_document = False
+        return parser
 
     @property
     def html(self):
-        return self._html
+        return self.document.html
     
     @html.setter
     def html(self, new_html: str):
-        self._html = new_html
-        self._soup = BeautifulSoup(self._html,'html.parser')
+        self.document = ParsedDocument(new_html, self.document.encoding)
+        self._owns_document = True
+
+    @property
+    def encoding(self) -> Union[str, None]:
+        """
+        Charset of :attr:`html` when it is raw bytes. Detected from the document if None.
+        """
+        return self.document.encoding
+
+    @property
+    def soup(self) -> BeautifulSoup:
+        """
+        The parse tree of :attr:`html`, built on first use.
+        """
+        return self.document.soup
+
+    def share_tree(self, other: "ParserBase") -> None:
+        """
+        Parse the same html as ``other``, reusing its parse tree.
+
+        The tree is still built lazily, once, by whichever parser needs it first.
+        """
+        self.document = other.document
+        self._owns_document = False
+
+    def release(self) -> None:
+        """
+        Release the html and the parse tree (see :meth:`ParsedDocument.release`).
+        """
+        self.document.release()
+
+    def _memoized(self, parse: Callable[[], Any]) -> Any:
+        """
+        Run ``parse`` or return the result memoized for the same html.
+        """
+        cache = self.parse_cache
+        if cache is None:
+            result = parse()
+        else:
+            key = f'{self.document.content_hash}-{type(self).__name__}-{self.PARSER_VERSION}-{self.encoding}-{self.typed_numbers}'
+            result = cache.get(key)
+            if result is None:
+                result = parse()
+                cache.put(key, result)
+
+        if self.low_memory and self._owns_document:
+            self.release()
+        return result
 
     def parse(self):
         pass
 
 
 class AuthorInfoParser(ParserBase):    
-    def __init__(self, html: str = '') -> None:
-        super().__init__(html)
+    def __init__(self, html: Union[str, bytes] = '', encoding: str = None) -> None:
+        super().__init__(html, encoding)
     
     def parse_header_info(self) -> Dict[str, Any]:
-        author_info = self._soup.find( 'div', id='gsc_prf' )
+        author_info = self.document.find('div', id='gsc_prf')
 
         if author_info is None:
             return {}
@@ -77,10 +266,13 @@ class AuthorInfoParser(ParserBase):
         }
     
     def parse_cited_by(self) -> Dict[str, Any]:
-        cited_by = self._soup.find(id='gsc_rsb_cit')
+        cited_by = self.document.find(id='gsc_rsb_cit')
         
         ####### Parse table #######
-        table_bs = cited_by.find('table', id='gsc_rsb_st')
+        table_bs = cited_by.find('table', id='gsc_rsb_st') if cited_by is not None else None
+        if table_bs is None:
+            # the profile is always shown with its table: the page was cut short
+            raise PageError(PageKind.TRUNCATED)
 
         t_row_titles: list[BeautifulSoup] = table_bs.find('thead').find_all('th')
         t_row_titles = [ t.text.replace(' ', '_').replace('-', '_').lower() for t in t_row_titles ]
@@ -90,7 +282,11 @@ class AuthorInfoParser(ParserBase):
         
         for tr in table_rows:
             columns: list[BeautifulSoup] = tr.find_all('td')
-            columns = [ c.text.replace(' ', '_').replace('-', '_').lower() for c in columns ]
+            if self.typed_numbers:
+                columns = [ columns[0].text.replace(' ', '_').replace('-', '_').lower() ] + [
+                    NumberUtilities.parse_int(c.text) for c in columns[1:] ]
+            else:
+                columns = [ c.text.replace(' ', '_').replace('-', '_').lower() for c in columns ]
             table.append(
                 {
                     columns[0]:{
@@ -102,7 +298,7 @@ class AuthorInfoParser(ParserBase):
         
         ####### Parse Graph #######
         
-        graph_bs = self._soup.find('div', class_='gsc_md_hist_w')
+        graph_bs = self.document.find('div', class_='gsc_md_hist_w')
         try:
             year_list = graph_bs.find_all('span', class_='gsc_g_t')
             year_list = [ y.text for y in year_list ]
@@ -110,7 +306,7 @@ class AuthorInfoParser(ParserBase):
             citation_list = graph_bs.find_all('a', class_='gsc_g_a')
             citation_list = [ c.text for c in citation_list ]
         
-            graph = [ {"year":int(year), "citations":int(citations)} for year,citations in zip( year_list,citation_list ) ]
+            graph = [ {"year":int(year), "citations":NumberUtilities.parse_int(citations) or 0} for year,citations in zip( year_list,citation_list ) ]
         except Exception:
             graph = []
             
@@ -120,7 +316,7 @@ class AuthorInfoParser(ParserBase):
             }
 
     def parse_public_access(self) -> Dict[str, Any]:
-        access_bs = self._soup.find(id='gsc_rsb_mnd')
+        access_bs = self.document.find(id='gsc_rsb_mnd')
         
         try:
             link = 'https://scholar.google.com/' + access_bs.find('a')['href']
@@ -128,8 +324,14 @@ class AuthorInfoParser(ParserBase):
             link = None
         
         try:
-            available = access_bs.find('div', class_='gsc_rsb_m_a').text.split(' ')[0]
-            not_available = access_bs.find('div', class_='gsc_rsb_m_na').text.split(' ')[0]
+            available = access_bs.find('div', class_='gsc_rsb_m_a').text
+            not_available = access_bs.find('div', class_='gsc_rsb_m_na').text
+            if self.typed_numbers:
+                available = NumberUtilities.parse_int(available)
+                not_available = NumberUtilities.parse_int(not_available)
+            else:
+                available = available.split(' ')[0]
+                not_available = not_available.split(' ')[0]
         except Exception:
             available = not_available = 0
             
@@ -139,10 +341,14 @@ class AuthorInfoParser(ParserBase):
             'not_available': not_available
         }
         
-    def parse(self, html: str = None,) -> Dict[str, Any]:
+    def parse(self, html: Union[str, bytes] = None, encoding: str = None) -> Dict[str, Any]:
         if html is not None:
-            self.html = html
-        
+            self.document = ParsedDocument(html, encoding)
+            self._owns_document = True
+
+        return self._memoized(self._parse)
+
+    def _parse(self) -> Dict[str, Any]:
         author_info = self.parse_header_info()
         cited_by = self.parse_cited_by()
         public_access = self.parse_public_access()
@@ -162,12 +368,14 @@ class AuthorInfoParser(ParserBase):
 
 class CoAuthorsParser(ParserBase):
     
-    def __init__(self, html: str = '') -> None:
-        super().__init__(html)
+    def __init__(self, html: Union[str, bytes] = '', encoding: str = None) -> None:
+        super().__init__(html, encoding)
     
     def _parse_coauthors(self) -> List[Dict[str, Any]]:
         
-        coauthors_bs = self._soup.find('div', id='gsc_codb_content')
+        coauthors_bs = self.document.find('div', id='gsc_codb_content')
+        if coauthors_bs is None:
+            raise PageError(PageKind.TRUNCATED)
         
         coauthors_list = coauthors_bs.find_all('div', class_='gs_ai gs_scl')
         #print(len(coauthors_list))
@@ -194,17 +402,22 @@ class CoAuthorsParser(ParserBase):
             
         return coauthors
 
-    def parse(self, html:str = None):
+    def parse(self, html: Union[str, bytes] = None, encoding: str = None):
         if html is not None:
-            self.html = html
+            self.document = ParsedDocument(html, encoding)
+            self._owns_document = True
         
-        return self._parse_coauthors()
+        return self._memoized(self._parse_coauthors)
 
 
 
 class AuthorArticlesParser(ParserBase):
-    def __init__(self, html: str = '') -> None:
-        super().__init__(html)
+    fast_extraction: bool = False
+    """Extract the rows with :func:`~scholar_retriever.fast_extract.article_rows`
+    instead of the parse tree when the markup allows it."""
+
+    def __init__(self, html: Union[str, bytes] = '', encoding: str = None) -> None:
+        super().__init__(html, encoding)
     
     def _parse_one_article( self, art: Tag ):
         
@@ -220,7 +433,7 @@ class AuthorArticlesParser(ParserBase):
         #### cited_by ####
         cited_by = art.find('td', class_='gsc_a_c')
         try:
-            cby_value = int(cited_by.find('a').text)
+            cby_value = NumberUtilities.parse_int(cited_by.find('a').text) or 0
         except Exception:
             cby_value = 0
         cby_link = cited_by.find('a')['href']
@@ -228,6 +441,8 @@ class AuthorArticlesParser(ParserBase):
         
         #### year ####
         year = art.find('td', class_='gsc_a_y').text
+        if self.typed_numbers:
+            year = NumberUtilities.parse_int(year)
         
         return {
             'title': title,
@@ -244,7 +459,15 @@ class AuthorArticlesParser(ParserBase):
         }
         
     def _parse(self):
-        articles_bs = self._soup.find('table', id='gsc_a_t')
+        if self.fast_extraction:
+            html = self.document.text
+            art_list = fast_extract.article_rows(html, self.typed_numbers) if html is not None else None
+            if art_list is not None:
+                return art_list
+
+        articles_bs = self.document.find('table', id='gsc_a_t')
+        if articles_bs is None:
+            raise PageError(PageKind.TRUNCATED)
         
         articles = articles_bs.find_all('tr', class_='gsc_a_tr')
 
@@ -256,7 +479,38 @@ class AuthorArticlesParser(ParserBase):
         return art_list
     
     def parse(self):
-        return self._parse()
+        return self._memoized(self._parse)
+
+
+def extract_many(
+    html: Union[str, bytes, ParsedDocument],
+    parsers: List[type],
+    encoding: str = None,
+) -> List[Any]:
+    """
+    Run several parsers over one page, building its parse tree only once.
+
+    .. code::
+
+        info, articles = extract_many(html, [AuthorInfoParser, AuthorArticlesParser])
+
+    :param html: The page or an already built :class:`ParsedDocument`.
+    :type html: str, bytes or ParsedDocument
+    :param parsers: :class:`ParserBase` subclasses to run.
+    :type parsers: List[type]
+    :param encoding: Charset of ``html`` when it is bytes. Defaults to None.
+    :type encoding: str, optional
+    :return: The result of ``parse()`` of every parser, in the same order.
+    :rtype: list
+    """
+    if isinstance(html, ParsedDocument):
+        return [p.from_document(html).parse() for p in parsers]
+
+    document = ParsedDocument(html, encoding)
+    results = [p.from_document(document).parse() for p in parsers]
+    if any(p.low_memory for p in parsers):
+        document.release()
+    return results
     
     
 if __name__ == '__main__': 
@@ -1,8 +1,13 @@
 from enum import Enum
 from typing import Any, Callable, Dict, List, Tuple
 
+from .page_classifier import PageError
 from .scholar_retriever import ScholarWebRetriever
-from .author_parser import AuthorInfoParser, CoAuthorsParser, AuthorArticlesParser
+from .author_parser import (
+    AuthorInfoParser,
+    CoAuthorsParser,
+    AuthorArticlesParser,
+)
 
 # Ejemplos para la lectura de publicaciones de un autor
 # https://scholar.google.es/citations?hl=en&user=izlC3EEAAAAJ&cstart=1&pagesize=5
@@ -79,6 +84,12 @@ class AuthorInfoRetriever(AuthorBase):
     This class inherits from AuthorBase.
     """
 
+    PAGE_MARKERS = (b' id="gsc_prf_in"',)
+    """Found on the profile header."""
+
+    PAGE_REQUIRED = (b' id="gsc_rsb_st"',)
+    """The table of the citation box, parsed with the header."""
+
     def __init__(
         self,
         author_id: str = None,
@@ -100,7 +111,6 @@ class AuthorInfoRetriever(AuthorBase):
 
         self.language = hl
         self.author_id = author_id
-        self._parser = AuthorInfoParser()
         self._result_author_info = {
             "author": None,
             "cited_by": None,
@@ -120,7 +130,14 @@ class AuthorInfoRetriever(AuthorBase):
         if not success:
             return (success, reason)
 
-        self._result_author_info = self._parser.parse(self.html)
+        try:
+            self._result_author_info = self._parse_content(
+                "author_info", AuthorInfoParser.from_document(self.document).parse
+            )
+        except PageError as e:
+            self._release_content()
+            return (False, str(e))
+        self._release_content()
 
         return (True, "Success")
 
@@ -153,6 +170,9 @@ class CoAuthorsRetriever(AuthorBase):
     This class inherits from AuthorBase.
     """
 
+    PAGE_MARKERS = (b' id="gsc_codb_content"',)
+    """Found on the co-author list."""
+
     def __init__(
         self,
         author_id: str = None,
@@ -172,7 +192,6 @@ class CoAuthorsRetriever(AuthorBase):
 
         super().__init__(author_id, hl, get_request_params)
         self.add_params(view_op="list_colleagues")
-        self._parser = CoAuthorsParser()
 
     def fetch(self) -> Tuple[bool, str]:
         """
@@ -186,7 +205,14 @@ class CoAuthorsRetriever(AuthorBase):
         if not success:
             return (success, reason)
 
-        self._result_coauthor = self._parser.parse(self.html)
+        try:
+            self._result_coauthor = self._parse_content(
+                "coauthors", CoAuthorsParser.from_document(self.document).parse
+            )
+        except PageError as e:
+            self._release_content()
+            return (False, str(e))
+        self._release_content()
 
         return (True, "Success")
 
@@ -227,6 +253,9 @@ class AuthorArticlesRetriever(AuthorBase):
 
     """
 
+    PAGE_MARKERS = (b' id="gsc_a_t"',)
+    """Found on the table of articles."""
+
     def __init__(
         self,
         author_id: str,
@@ -286,18 +315,20 @@ class AuthorArticlesRetriever(AuthorBase):
         self._results = list()
         cstart = self._start
 
-        while num < 0 or len(self._results) < num:
-            success, reason = self._fetch_page(cstart, self.page_size)
-            if not success:
-                return success, reason
+        # every page counts against one operation_timeout
+        with self._deadline_scope():
+            while num < 0 or len(self._results) < num:
+                success, reason = self._fetch_page(cstart, self.page_size)
+                if not success:
+                    return success, reason
 
-            page = reason
-            self._results.extend(page)
+                page = reason
+                self._results.extend(page)
 
-            if len(page) < self.page_size:
-                break
+                if len(page) < self.page_size:
+                    break
 
-            cstart += self.page_size
+                cstart += self.page_size
 
         if self._num > 0:
             self._results = self._results[0 : self._num]
@@ -326,7 +357,16 @@ class AuthorArticlesRetriever(AuthorBase):
             print(success, reason)
             return success, reason
 
-        return True, AuthorArticlesParser(self.html).parse()
+        try:
+            articles = self._parse_content(
+                "author_articles", AuthorArticlesParser.from_document(self.document).parse
+            )
+        except PageError as e:
+            self._release_content()
+            return False, str(e)
+        self._release_content()
+
+        return True, articles
 
     def get_json(self) -> Dict[str, List[Dict[str, Any]]]:
         """
@@ -356,8 +396,95 @@ class AuthorArticlesRetriever(AuthorBase):
                 )
 
 
-# class AuthorRetriever(AuthorInfoRetriever):
-#    def export_to_excel(self, reload: bool = None):
-#        pass
-#
-#    pass
+class AuthorRetriever(AuthorArticlesRetriever):
+    """
+    A class for retrieving the main information and the articles of an author
+    from Google Scholar.
+
+    The author page carries the profile header, the citation stats and the first
+    page of articles, so this class parses :class:`AuthorInfoRetriever` and
+    :class:`AuthorArticlesRetriever` data from the same response and only
+    requests the following pages of articles when there are more.
+
+    This class inherits from AuthorArticlesRetriever.
+    """
+
+    FIRST_PAGE_REQUIRED = AuthorInfoRetriever.PAGE_REQUIRED
+    """Required on the first page only, the one parsed for the citation box."""
+
+    def __init__(
+        self,
+        author_id: str,
+        hl: str = ScholarWebRetriever.HL_DEFAULT,
+        get_request_args: Callable[[], dict] = None,
+    ) -> None:
+        """
+        Initialize the AuthorRetriever object.
+
+        :param author_id: The unique identifier of the author.
+        :type author_id: str
+        :param hl: The language for the request. Default is the default language of ScholarWebRetriever.HL_DEFAULT.
+        :type hl: str, optional
+        :param get_request_args: A function that returns arguments for the GET request. Default is None.
+        :type get_request_args: Callable[[], dict], optional
+        """
+        super().__init__(author_id=author_id, hl=hl, get_request_args=get_request_args)
+        self._result_author_info = {
+            "author": None,
+            "cited_by": None,
+            "public_access": None,
+        }
+
+    def fetch(self) -> Tuple[bool, str]:
+        """
+        Fetch the author information and all the articles.
+
+        :return: A tuple indicating success (``True``) or failure (``False``) along with a reason.
+        :rtype: tuple[bool, str]
+        """
+        return self.fetch_citations()
+
+    def _page_required(self, params: dict) -> Tuple[bytes, ...]:
+        if params.get("cstart") == self._start:
+            return self.PAGE_REQUIRED + self.FIRST_PAGE_REQUIRED
+        return self.PAGE_REQUIRED
+
+    def _fetch_page(self, start: int, pagesize: int) -> List[Dict[str, Any]]:
+        """
+        Retrieve a page of articles. The first page also fills the author information.
+        """
+        if start != self._start:
+            return super()._fetch_page(start, pagesize)
+
+        self.add_params(cstart=start, pagesize=pagesize, sortby=self._sort_by)
+
+        success, reason = self.reload_web_content()
+
+        if not success:
+            return success, reason
+
+        try:
+            self._result_author_info = self._parse_content(
+                "author_info", AuthorInfoParser.from_document(self.document).parse
+            )
+            articles = self._parse_content(
+                "author_articles", AuthorArticlesParser.from_document(self.document).parse
+            )
+        except PageError as e:
+            self._release_content()
+            return False, str(e)
+        self._release_content()
+
+        return True, articles
+
+    def get_json(self) -> Dict[str, Any]:
+        """
+        Get the author information and the articles as a JSON object.
+
+        :return: The keys of :meth:`AuthorInfoRetriever.get_json` plus ``publications``.
+        :rtype: dict
+        """
+        ret = {}
+        ret.update(self._result_author_info)
+        ret.update(super().get_json())
+        return ret
@@ -0,0 +1,317 @@
+"""Index of the articles already seen across the profiles of many authors.
+
+A co-authored article is listed by the profile of every co-author, each time
+with its own ``citation_id`` (``<author_id>:<paper>``). :class:`ArticleDedupIndex`
+clusters those copies, so a crawl of a whole organization processes every
+article once::
+
+    from scholar_retriever.dedup_index import ArticleDedupIndex
+
+    index = ArticleDedupIndex()
+    for author_id in author_ids:
+        ...
+        for article in retriever.get_json()["publications"]:
+            cluster, new = index.add(article)
+            if new:
+                process(article)
+
+Two articles are the same article when they share one of their keys: one of
+the ids of their ``cited_by.cites_id``, or their normalized title plus their
+year (the fallback for articles without citations). Their full ``citation_id``
+is a key too, so an article added again from the same profile is found even if
+its citations or its title changed. The ``<paper>`` part of a ``citation_id`` is
+not a key: it is numbered within its profile and the same values show up in
+unrelated profiles. An article linking two known clusters merges them.
+
+Only a 64 bit hash of every key is kept, in an open addressing table of two
+flat arrays (``array('Q')`` for the hashes, ``array('I')`` for the clusters),
+plus one ``array('I')`` for the merges of clusters: about 17 bytes per key at
+the maximum load, with no Python object per article. The index can be saved
+to a file and loaded back to skip the articles of previous crawls.
+"""
+
+import hashlib
+import re
+import struct
+import sys
+import threading
+import unicodedata
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Tuple, Union
+
+_WORD = re.compile(r"\w+")
+
+_HEADER = struct.Struct("<4sIQQQQ")
+_MAGIC = b"SRDX"
+# 2: no key of the <paper> part of citation_id
+_VERSION = 2
+
+
+def normalize_title(title: str) -> str:
+    """
+    Lowercase words of a title, without accents or punctuation.
+
+    :param title: The title.
+    :type title: str
+    :rtype: str
+    """
+    title = title or ""
+    if not title.isascii():
+        title = unicodedata.normalize("NFKD", title)
+        title = "".join(c for c in title if not unicodedata.combining(c))
+    return " ".join(_WORD.findall(title.lower()))
+
+
+def _key_hash(key: str) -> int:
+    # 0 marks the empty slots of the table
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "little") or 1
+
+
+class ArticleDedupIndex(object):
+    """
+    Clusters of the copies of the same article found in different profiles.
+
+    Clusters are numbered from 0 in order of creation; after a merge the
+    cluster of an article is the lowest of the merged ones. The index is safe
+    to share between threads.
+    """
+
+    MIN_TITLE_WORDS = 3
+    """Shorter titles ("Editorial", "Preface"...) are not used as keys."""
+
+    MAX_LOAD = 0.7
+    """The table doubles when this fraction of its slots is taken."""
+
+    def __init__(self, capacity: int = 1 << 16) -> None:
+        """
+        Initialize an empty ArticleDedupIndex object.
+
+        :param capacity: Initial number of slots, rounded up to a power of
+            two. Set it to about twice the expected keys (one per article
+            added, plus two per distinct article) to avoid resizing. Defaults to 65536.
+        :type capacity: int, optional
+        """
+        size = 1
+        while size < capacity:
+            size <<= 1
+        self._keys = array("Q", bytes(8 * size))
+        self._clusters = array("I", bytes(4 * size))
+        self._parent = array("I")
+        self._mask = size - 1
+        self._count = 0
+        self._roots = 0
+        self._lock = threading.Lock()
+        self._stats = {"added": 0, "duplicates": 0, "merges": 0}
+
+    def keys(self, article: Dict[str, Any]) -> List[str]:
+        """
+        The keys of an article.
+
+        :param article: An article of :class:`~scholar_retriever.AuthorArticlesRetriever`
+            (or any dict with ``citation_id``, ``cited_by.cites_id``, ``title`` and ``year``).
+        :type article: dict
+        :rtype: List[str]
+        """
+        keys = []
+
+        # only the full id: the <paper> part is not unique across profiles
+        citation_id = article.get("citation_id")
+        if citation_id:
+            keys.append("citation:" + citation_id)
+
+        cites_id = (article.get("cited_by") or {}).get("cites_id")
+        if cites_id:
+            keys.extend("cites:" + c for c in cites_id.split(",") if c)
+
+        title = normalize_title(article.get("title"))
+        if title.count(" ") + 1 >= self.MIN_TITLE_WORDS:
+            year = article.get("year")
+            keys.append(f"title:{title}|{'' if year is None else str(year).strip()}")
+
+        return keys
+
+    def _slot(self, key_hash: int) -> int:
+        """
+        The slot of ``key_hash``, or the empty slot where it goes.
+        """
+        keys, mask = self._keys, self._mask
+        i = key_hash & mask
+        while True:
+            k = keys[i]
+            if k == key_hash or k == 0:
+                return i
+            i = (i + 1) & mask
+
+    def _find(self, cluster: int) -> int:
+        parent = self._parent
+        while parent[cluster] != cluster:
+            # path halving
+            parent[cluster] = parent[parent[cluster]]
+            cluster = parent[cluster]
+        return cluster
+
+    def _grow(self) -> None:
+        old_keys, old_clusters = self._keys, self._clusters
+        size = 2 * len(old_keys)
+        self._keys = array("Q", bytes(8 * size))
+        self._clusters = array("I", bytes(4 * size))
+        self._mask = size - 1
+        for k, c in zip(old_keys, old_clusters):
+            if k:
+                i = self._slot(k)
+                self._keys[i] = k
+                self._clusters[i] = c
+
+    def _lookup(self, hashes: List[int]) -> Tuple[List[int], List[int]]:
+        """
+        The clusters of the known hashes, and the unknown hashes.
+        """
+        roots, free = [], []
+        for h in hashes:
+            i = self._slot(h)
+            if self._keys[i]:
+                root = self._find(self._clusters[i])
+                if root not in roots:
+                    roots.append(root)
+            else:
+                free.append(h)
+        return roots, free
+
+    def add(self, article: Dict[str, Any]) -> Tuple[int, bool]:
+        """
+        Add an article to the index.
+
+        :param article: The article (see :meth:`keys`).
+        :type article: dict
+        :return: The cluster of the article and whether it is new: False if a
+            copy of the article was added before.
+        :rtype: tuple[int, bool]
+        """
+        hashes = list(dict.fromkeys(_key_hash(k) for k in self.keys(article)))
+
+        with self._lock:
+            self._stats["added"] += 1
+            roots, free = self._lookup(hashes)
+
+            if roots:
+                cluster = min(roots)
+                for root in roots:
+                    if root != cluster:
+                        self._parent[root] = cluster
+                        self._roots -= 1
+                        self._stats["merges"] += 1
+                self._stats["duplicates"] += 1
+            else:
+                # an article without keys gets a cluster of its own
+                cluster = len(self._parent)
+                self._parent.append(cluster)
+                self._roots += 1
+
+            for h in free:
+                if (self._count + 1) > self.MAX_LOAD * len(self._keys):
+                    self._grow()
+                i = self._slot(h)
+                self._keys[i] = h
+                self._clusters[i] = cluster
+                self._count += 1
+
+        return cluster, not roots
+
+    def cluster_of(self, article: Dict[str, Any]) -> Union[int, None]:
+        """
+        The cluster of an article, without adding it.
+
+        :param article: The article (see :meth:`keys`).
+        :type article: dict
+        :return: The cluster, or None if no copy of the article was added.
+        :rtype: int
+        """
+        hashes = [_key_hash(k) for k in self.keys(article)]
+        with self._lock:
+            roots, _ = self._lookup(hashes)
+        return min(roots) if roots else None
+
+    def __contains__(self, article: Dict[str, Any]) -> bool:
+        return self.cluster_of(article) is not None
+
+    def __len__(self) -> int:
+        """
+        Number of distinct articles (clusters).
+        """
+        return self._roots
+
+    def iter_new(self, articles: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """
+        Add the articles and yield the ones without a copy in the index.
+
+        :param articles: The articles (see :meth:`keys`).
+        :type articles: Iterable[dict]
+        :rtype: Iterator[dict]
+        """
+        for article in articles:
+            if self.add(article)[1]:
+                yield article
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Articles added, copies found, cluster merges, distinct articles, keys,
+        slots and bytes used by the arrays.
+
+        :rtype: Dict[str, int]
+        """
+        with self._lock:
+            return {
+                **self._stats,
+                "clusters": self._roots,
+                "keys": self._count,
+                "slots": len(self._keys),
+                "bytes": self._keys.itemsize * len(self._keys)
+                + self._clusters.itemsize * len(self._clusters)
+                + self._parent.itemsize * len(self._parent),
+            }
+
+    def save(self, path: str) -> None:
+        """
+        Write the index to a file.
+
+        :param path: The file.
+        :type path: str
+        """
+        with self._lock, open(path, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, _VERSION, len(self._keys), self._count, self._roots, len(self._parent)))
+            for arr in (self._keys, self._clusters, self._parent):
+                if sys.byteorder != "little":
+                    arr = array(arr.typecode, arr)
+                    arr.byteswap()
+                arr.tofile(f)
+
+    @classmethod
+    def load(cls, path: str) -> "ArticleDedupIndex":
+        """
+        Read an index written by :meth:`save`.
+
+        :param path: The file.
+        :type path: str
+        :raises ValueError: If the file is not an index.
+        :rtype: ArticleDedupIndex
+        """
+        index = cls(capacity=1)
+        with open(path, "rb") as f:
+            magic, version, size, count, roots, clusters = _HEADER.unpack(f.read(_HEADER.size))
+            if magic != _MAGIC or version != _VERSION:
+                raise ValueError(f"{path} is not an article index")
+
+            index._keys = array("Q")
+            index._keys.fromfile(f, size)
+            index._clusters = array("I")
+            index._clusters.fromfile(f, size)
+            index._parent = array("I")
+            index._parent.fromfile(f, clusters)
+
+        if sys.byteorder != "little":
+            for arr in (index._keys, index._clusters, index._parent):
+                arr.byteswap()
+        index._mask = size - 1
+        index._count = count
+        index._roots = roots
+        return index
@@ -0,0 +1,102 @@
+"""Fast extraction of the article table of an author page without a parse tree.
+
+:func:`article_rows` scans the ``gsc_a_t`` table once with precompiled patterns
+and produces exactly the dicts of
+:meth:`AuthorArticlesParser._parse_one_article
+<scholar_retriever.author_parser.AuthorArticlesParser._parse_one_article>`.
+It only accepts the markup it knows: when a row does not match, it returns
+``None`` and the caller falls back to the tree parser.
+"""
+
+import re
+from html import unescape
+from typing import Any, Dict, List, Union
+
+from .utils.tools import NumberUtilities, UrlUtilities
+
+PROFILE_URL_BASE = 'https://scholar.google.com'
+
+_TABLE_BODY = re.compile(r'<table id="gsc_a_t">.*?<tbody id="gsc_a_b">(.*?)</tbody>', re.S)
+
+_ROW_START = '<tr class="gsc_a_tr">'
+
+_ROW = re.compile(
+    r'<tr class="gsc_a_tr">'
+    r'<td class="gsc_a_t"><a href="(?P<href>[^"]*)" class="gsc_a_at">(?P<title>.*?)</a>'
+    r'<div class="gs_gray">(?P<authors>.*?)</div>'
+    r'<div class="gs_gray">(?P<publication>.*?)</div></td>'
+    r'<td class="gsc_a_c"><a href="(?P<cby_href>[^"]*)" class="gsc_a_ac[^"]*">(?P<cby>[^<]*)</a>'
+    r'(?:<span class="gsc_a_m">.*?</span>)?</td>'
+    r'<td class="gsc_a_y"><span class="gsc_a_h[^"]*">(?P<year>[^<]*)</span></td>'
+    r'</tr>',
+    re.S,
+)
+
+_TAG = re.compile(r'<[^>]*>')
+
+
+def _text(fragment: str) -> str:
+    """
+    Text of an html fragment, as ``Tag.text`` returns it.
+    """
+    if '<' in fragment:
+        fragment = _TAG.sub('', fragment)
+    if '&' in fragment:
+        fragment = unescape(fragment)
+    return fragment
+
+
+def article_rows(html: str, typed_numbers: bool = False) -> Union[List[Dict[str, Any]], None]:
+    """
+    Extract the articles of an author page.
+
+    :param html: The decoded author page.
+    :type html: str
+    :param typed_numbers: Give the year as ``int`` or None, as :attr:`ParserBase.typed_numbers
+        <scholar_retriever.author_parser.ParserBase.typed_numbers>` does. Defaults to False.
+    :type typed_numbers: bool, optional
+    :return: The articles, or None if the table markup is not the expected one.
+    :rtype: List[Dict[str, Any]] or None
+    """
+    table = _TABLE_BODY.search(html)
+    if table is None:
+        return None
+    body = table.group(1)
+
+    # comments and CDATA are not part of Tag.text; leave them to the tree parser
+    if '<!' in body:
+        return None
+
+    art_list = list()
+    end = 0
+    for m in _ROW.finditer(body):
+        if m.start() != end:
+            return None
+        end = m.end()
+
+        link = PROFILE_URL_BASE + unescape(m.group('href'))
+        cby_link = unescape(m.group('cby_href'))
+        cby_value = NumberUtilities.parse_int(_text(m.group('cby'))) or 0
+        year = _text(m.group('year'))
+        if typed_numbers:
+            year = NumberUtilities.parse_int(year)
+
+        art_list.append({
+            'title': _text(m.group('title')),
+            'link': link,
+            'citation_id': UrlUtilities.url_extract_get_param(link, 'citation_for_view'),
+            'authors': _text(m.group('authors')),
+            'publication': _text(m.group('publication')),
+            'cited_by': {
+                'value': cby_value,
+                'link': cby_link,
+                'cites_id': UrlUtilities.url_extract_get_param(cby_link, 'cites'),
+            },
+            'year': year,
+        })
+
+    # every row must have been matched, back to back
+    if end != len(body) or len(art_list) != body.count(_ROW_START):
+        return None
+
+    return art_list
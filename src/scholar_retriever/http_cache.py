@@ -0,0 +1,153 @@
+"""Revalidation cache for the pages retrieved from Google Scholar.
+
+:class:`ValidatorCache` keeps, for every request (endpoint plus params), the
+validators sent by the server (``ETag`` and ``Last-Modified``), the body and a
+hash of the body. On the next request for the same page the retrievers send
+``If-None-Match``/``If-Modified-Since``; a ``304 Not Modified`` answer reuses the
+stored body. The content hash detects unchanged pages when the server sends no
+validators, and parse results are stored next to the body so unchanged pages
+are not parsed again.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Union
+
+
+def content_hash(content: bytes) -> str:
+    """
+    Fast hash of a response body.
+
+    :param content: The raw body.
+    :type content: bytes
+    :return: A hex digest.
+    :rtype: str
+    """
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    return hashlib.blake2b(content or b"", digest_size=16).hexdigest()
+
+
+class CacheEntry(object):
+    """
+    Stored state of one page.
+    """
+
+    def __init__(
+        self,
+        body: bytes,
+        etag: str = None,
+        last_modified: str = None,
+        encoding: str = None,
+    ) -> None:
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.encoding = encoding
+        self.content_hash = content_hash(body)
+        self.stored_at = time.time()
+        self.parsed: Dict[str, Any] = {}
+        """Parse results of :attr:`body` by parser name. They must not be modified."""
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """
+        Headers that make the next request for this page conditional.
+        """
+        headers = {}
+        if self.etag is not None:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified is not None:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ValidatorCache(object):
+    """
+    A bounded, thread-safe, in-memory LRU of :class:`CacheEntry` by request key.
+    """
+
+    def __init__(self, max_entries: int = 10000) -> None:
+        """
+        Initialize the ValidatorCache object.
+
+        :param max_entries: Number of pages kept; the least recently used ones are dropped. Defaults to 10000.
+        :type max_entries: int, optional
+        """
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"not_modified": 0, "unchanged": 0, "changed": 0}
+
+    def get(self, key: Hashable) -> Union[CacheEntry, None]:
+        """
+        Get the entry of a request or None.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def not_modified(self, key: Hashable) -> Union[CacheEntry, None]:
+        """
+        Record a ``304`` answer for a request and return its entry.
+        """
+        with self._lock:
+            self._stats["not_modified"] += 1
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.stored_at = time.time()
+                self._entries.move_to_end(key)
+            return entry
+
+    def store(
+        self,
+        key: Hashable,
+        body: bytes,
+        etag: str = None,
+        last_modified: str = None,
+        encoding: str = None,
+    ) -> CacheEntry:
+        """
+        Store a ``200`` answer for a request.
+
+        If the body did not change the existing entry (and its parse results) is
+        kept and only the validators are updated.
+
+        :return: The entry of the request.
+        :rtype: CacheEntry
+        """
+        new_entry = CacheEntry(body, etag, last_modified, encoding)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.content_hash == new_entry.content_hash:
+                self._stats["unchanged"] += 1
+                entry.etag = etag
+                entry.last_modified = last_modified
+                entry.stored_at = new_entry.stored_at
+                self._entries.move_to_end(key)
+                return entry
+
+            if entry is not None:
+                self._stats["changed"] += 1
+            self._entries[key] = new_entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return new_entry
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Counters of ``304`` answers, unchanged bodies and changed bodies.
+        """
+        with self._lock:
+            ret = dict(self._stats)
+            ret["entries"] = len(self._entries)
+            return ret
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,295 @@
+"""Sticky client identities for the requests sent to Google Scholar.
+
+By default every request gets a random header template and no cookies, so it
+looks like a new browser each time. An :class:`IdentityManager` instead pins a
+header template, a proxy and a cookie jar together as an :class:`Identity` and
+reuses it for many requests, keeping the cookies set by the server as a browser
+would. An identity is replaced once it is older than ``max_age`` seconds, after
+``max_requests`` requests, after ``max_failures`` failures in a row, or as soon
+as a request made with it is blocked (``403``/``429`` or a CAPTCHA page).
+
+Set a manager for every retriever or for one of them::
+
+    from scholar_retriever.identity import IdentityManager
+    from scholar_retriever.scholar_retriever import ScholarWebRetriever
+
+    ScholarWebRetriever.identity_manager = IdentityManager(
+        proxies=["http://proxy-a:3128", "http://proxy-b:3128"], pool_size=2
+    )
+
+    for identity in ScholarWebRetriever.identity_manager.stats():
+        print(identity["id"], identity["proxy"], identity["success_rate"])
+"""
+
+import copy
+import itertools
+import logging
+import random
+import threading
+import time
+from collections import deque
+from http.cookiejar import CookieJar
+from logging import NullHandler
+from typing import Any, Dict, List, Union
+
+from requests.cookies import RequestsCookieJar
+
+from .utils.tools import HttpHeadersTemplate
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+logger.addHandler(NullHandler())
+
+
+class Identity(object):
+    """
+    A header template, a proxy and a cookie jar used together, with the
+    outcome of the requests made with them.
+    """
+
+    def __init__(self, id: int, headers: Dict[str, str], proxies: Dict[str, str] = None) -> None:
+        self.id = id
+        self.headers = headers
+        self.proxies = proxies
+        self.cookies = RequestsCookieJar()
+        """Cookies set by the server on the answers to this identity."""
+        self.created_at = time.monotonic()
+        self.last_used: float = None
+        self.requests = 0
+        self.successes = 0
+        self.failures = 0
+        self.blocks = 0
+        """Failures that were block signals; a block retires the identity."""
+        self.consecutive_failures = 0
+        self.retired = False
+        self._lock = threading.Lock()
+
+    @property
+    def age(self) -> float:
+        """Seconds since the identity was created."""
+        return time.monotonic() - self.created_at
+
+    @property
+    def success_rate(self) -> Union[float, None]:
+        """Share of the finished requests that succeeded, or None before the first one."""
+        done = self.successes + self.failures
+        return self.successes / done if done else None
+
+    def request_args(self) -> dict:
+        """
+        Arguments of a request made with this identity: ``headers``, ``proxies``
+        (if any) and a copy of the current ``cookies``.
+        """
+        with self._lock:
+            cookies = self.cookies.copy()
+
+        args = {"headers": dict(self.headers), "cookies": cookies}
+        if self.proxies:
+            args["proxies"] = dict(self.proxies)
+        return args
+
+    def update_cookies(self, cookies: CookieJar) -> None:
+        """
+        Keep the cookies set by the server on an answer.
+
+        :param cookies: The cookies of the answer.
+        :type cookies: http.cookiejar.CookieJar
+        """
+        if not cookies:
+            return
+        with self._lock:
+            for cookie in cookies:
+                self.cookies.set_cookie(cookie)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Counters of the identity as a dict.
+        """
+        proxy = None
+        if self.proxies:
+            proxy = self.proxies.get("https") or self.proxies.get("http") or self.proxies.get("all")
+        return {
+            "id": self.id,
+            "user_agent": self.headers.get("User-agent", self.headers.get("User-Agent")),
+            "proxy": proxy,
+            "age": self.age,
+            "requests": self.requests,
+            "successes": self.successes,
+            "failures": self.failures,
+            "blocks": self.blocks,
+            "success_rate": self.success_rate,
+            "cookies": len(self.cookies),
+            "retired": self.retired,
+        }
+
+
+class IdentityManager(object):
+    """
+    A thread-safe pool of :class:`Identity` shared by the retrievers.
+
+    The requests are spread round-robin over ``pool_size`` identities. New
+    identities take a random header template and the next proxy of the list.
+    """
+
+    BLOCK_STATUS = (403, 429)
+    """HTTP status codes taken as block signals."""
+
+    def __init__(
+        self,
+        templates: List[Dict[str, str]] = None,
+        proxies: List[Union[str, Dict[str, str]]] = None,
+        pool_size: int = 1,
+        max_age: float = 900,
+        max_requests: int = 200,
+        max_failures: int = 3,
+        max_history: int = 100,
+        seed: int = None,
+    ) -> None:
+        """
+        Initialize the IdentityManager object.
+
+        :param templates: Header templates to choose from. Defaults to
+            :attr:`HttpHeadersTemplate.DEFAULT_TEMPLATES`.
+        :type templates: list[dict], optional
+        :param proxies: Proxies used in turn by the new identities, as a URL
+            (used for http and https) or as a ``requests`` proxies dict.
+            Defaults to no proxy.
+        :type proxies: list, optional
+        :param pool_size: Identities in use at the same time. Defaults to 1.
+        :type pool_size: int, optional
+        :param max_age: Seconds an identity is used. None for no limit. Defaults to 900.
+        :type max_age: float, optional
+        :param max_requests: Requests made with an identity. None for no limit. Defaults to 200.
+        :type max_requests: int, optional
+        :param max_failures: Failures in a row that retire an identity. None for no limit. Defaults to 3.
+        :type max_failures: int, optional
+        :param max_history: Retired identities kept for :meth:`stats`. Defaults to 100.
+        :type max_history: int, optional
+        :param seed: Seed of the template choice. Defaults to a random one.
+        :type seed: int, optional
+        """
+        self.templates = templates or HttpHeadersTemplate.DEFAULT_TEMPLATES
+        self.proxies = [
+            {"http": p, "https": p} if isinstance(p, str) else p for p in proxies or []
+        ]
+        self.pool_size = max(1, pool_size)
+        self.max_age = max_age
+        self.max_requests = max_requests
+        self.max_failures = max_failures
+
+        self._random = random.Random(seed)
+        self._ids = itertools.count(1)
+        self._proxy_index = 0
+        self._pool: List[Identity] = []
+        self._next = 0
+        self._retired: "deque[Identity]" = deque(maxlen=max_history)
+        self._lock = threading.Lock()
+
+    def _new_identity(self) -> Identity:
+        proxies = None
+        if self.proxies:
+            proxies = self.proxies[self._proxy_index % len(self.proxies)]
+            self._proxy_index += 1
+        headers = copy.deepcopy(self._random.choice(self.templates))
+        return Identity(next(self._ids), headers, proxies)
+
+    def _expired(self, identity: Identity) -> bool:
+        if identity.retired:
+            return True
+        if self.max_age is not None and identity.age >= self.max_age:
+            return True
+        return self.max_requests is not None and identity.requests >= self.max_requests
+
+    def _retire(self, identity: Identity, reason: str) -> None:
+        # called with the lock held
+        if identity.retired:
+            return
+        identity.retired = True
+        self._retired.append(identity)
+        logger.info(f"Identity {identity.id} retired ({reason})")
+
+    def acquire(self) -> Identity:
+        """
+        The identity to use for the next request. Expired identities are
+        replaced by new ones.
+
+        :rtype: Identity
+        """
+        with self._lock:
+            if len(self._pool) < self.pool_size:
+                identity = self._new_identity()
+                self._pool.append(identity)
+            else:
+                self._next = (self._next + 1) % len(self._pool)
+                identity = self._pool[self._next]
+                if self._expired(identity):
+                    self._retire(identity, "expired")
+                    identity = self._pool[self._next] = self._new_identity()
+
+            identity.requests += 1
+            identity.last_used = time.monotonic()
+            return identity
+
+    def report(
+        self, identity: Identity, success: bool, blocked: bool = False, cookies: CookieJar = None
+    ) -> None:
+        """
+        Record the outcome of a request made with ``identity``.
+
+        :param identity: The identity given by :meth:`acquire`.
+        :type identity: Identity
+        :param success: Whether the request succeeded.
+        :type success: bool
+        :param blocked: Whether the failure was a block signal. The identity is retired at once.
+        :type blocked: bool, optional
+        :param cookies: Cookies set by the server on the answer.
+        :type cookies: http.cookiejar.CookieJar, optional
+        """
+        identity.update_cookies(cookies)
+        with self._lock:
+            if success:
+                identity.successes += 1
+                identity.consecutive_failures = 0
+                return
+
+            identity.failures += 1
+            identity.consecutive_failures += 1
+            if blocked:
+                identity.blocks += 1
+                self._retire(identity, "blocked")
+            elif self.max_failures is not None and identity.consecutive_failures >= self.max_failures:
+                self._retire(identity, "failures")
+
+    def is_block(self, error: Exception) -> bool:
+        """
+        Whether a request error is a block signal: a blocked page or one of
+        the :attr:`BLOCK_STATUS` codes.
+
+        :param error: The error raised by the request.
+        :type error: Exception
+        :rtype: bool
+        """
+        if getattr(error, "blocked", False):
+            return True
+        resp = getattr(error, "response", None)
+        return getattr(resp, "status_code", None) in self.BLOCK_STATUS
+
+    def identities(self) -> List[Identity]:
+        """
+        The identities in use.
+        """
+        with self._lock:
+            return list(self._pool)
+
+    def stats(self, retired: bool = True) -> List[Dict[str, Any]]:
+        """
+        Counters and success rate of every identity (see :meth:`Identity.stats`).
+
+        :param retired: Include the last retired identities. Defaults to True.
+        :type retired: bool, optional
+        :rtype: list[dict]
+        """
+        with self._lock:
+            identities = list(self._retired) if retired else []
+            identities += [i for i in self._pool if not i.retired]
+            return [i.stats() for i in identities]
@@ -0,0 +1,119 @@
+"""Cheap classification of the pages answered by Google Scholar, before parsing.
+
+Google Scholar answers some requests with a ``200`` that is not the page asked
+for: a CAPTCHA ("unusual traffic") page, a cookie consent page, or a page
+without the expected content. :func:`classify_page` labels a body with a
+:class:`PageKind` by looking for a few byte strings, without decoding it or
+building a tree. The retrievers run it on every downloaded page and raise a
+:class:`PageError` for anything but :attr:`PageKind.OK`, so the bad page is
+neither cached nor parsed, and the error drives the retries, the identity
+rotation and the rate limiter backoff like an HTTP error would.
+"""
+
+from enum import Enum
+from typing import Any, Sequence
+
+
+class PageKind(Enum):
+    """
+    Kinds of page told apart by :func:`classify_page`.
+    """
+
+    OK = "ok"
+    BLOCKED = "blocked"
+    """CAPTCHA or "unusual traffic" page."""
+    CONSENT = "consent"
+    """Cookie consent page."""
+    NOT_FOUND = "not_found"
+    """A page without the expected content."""
+    TRUNCATED = "truncated"
+    """A page cut short (without its closing ``</html>``), or the expected page
+    missing a part that is always on it."""
+    EMPTY = "empty"
+    """No body, or a body without markup."""
+
+
+# plain substring searches: much faster than a regex over a full page
+_BLOCKED = (b"gs_captcha", b"captcha-form", b"g-recaptcha", b"/sorry/", b"unusual traffic", b"not a robot")
+_CONSENT = (b"consent.google.", b"consent.youtube.")
+
+
+def classify_page(
+    content: bytes, url: str = None, markers: Sequence[bytes] = (), required: Sequence[bytes] = ()
+) -> PageKind:
+    """
+    Label a page from its raw bytes.
+
+    A complete page that contains one of ``markers`` and all of ``required``
+    is :attr:`PageKind.OK` right away, which is the common case; the other
+    checks only run on the remaining pages.
+
+    :param content: The raw body.
+    :type content: bytes
+    :param url: The final URL of the answer, after redirects.
+    :type url: str, optional
+    :param markers: Byte strings found on the expected page (an id or a class
+        name, with its markup). Without markers any page that is not blocked, a
+        consent page or empty is :attr:`PageKind.OK`, complete or not.
+    :type markers: Sequence[bytes], optional
+    :param required: Byte strings of the parts of the expected page that are
+        always on it. A page with a marker but without one of them is
+        :attr:`PageKind.TRUNCATED`.
+    :type required: Sequence[bytes], optional
+    :rtype: PageKind
+    """
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    content = content or b""
+
+    # only the tail is searched, pages end with the tag
+    complete = b"</html>" in content[-256:].lower()
+
+    for marker in markers:
+        if marker in content:
+            if complete and all(part in content for part in required):
+                return PageKind.OK
+            return PageKind.TRUNCATED
+
+    if url and ("/sorry/" in url or "ipv4.google.com" in url):
+        return PageKind.BLOCKED
+    if url and "consent." in url:
+        return PageKind.CONSENT
+    if not content or content.isspace() or b"<" not in content:
+        return PageKind.EMPTY
+    if any(marker in content for marker in _BLOCKED):
+        return PageKind.BLOCKED
+    if any(marker in content for marker in _CONSENT):
+        return PageKind.CONSENT
+    if markers:
+        return PageKind.NOT_FOUND if complete else PageKind.TRUNCATED
+    return PageKind.OK
+
+
+class PageError(Exception):
+    """
+    Raised when a downloaded page is not the page asked for.
+    """
+
+    def __init__(self, kind: PageKind, response: Any = None) -> None:
+        """
+        Initialize the PageError object.
+
+        :param kind: What the page is.
+        :type kind: PageKind
+        :param response: The answer that carried the page.
+        """
+        self.kind = kind
+        self.response = response
+        url = getattr(response, "url", None)
+        super().__init__(f"The page is {kind.value}" + (f" for url: {url}" if url else ""))
+
+    @property
+    def blocked(self) -> bool:
+        """Whether the page is a block signal."""
+        return self.kind == PageKind.BLOCKED
+
+    @property
+    def retryable(self) -> bool:
+        """Whether asking again may give the expected page."""
+        return self.kind != PageKind.NOT_FOUND
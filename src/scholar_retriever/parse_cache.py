@@ -0,0 +1,135 @@
+"""Memoization of parse results keyed on the content of the parsed HTML.
+
+Identical HTML (a cache hit, a replayed response, the same page requested by
+two retrievers) always produces the same parse result, so :class:`ParseCache`
+stores results under a hash of the HTML bytes plus the name and version of the
+parser. A bounded in-memory LRU serves hot entries and an optional directory
+keeps results between runs.
+
+Enable it for every parser with::
+
+    from scholar_retriever.author_parser import ParserBase
+    from scholar_retriever.parse_cache import ParseCache
+
+    ParserBase.parse_cache = ParseCache(max_entries=2048, disk_dir="parse_cache")
+"""
+
+import os
+import pickle
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable
+
+_MISSING = object()
+
+
+class ParseCache(object):
+    """
+    Two tier (memory LRU and optional disk) cache of parse results.
+
+    Cached results are shared between callers and must not be modified.
+    """
+
+    def __init__(self, max_entries: int = 1024, disk_dir: str = None) -> None:
+        """
+        Initialize the ParseCache object.
+
+        :param max_entries: Number of results kept in memory. Defaults to 1024.
+        :type max_entries: int, optional
+        :param disk_dir: Directory for the on-disk tier. Disabled if None (default).
+        :type disk_dir: str, optional
+        """
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        if disk_dir is not None:
+            os.makedirs(disk_dir, exist_ok=True)
+
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key[:2], key + ".pickle")
+
+    def _memory_put(self, key: str, value: Any) -> None:
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """
+        Get a cached result.
+
+        :param key: The key built by the parser.
+        :type key: str
+        :param default: Value returned on a miss. Defaults to None.
+        """
+        with self._lock:
+            value = self._entries.get(key, _MISSING)
+            if value is not _MISSING:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return value
+
+        if self.disk_dir is not None:
+            try:
+                with open(self._disk_path(key), "rb") as f:
+                    value = pickle.load(f)
+            except (OSError, pickle.PickleError, EOFError):
+                value = _MISSING
+
+            if value is not _MISSING:
+                with self._lock:
+                    self._memory_put(key, value)
+                    self._stats["disk_hits"] += 1
+                return value
+
+        with self._lock:
+            self._stats["misses"] += 1
+        return default
+
+    def put(self, key: str, value: Any) -> None:
+        """
+        Store a result in memory and, if enabled, on disk.
+        """
+        with self._lock:
+            self._memory_put(key, value)
+
+        if self.disk_dir is None:
+            return
+
+        path = self._disk_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # write then rename, so concurrent readers never see partial files
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)
+        except Exception:
+            os.unlink(tmp)
+            raise
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Hit and miss counters and the hit rate (memory and disk hits over lookups).
+        """
+        with self._lock:
+            ret: Dict[str, Any] = dict(self._stats)
+            ret["entries"] = len(self._entries)
+
+        lookups = ret["hits"] + ret["disk_hits"] + ret["misses"]
+        ret["hit_rate"] = (ret["hits"] + ret["disk_hits"]) / lookups if lookups else 0.0
+        return ret
+
+    def clear(self) -> None:
+        """
+        Drop the in-memory tier and reset the counters. The disk tier is kept.
+        """
+        with self._lock:
+            self._entries.clear()
+            for k in self._stats:
+                self._stats[k] = 0
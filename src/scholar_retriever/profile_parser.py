@@ -1,5 +1,8 @@
 from bs4 import BeautifulSoup
 import bs4
+import re
+from html import unescape
+from typing import Union
 #from .constants import PROFILE_URL_BASE
 from .utils import tools
 
@@ -26,13 +29,8 @@ def _single_profile_parser( profile: bs4.BeautifulSoup ):
 	author_email = profile.find('div', class_='gs_ai_eml').text
 
 	# cited by
-	author_citedby = 0
 	citedby = profile.find('div', class_='gs_ai_cby').text
-	if citedby != '':
-		try:
-			author_citedby = int(citedby.split(' ')[-1])
-		except Exception:
-			author_citedby = 0
+	author_citedby = tools.NumberUtilities.parse_int(citedby) or 0
 
 	# interests
 	interests = profile.find( 'div', class_='gs_ai_int' )
@@ -110,7 +108,38 @@ def _pagination_data_parse( web_html: bs4.BeautifulSoup ):
 
 	return pagination
 
-def profiles_search_parser( html: str ) -> list:
+_NEXT_BUTTON = re.compile( rb'<button\b[^>]*\bgsc_pgn_pnx\b[^>]*>' )
+_ONCLICK = re.compile( rb'\bonclick="([^"]*)"' )
+
+def next_page_token( html: Union[str, bytes], encoding: str = None ) -> Union[str, None]:
+	'''
+	Get the token of the next page (``after_author``) without parsing the page.
+
+	It gives the same token as the ``pagination`` of :func:`profiles_search_parser`,
+	so the next page can be requested while this one is still being parsed.
+
+	:return: The token or None if this is the last page.
+	'''
+	if isinstance(html, str):
+		html = html.encode('utf-8')
+		encoding = 'utf-8'
+
+	button = _NEXT_BUTTON.search(html)
+	if button is None:
+		return None
+
+	onclick = _ONCLICK.search(button.group(0))
+	if onclick is None:
+		return None
+
+	# same cleaning as _pagination_data_parse
+	link = unescape( onclick.group(1).decode(encoding or 'utf-8', 'replace') )
+	link = link.replace( 'window.location=', '' )
+	link = link[1:-2].replace( '\\x3d', '=' ).replace('\\x26', '&')
+
+	return tools.UrlUtilities.url_extract_get_param( PROFILE_URL_BASE + link, 'after_author' )
+
+def profiles_search_parser( html: Union[str, bytes], encoding: str = None, release: bool = False ) -> dict:
 	'''
 	Scrape info from a profile google scholar search page and return it
 	as a dict.
@@ -127,9 +156,16 @@ def profiles_search_parser( html: str ) -> list:
 			}
 		}
 
+	:param html: The page, preferably the raw bytes of the response.
+	:param encoding: Charset of ``html`` when it is bytes. Detected from the document if None.
+	:param release: Decompose the parse tree before returning, so its memory is freed right away.
+
 	'''
 
-	soup = BeautifulSoup( html, 'html.parser' )
+	if isinstance(html, bytes):
+		soup = BeautifulSoup( html, 'html.parser', from_encoding=encoding )
+	else:
+		soup = BeautifulSoup( html, 'html.parser' )
 
 	# get profile list
 	profiles_ret = _profile_list_parse( soup )
@@ -137,6 +173,9 @@ def profiles_search_parser( html: str ) -> list:
 	# get pagination data	
 	pagination = _pagination_data_parse(soup)
 
+	if release:
+		soup.decompose()
+
 	ret = {
 		'profiles': profiles_ret,
 		'pagination' : pagination,
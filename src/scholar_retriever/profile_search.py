@@ -1,9 +1,14 @@
 import logging
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from logging import NullHandler
-from typing import Callable, Tuple, Dict, Any, Union
+from typing import Callable, Tuple, Dict, Any, Iterator, Union
 
 from .scholar_retriever import ScholarWebRetriever, PaginateBase
 from . import profile_parser as pp
+from .author_retriever import AuthorInfoRetriever
 from .utils.tools import UrlUtilities
 logger = logging.getLogger( __name__ )
 logger.setLevel(logging.INFO)
@@ -19,7 +24,28 @@ class ProfileSearch(ScholarWebRetriever, PaginateBase):
     """
     
     URL_ENDPOINT = "https://scholar.google.es/citations"
-    
+
+    PAGE_MARKERS = (b"gsc_sa_ccl",)
+    """Found on the list of profiles, even when it is empty."""
+
+    ENRICH_SETTINGS = (
+        "URL_ENDPOINT",
+        "transport",
+        "single_flight",
+        "rate_limiter",
+        "scheduler",
+        "queue_timeout",
+        "timeout",
+        "operation_timeout",
+        "validator_cache",
+        "identity_manager",
+        "low_memory",
+        "keep_html",
+    )
+    """Settings that the default retriever of :meth:`iter_enriched` takes from
+    this search when they are set on the instance. Settings set on the classes
+    apply to both anyway."""
+
     def __init__(self, get_request_params: Callable[[], dict] = None) -> None:
         """
         Initialize the ProfileSearch object.
@@ -72,7 +98,9 @@ class ProfileSearch(ScholarWebRetriever, PaginateBase):
         
         return self._reload_page()
 
-    def search_by_organization(self, org_id: str, hl: str = ScholarWebRetriever.HL_DEFAULT) -> Tuple[bool, str]:
+    def search_by_organization(
+        self, org_id: str, hl: str = ScholarWebRetriever.HL_DEFAULT, after_author: str = None
+    ) -> Tuple[bool, str]:
         """
         Search for profiles by organization.
 
@@ -80,6 +108,8 @@ class ProfileSearch(ScholarWebRetriever, PaginateBase):
         :type org_id: str
         :param hl: The language for the search. Defaults to ScholarWebRetriever.HL_DEFAULT.
         :type hl: str, optional
+        :param after_author: Token of the page to start from (see :attr:`after_author`). Defaults to None.
+        :type after_author: str, optional
         :return: A tuple indicating success (``True``) or failure (``False``) along with an error message.
         :rtype: tuple[bool, str]
         """
@@ -88,6 +118,7 @@ class ProfileSearch(ScholarWebRetriever, PaginateBase):
         self.add_params(org=org_id)
         self.add_params(view_op='view_org')
         self.add_params(hl=hl)
+        self.add_params(after_author=after_author)
         self._results = {}
         
         return self._reload_page()
@@ -148,7 +179,11 @@ class ProfileSearch(ScholarWebRetriever, PaginateBase):
         success, error = self.reload_web_content()
         
         if success:
-            self._results = pp.profiles_search_parser( self.html )
+            self._results = self._parse_content(
+                "profile_search",
+                lambda: pp.profiles_search_parser( self.html, self.encoding, self.low_memory ),
+            )
+            self._release_content()
             return True, 'Success'
 
         return False, error
@@ -219,6 +254,201 @@ class ProfileSearch(ScholarWebRetriever, PaginateBase):
 
         return self._reload_page()
 
+    def iter_pages(self, prefetch: int = 1, max_pages: int = None) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over the pages of the current search, starting with the current page.
+
+        A background thread requests page N+1 as soon as its ``after_author``
+        token is read from page N, while page N is still being parsed and
+        consumed. After every page is yielded the object is positioned on it,
+        so :meth:`get_json` and :meth:`next_page` keep working.
+
+        .. code::
+
+            search.search_by_organization(org_id)
+            for page in search.iter_pages(prefetch=2):
+                for profile in page['profiles']:
+                    ...
+
+        :param prefetch: Pages requested or waiting in the buffer ahead of the
+            page being consumed. Defaults to 1.
+        :type prefetch: int, optional
+        :param max_pages: Stop after this number of pages. Defaults to no limit.
+        :type max_pages: int, optional
+        :return: Pages with the structure of :meth:`get_json`.
+        :rtype: Iterator[Dict[str, Any]]
+        :raises Exception: If a page can not be fetched or read, once the pages
+            before it were yielded.
+        """
+        if not self._results:
+            return
+
+        # the pages count against one operation_timeout, from the first one
+        with self._deadline_scope():
+            pages = 1
+            yield self._results
+
+            token = self._results.get("pagination", {}).get("next_page_token")
+            if token is None or (max_pages is not None and pages >= max_pages):
+                return
+
+            # a slot is taken before a page is requested and given back when the
+            # consumer takes the page, so at most ``prefetch`` pages are ahead
+            slots = threading.Semaphore(max(1, prefetch))
+            buffer: "queue.Queue[Tuple[dict, Any]]" = queue.Queue()
+            stop = threading.Event()
+            base_params = dict(self.params)
+            base_params.pop("before_author", None)
+
+            def reserve() -> bool:
+                # blocks while the buffer is full, gives up if the consumer is gone
+                while not stop.is_set():
+                    if slots.acquire(timeout=0.1):
+                        return True
+                return False
+
+            def produce(token):
+                try:
+                    fetched = 1
+                    while token is not None:
+                        if max_pages is not None and fetched >= max_pages:
+                            break
+                        if not reserve():
+                            return
+                        params = dict(base_params, after_author=token)
+                        success, result = self._fetch(params)
+                        if not success:
+                            buffer.put((None, Exception(f"Page iteration stopped: {result}")))
+                            return
+                        buffer.put((params, result))
+                        fetched += 1
+                        token = pp.next_page_token(result.content, result.encoding)
+                    buffer.put((None, None))
+                except Exception as e:
+                    buffer.put((None, e))
+
+            producer = threading.Thread(target=produce, args=(token,), daemon=True)
+            producer.start()
+
+            try:
+                while True:
+                    params, result = buffer.get()
+                    if params is None:
+                        if result is not None:
+                            raise result
+                        return
+                    slots.release()
+
+                    self.params = params
+                    self._after_author = params["after_author"]
+                    self._load_result(result)
+                    self._results = self._parse_content(
+                        "profile_search",
+                        lambda: pp.profiles_search_parser(self.html, self.encoding, self.low_memory),
+                    )
+                    self._release_content()
+                    yield self._results
+            finally:
+                stop.set()
+
+    def iter_profiles(self, prefetch: int = 1, max_pages: int = None) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over the profiles of all the pages of the current search.
+
+        See :meth:`iter_pages` for the parameters.
+
+        :return: Profiles with the structure of ``get_json()['profiles']``.
+        :rtype: Iterator[Dict[str, Any]]
+        """
+        for page in self.iter_pages(prefetch, max_pages):
+            yield from page["profiles"]
+
+    def iter_enriched(
+        self,
+        max_workers: int = 4,
+        ordered: bool = True,
+        prefetch: int = 1,
+        max_pages: int = None,
+        retriever_factory: Callable[[str], ScholarWebRetriever] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over the profiles of all the pages of the current search, adding
+        the author details of every profile.
+
+        Details are fetched by a pool of ``max_workers`` threads while the next
+        pages of the search are still being requested (see :meth:`iter_pages`).
+        The default retrievers get the :attr:`ENRICH_SETTINGS` set on this
+        search (its :attr:`rate_limiter`, :attr:`transport`...), so their
+        requests share them with the ones of the search.
+
+        Every profile gets a ``details`` key with the ``get_json()`` of the
+        retriever (an :class:`~scholar_retriever.AuthorInfoRetriever` by
+        default), or None with the reason in ``details_error`` if it failed.
+
+        :param max_workers: Number of details fetched at the same time. Defaults to 4.
+        :type max_workers: int, optional
+        :param ordered: Yield profiles in search order (``True``) or as soon as their details arrive (``False``). Defaults to True.
+        :type ordered: bool, optional
+        :param prefetch: Search pages fetched ahead. Defaults to 1.
+        :type prefetch: int, optional
+        :param max_pages: Stop after this number of search pages. Defaults to no limit.
+        :type max_pages: int, optional
+        :param retriever_factory: Builds the retriever of an author id. Defaults to AuthorInfoRetriever with the language, request args and :attr:`ENRICH_SETTINGS` of this search, in the ``batch`` :attr:`~ScholarWebRetriever.priority` class.
+        :type retriever_factory: Callable[[str], ScholarWebRetriever], optional
+        :return: Profiles with the structure of ``get_json()['profiles']`` plus ``details``.
+        :rtype: Iterator[Dict[str, Any]]
+        :raises Exception: If a page of the search fails (see :meth:`iter_pages`).
+        """
+        if retriever_factory is None:
+            hl = self.language
+            request_args = self.get_request_args
+            settings = {name: value for name, value in vars(self).items() if name in self.ENRICH_SETTINGS}
+
+            def retriever_factory(author_id):
+                retriever = AuthorInfoRetriever(author_id, hl, request_args)
+                for name, value in settings.items():
+                    setattr(retriever, name, value)
+                retriever.priority = "batch"
+                return retriever
+
+        def enrich(profile):
+            retriever = retriever_factory(profile["author_id"])
+            try:
+                success, reason = retriever.fetch()
+            except Exception as e:
+                success, reason = False, repr(e)
+            if not success:
+                return dict(profile, details=None, details_error=reason)
+            return dict(profile, details=retriever.get_json())
+
+        # bound the profiles waiting for details, so a fast search can not run away
+        max_pending = max_workers * 4
+        pending = deque()
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            try:
+                for profile in self.iter_profiles(prefetch, max_pages):
+                    pending.append(pool.submit(enrich, profile))
+
+                    if ordered:
+                        while pending and (pending[0].done() or len(pending) >= max_pending):
+                            yield pending.popleft().result()
+                    else:
+                        done = [f for f in pending if f.done()]
+                        if not done and len(pending) >= max_pending:
+                            done = [next(as_completed(pending))]
+                        for f in done:
+                            pending.remove(f)
+                            yield f.result()
+
+                futures = list(pending) if ordered else as_completed(list(pending))
+                for f in futures:
+                    yield f.result()
+                pending.clear()
+            finally:
+                for f in pending:
+                    f.cancel()
+
     @property
     def after_author(self) -> Union[str, None]:
         """
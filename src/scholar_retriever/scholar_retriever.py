@@ -1,10 +1,18 @@
 import logging
 import random
+import time
+from contextlib import contextmanager
 from logging import NullHandler
-from typing import Callable, Tuple
-
-import requests
-
+from email.message import Message
+from http.cookiejar import CookieJar
+from typing import Any, Callable, Dict, Iterator, Tuple, Union
+
+from .author_parser import ParsedDocument
+from .http_cache import CacheEntry, ValidatorCache, content_hash
+from .identity import Identity, IdentityManager
+from .page_classifier import PageError, PageKind, classify_page
+from .transport import DeadlineExceeded, RequestsTransport, Transport, TransportResponse
+from .utils.concurrency import PriorityScheduler, RateLimiter, SingleFlight
 from .utils.tools import HttpHeadersTemplate
 
 logger = logging.getLogger(__name__)
@@ -19,6 +27,93 @@ class ScholarWebRetriever(object):
 
     HL_DEFAULT = "en"
 
+    ACCEPT_ENCODING = HttpHeadersTemplate.ACCEPT_ENCODING
+    """Value of the Accept-Encoding header sent on every request."""
+
+    READ_CHUNK_SIZE = 64 * 1024
+    """Size of the chunks read (and decompressed) from the response stream."""
+
+    PAGE_MARKERS: Tuple[bytes, ...] = ()
+    """Byte strings of the expected page. A page with none of them is not parsed
+    (see :func:`~scholar_retriever.page_classifier.classify_page`). Ids are given
+    with their markup (``b' id="gsc_a_t"'``): the bare names are also in the
+    style sheet and the scripts of every page, even of a page cut after ``<head>``."""
+
+    PAGE_REQUIRED: Tuple[bytes, ...] = ()
+    """Byte strings always on the expected page. A page with a marker but
+    without one of them is truncated: it is not parsed and the request is retried."""
+
+    BLOCK_BACKOFF = 30.0
+    """Seconds the :attr:`rate_limiter` holds every request after a blocked page
+    or a ``429`` without ``Retry-After``."""
+
+    transport: Transport = RequestsTransport()
+    """Sends the requests. Set an :class:`~scholar_retriever.transport.HTTP2Transport`
+    on the class to multiplex the requests of every retriever, or on an instance."""
+
+    single_flight = SingleFlight()
+    """Collapses identical in-flight requests (same endpoint and params) of all retrievers."""
+
+    rate_limiter: RateLimiter = None
+    """Limits the requests per second of all retrievers sharing it. Disabled if None.
+
+    Set it on the class to apply one limit to every retriever or on an instance.
+    """
+
+    scheduler: PriorityScheduler = None
+    """Orders the requests of all retrievers sharing it by :attr:`priority`
+    class and bounds how many run at once. Disabled if None.
+
+    Set it on the class to schedule every retriever or on an instance.
+    """
+
+    priority: str = "normal"
+    """Class of the requests of this retriever in the :attr:`scheduler`. Every
+    retriever is ``normal`` by default; set ``interactive`` on the instances
+    answering a user and ``batch`` on the ones of a bulk crawl."""
+
+    queue_timeout: float = None
+    """Seconds a request may wait for a :attr:`scheduler` slot. Requests with a
+    timeout go before the others of their class, earliest first. Defaults to
+    waiting as long as needed."""
+
+    timeout: Union[float, Tuple[float, float]] = (10.0, 30.0)
+    """Connect and read timeouts of every request in seconds, as ``requests``
+    takes them: a ``(connect, read)`` tuple or one number for both. The read
+    timeout is the longest silence between two chunks of the answer. A
+    ``timeout`` given by :attr:`request_args_callback` wins. None waits forever."""
+
+    operation_timeout: float = None
+    """Seconds an operation may take as a whole: a ``fetch()`` with its
+    retries, every page of a multi-page fetch or of a search pagination. The
+    waits for the :attr:`scheduler` and the :attr:`rate_limiter` count, the
+    timeouts of every request are cut to the time left and a request still
+    running when it runs out is dropped. Defaults to no limit."""
+
+    validator_cache: ValidatorCache = None
+    """Cache used to revalidate pages with conditional requests. Disabled if None.
+
+    Set it on the class to share one cache between all retrievers or on an instance.
+    """
+
+    identity_manager: IdentityManager = None
+    """Pins a header template, a proxy and a cookie jar together and reuses them
+    across requests, rotating them on block signals. Disabled if None (every
+    request gets the args of :attr:`request_args_callback` and no cookies).
+
+    Set it on the class to share the identities between all retrievers or on an instance.
+    """
+
+    low_memory: bool = False
+    """Release the raw page and its parse tree as soon as the page is parsed.
+
+    Meant for long running crawls with many retriever objects alive. The parse
+    results are kept; :meth:`get_html` returns None unless :attr:`keep_html` is set.
+    """
+
+    keep_html: bool = False
+    """Keep the raw page for :meth:`get_html` in :attr:`low_memory` mode."""
+
     def __init__(self, get_request_args: Callable[[], dict]) -> None:
         """
         Initialize the ScholarWebRetriever object.
@@ -36,6 +131,15 @@ class ScholarWebRetriever(object):
         # params used for request call
         self._params = {}
 
+        self.html = None
+        self.encoding = None
+        self.wire_bytes = 0
+        self.content_hash = None
+        self.not_modified = False
+        self._cache_entry = None
+        self._document = None
+        self._deadline = None
+
     @property
     def language(self):
         """
@@ -113,47 +217,442 @@ class ScholarWebRetriever(object):
             self.get_request_args = self._default_get_request_args
 
 
+    @contextmanager
+    def _deadline_scope(self) -> Iterator[None]:
+        """
+        Run an operation within :attr:`operation_timeout`. An operation started
+        by another one shares the deadline of the outer one.
+        """
+        if self._deadline is not None or self.operation_timeout is None:
+            yield
+            return
+
+        self._deadline = time.monotonic() + self.operation_timeout
+        try:
+            yield
+        finally:
+            self._deadline = None
+
+    def _time_left(self) -> Union[float, None]:
+        """
+        Seconds left to the current operation, None if it has no deadline.
+        """
+        if self._deadline is None:
+            return None
+        return self._deadline - time.monotonic()
+
+    def _request_key(self, params: dict) -> Tuple[str, Tuple[Tuple[str, str], ...]]:
+        """
+        Key that identifies identical requests: the endpoint plus the sorted params.
+        """
+        return (
+            self.URL_ENDPOINT,
+            tuple(sorted((str(k), str(v)) for k, v in params.items())),
+        )
+
+    def _do_request(self, params: dict, request_args: dict) -> "FetchResult":
+        """
+        Send the GET request.
+
+        If a :attr:`validator_cache` is set the request is conditional and a
+        ``304`` answer is resolved with the stored body.
+
+        :raises requests.HTTPError: If the status is an error.
+        :raises PageError: If the page is not the expected one (blocked, consent...).
+        :raises TimeoutError: If the :attr:`scheduler` had no slot within :attr:`queue_timeout`.
+        :raises DeadlineExceeded: If the operation ran out of time.
+        :raises Exception: If the request fails (the error of the :attr:`transport`).
+        """
+        key = self._request_key(params)
+        cache = self.validator_cache
+        entry = cache.get(key) if cache is not None else None
+
+        headers = {
+            k: v
+            for k, v in request_args.get("headers", {}).items()
+            if k.lower() != "accept-encoding"
+        }
+        headers["Accept-Encoding"] = self.ACCEPT_ENCODING
+        if entry is not None:
+            headers.update(entry.conditional_headers())
+        request_args = {**request_args, "headers": headers}
+
+        logger.info(f"Sending request in {self.URL_ENDPOINT} with {params}")
+        try:
+            resp = self._send_scheduled(params, request_args)
+        except Exception as e:
+            self._back_off(e)
+            # a request timeout cut to the time left is the deadline too, so
+            # the callers sharing the request know it was not their failure
+            if self._out_of_time() and not isinstance(e, DeadlineExceeded):
+                raise DeadlineExceeded(f"Deadline exceeded for {self.URL_ENDPOINT}: {e}") from e
+            raise
+        content = resp.content
+        wire_bytes = resp.wire_bytes
+
+        if resp.status_code == 304 and entry is not None:
+            entry = cache.not_modified(key) or entry
+            return FetchResult(
+                entry.body, resp.status_code, resp.headers, entry, entry.encoding, wire_bytes, resp.cookies
+            )
+
+        # a bad page is neither cached nor parsed
+        kind = classify_page(content, resp.url, self.PAGE_MARKERS, self._page_required(params))
+        if kind != PageKind.OK:
+            error = PageError(kind, resp)
+            self._back_off(error)
+            raise error
+
+        encoding = self._charset_from_headers(resp.headers)
+        if cache is not None:
+            entry = cache.store(
+                key,
+                content,
+                etag=resp.headers.get("ETag"),
+                last_modified=resp.headers.get("Last-Modified"),
+                encoding=encoding,
+            )
+
+        return FetchResult(
+            content, resp.status_code, resp.headers, entry, encoding, wire_bytes, resp.cookies
+        )
+
+    def _page_required(self, params: dict) -> Tuple[bytes, ...]:
+        """
+        The :attr:`PAGE_REQUIRED` of the page requested with ``params``.
+        """
+        return self.PAGE_REQUIRED
+
+    def _send_scheduled(self, params: dict, request_args: dict) -> TransportResponse:
+        """
+        Send the request once the :attr:`scheduler` and the :attr:`rate_limiter` allow it.
+
+        :raises TimeoutError: If no scheduler slot was free within :attr:`queue_timeout`.
+        :raises DeadlineExceeded: If the operation ran out of time while waiting.
+        """
+        deadline = self._deadline
+        scheduler = self.scheduler
+        if scheduler is not None:
+            queue_deadline = deadline
+            if self.queue_timeout is not None:
+                queue_deadline = time.monotonic() + self.queue_timeout
+                if deadline is not None:
+                    queue_deadline = min(queue_deadline, deadline)
+            if not scheduler.acquire(self.priority, queue_deadline):
+                if deadline is not None and queue_deadline == deadline:
+                    raise DeadlineExceeded(
+                        f"Deadline exceeded waiting for a {self.priority} scheduler slot for {self.URL_ENDPOINT}"
+                    )
+                raise TimeoutError(
+                    f"No {self.priority} scheduler slot for {self.URL_ENDPOINT} within {self.queue_timeout}s"
+                )
+
+        try:
+            # only the requests holding a slot wait for the rate limiter, so
+            # its first come first served order does not undo the priorities
+            if self.rate_limiter is not None:
+                left = None if deadline is None else max(0.0, deadline - time.monotonic())
+                if not self.rate_limiter.acquire(left):
+                    raise DeadlineExceeded(
+                        f"Deadline exceeded waiting for the rate limiter for {self.URL_ENDPOINT}"
+                    )
+            return self.transport.request(
+                self.URL_ENDPOINT, params, request_args, self.READ_CHUNK_SIZE, deadline
+            )
+        finally:
+            if scheduler is not None:
+                scheduler.release(self.priority)
+
+    def _back_off(self, e: Exception) -> None:
+        """
+        Hold the requests of the :attr:`rate_limiter` after a block signal: a
+        blocked page, a ``403`` or a ``429`` (for its ``Retry-After`` seconds).
+        """
+        if self.rate_limiter is None:
+            return
+
+        resp = getattr(e, "response", None)
+        status = getattr(resp, "status_code", None)
+        if not getattr(e, "blocked", False) and status not in (403, 429):
+            return
+
+        seconds = self.BLOCK_BACKOFF
+        retry_after = resp.headers.get("Retry-After") if resp is not None else None
+        if retry_after and retry_after.strip().isdigit():
+            seconds = float(retry_after)
+
+        logger.info(f"Backing off {seconds}s after a block signal in {self.URL_ENDPOINT}")
+        self.rate_limiter.backoff(seconds)
+
+    @staticmethod
+    def _charset_from_headers(headers: Dict[str, str]) -> Union[str, None]:
+        """
+        The charset declared on the Content-Type header, if any.
+
+        Without it the parsers detect the encoding from the bytes (meta tags).
+        """
+        content_type = headers.get("Content-Type")
+        if not content_type:
+            return None
+        msg = Message()
+        msg["Content-Type"] = content_type
+        return msg.get_content_charset()
+
+    def _flight_key(self, params: dict, identity: Union[Identity, None]) -> Tuple[Any, ...]:
+        """
+        Key of identical in-flight requests. Requests made with different
+        identities are never shared: the answer, its cookies and its outcome
+        belong to the identity that sent it.
+        """
+        key = self._request_key(params)
+        return key if identity is None else (key, identity)
+
+    def _send_request(
+        self, params: dict, request_args: dict, identity: Identity = None
+    ) -> "FetchResult":
+        """
+        Send the GET request. Identical requests in flight (same identity) share one network call.
+
+        A shared call that ran out of the time of the caller that started it
+        is sent again for the callers with time left.
+
+        :raises Exception: If the request fails or the status is an error.
+        """
+        while True:
+            try:
+                return self.single_flight.do(
+                    self._flight_key(params, identity),
+                    lambda: self._do_request(params, request_args),
+                    self._time_left(),
+                )
+            except DeadlineExceeded:
+                if self._out_of_time():
+                    raise
+
+    async def _send_request_async(
+        self, params: dict, request_args: dict, identity: Identity = None
+    ) -> "FetchResult":
+        """
+        Asynchronous version of :meth:`_send_request`.
+        """
+        while True:
+            try:
+                return await self.single_flight.do_async(
+                    self._flight_key(params, identity),
+                    lambda: self._do_request(params, request_args),
+                    timeout=self._time_left(),
+                )
+            except DeadlineExceeded:
+                if self._out_of_time():
+                    raise
+
+    def _load_result(self, result: "FetchResult") -> None:
+        self.html = result.content
+        self.encoding = result.encoding
+        self.wire_bytes = result.wire_bytes
+        self.content_hash = result.content_hash
+        self.not_modified = result.not_modified
+        self._cache_entry = result.cache_entry
+        self._document = None
+
+    def _clear_result(self) -> None:
+        self.html = None
+        self.encoding = None
+        self.content_hash = None
+        self._cache_entry = None
+        self._document = None
+
+    @property
+    def document(self) -> ParsedDocument:
+        """
+        The current page as a :class:`~scholar_retriever.author_parser.ParsedDocument`,
+        built on first use and shared by the parsers of the page.
+        """
+        if self._document is None:
+            self._document = ParsedDocument(self.html, self.encoding)
+        return self._document
+
+    def _release_content(self) -> None:
+        """
+        Called once every parser of the page ran. Forget the parse tree and, in
+        :attr:`low_memory` mode, decompose it and drop the raw page (unless
+        :attr:`keep_html`).
+        """
+        document, self._document = self._document, None
+        if not self.low_memory:
+            return
+
+        if document is not None:
+            document.release()
+        if not self.keep_html:
+            self.html = None
+
+    def _parse_content(self, parser_name: str, parse: Callable[[], Any]) -> Any:
+        """
+        Parse the current content unless the same content was already parsed.
+
+        With a :attr:`validator_cache`, the result of ``parse`` is stored next to
+        the cached body; a page that answered ``304`` or whose content hash did
+        not change reuses it without parsing.
+
+        :param parser_name: Identifies the kind of parse result.
+        :type parser_name: str
+        :param parse: Callable that parses :attr:`html`.
+        :type parse: Callable[[], Any]
+        """
+        entry = self._cache_entry
+        if entry is None or entry.content_hash != self.content_hash:
+            return parse()
+
+        if parser_name not in entry.parsed:
+            entry.parsed[parser_name] = parse()
+        return entry.parsed[parser_name]
+
+    def _fetch(self, params: dict, retry: int = 3) -> Tuple[bool, Union["FetchResult", str]]:
+        """
+        Request a page with the given params, retrying on failure.
+
+        Unlike :meth:`reload_web_content` it does not change the state of the
+        retriever, so it can run on a background thread.
+
+        :return: ``(True, FetchResult)`` or ``(False, error message)``.
+        :rtype: tuple[bool, Union[FetchResult, str]]
+        """
+        error = ""
+        while retry > 0:
+            if self._out_of_time():
+                return (False, self._deadline_error(error))
+            kwargs, identity = self._request_args()
+            try:
+                result = self._send_request(params, kwargs, identity)
+                self._report_identity(identity, result)
+                return (True, result)
+            except Exception as e:
+                self._report_identity(identity, error=e)
+                error = self._request_failed(e, kwargs)
+                # a page that does not exist will not show up on a retry
+                retry = retry - 1 if getattr(e, "retryable", True) else 0
+
+        return (False, error)
+
     def reload_web_content(self, retry: int = 3) -> Tuple[bool, str]:
         """
         Reloads the web content from the specified URL endpoint.
+        :param retry: The number of retries if the request fails initially. Default is 3.
+        :type retry: int, optional
+        :return: A tuple indicating success (``True``) or failure (``False``) along with an error message.
+        :rtype: tuple[bool, str]
+        """
+        with self._deadline_scope():
+            success, result = self._fetch(dict(self._params), retry)
+
+        if not success:
+            self._clear_result()
+            return (False, result)
+
+        self._load_result(result)
+        return (True, "Success")
+
+    async def reload_web_content_async(self, retry: int = 3) -> Tuple[bool, str]:
+        """
+        Asynchronous version of :meth:`reload_web_content`.
+
+        The request runs on the default executor of the running loop and shares
+        in-flight requests with threaded callers.
+
         :param retry: The number of retries if the request fails initially. Default is 3.
         :type retry: int, optional
         :return: A tuple indicating success (``True``) or failure (``False``) along with an error message.
         :rtype: tuple[bool, str]
         """
         error = ""
-        while retry > 0:
-            try:
-                kwargs = self.get_request_args()
-                resp = requests.request(
-                    "GET", self.URL_ENDPOINT, params=self._params, **kwargs
-                )
-                logger.info(
-                    f"Sending request in {self.URL_ENDPOINT} with {self._params}"
-                )
-                resp.raise_for_status()
-                # print(resp.content)
-                self.html = resp.content
-                break
-                # print(json.dumps( ans, indent=2, ensure_ascii=False ))
-                # print( ans['profiles'][1]['name'] )
-            except Exception as e:
-                print(e)
-                print("Details:")
-                print(f"Headers-req: {kwargs}")
-                print(f"Headers-resp: {resp.headers}")
-                error = e.__str__
-                self.html = None
-                retry -= 1
+        with self._deadline_scope():
+            while retry > 0:
+                if self._out_of_time():
+                    error = self._deadline_error(error)
+                    retry = 0
+                    break
+                kwargs, identity = self._request_args()
+                params = dict(self._params)
+                try:
+                    result = await self._send_request_async(params, kwargs, identity)
+                    self._report_identity(identity, result)
+                    self._load_result(result)
+                    break
+                except Exception as e:
+                    self._report_identity(identity, error=e)
+                    error = self._request_failed(e, kwargs)
+                    # a page that does not exist will not show up on a retry
+                    retry = retry - 1 if getattr(e, "retryable", True) else 0
 
         if retry == 0:
+            self._clear_result()
             return (False, error)
 
         return (True, "Success")
 
+    def _out_of_time(self) -> bool:
+        """
+        Whether the operation has no time left for another attempt.
+        """
+        left = self._time_left()
+        return left is not None and left <= 0
+
+    def _deadline_error(self, error: str) -> str:
+        message = f"Deadline exceeded: the operation took more than {self.operation_timeout}s"
+        return f"{message}, last error: {error}" if error else message
+
+    def _request_args(self) -> Tuple[dict, Union[Identity, None]]:
+        """
+        Arguments of the next request and the identity they come from.
+
+        With an :attr:`identity_manager`, the headers, proxies and cookies of
+        the identity replace the ones given by :attr:`request_args_callback`.
+        """
+        kwargs = self.get_request_args()
+        if self.timeout is not None and "timeout" not in kwargs:
+            kwargs = {**kwargs, "timeout": self.timeout}
+        manager = self.identity_manager
+        if manager is None:
+            return (kwargs, None)
+
+        identity = manager.acquire()
+        return ({**kwargs, **identity.request_args()}, identity)
+
+    def _report_identity(
+        self, identity: Union[Identity, None], result: "FetchResult" = None, error: Exception = None
+    ) -> None:
+        """
+        Tell the :attr:`identity_manager` how a request made with ``identity`` went.
+        """
+        # running out of time says nothing about the identity
+        if identity is None or isinstance(error, DeadlineExceeded):
+            return
+
+        manager = self.identity_manager
+        if error is None:
+            manager.report(identity, True, cookies=result.cookies)
+        else:
+            resp = getattr(error, "response", None)
+            manager.report(
+                identity, False, blocked=manager.is_block(error), cookies=getattr(resp, "cookies", None)
+            )
+
+    def _request_failed(self, e: Exception, request_args: dict) -> str:
+        print(e)
+        print("Details:")
+        print(f"Headers-req: {request_args}")
+        resp = getattr(e, "response", None)
+        if resp is not None:
+            print(f"Headers-resp: {resp.headers}")
+        # some errors (the timeouts of httpx) have no message
+        return str(e) or repr(e)
+
     def get_html(self):
         """
         Get the raw HTML content retrieved from the request call..
+
+        In :attr:`low_memory` mode it is only kept if :attr:`keep_html` is set.
         """
         return self.html
 
@@ -171,6 +670,38 @@ class ScholarWebRetriever(object):
         }
 
 
+class FetchResult(object):
+    """
+    The body and metadata of one answered request.
+    """
+
+    def __init__(
+        self,
+        content: bytes,
+        status_code: int,
+        headers: Dict[str, str],
+        cache_entry: CacheEntry = None,
+        encoding: str = None,
+        wire_bytes: int = 0,
+        cookies: CookieJar = None,
+    ) -> None:
+        self.content = content
+        self.encoding = encoding
+        """Charset declared by the server or None."""
+        self.wire_bytes = wire_bytes
+        """Bytes received on the wire, before decompression."""
+        self.status_code = status_code
+        self.headers = headers
+        self.cookies = cookies
+        """Cookies set by the server on the answer."""
+        self.cache_entry = cache_entry
+        self.not_modified = status_code == 304
+        if cache_entry is not None:
+            self.content_hash = cache_entry.content_hash
+        else:
+            self.content_hash = content_hash(content)
+
+
 class PaginateBase:
     """Actuate like an interface for paginated webs."""
 
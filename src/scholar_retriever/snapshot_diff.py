@@ -0,0 +1,288 @@
+"""Change detection between two crawls of the same author.
+
+An :class:`AuthorSnapshot` keeps a content hash of every record last seen for
+an author (the profile, the citation table, every article by ``citation_id``
+and every co-author by ``author_id``) plus the numbers that change most often
+(the ``cited_by.value`` of every article and the citations per year of the
+graph), instead of the records themselves. :meth:`AuthorSnapshot.diff` compares
+a new result of :class:`~scholar_retriever.AuthorInfoRetriever`,
+:class:`~scholar_retriever.AuthorArticlesRetriever`,
+:class:`~scholar_retriever.CoAuthorsRetriever` or
+:class:`~scholar_retriever.AuthorRetriever` with it, updates it and returns the
+delta: only what changed, with the full record only for new or modified ones::
+
+    from scholar_retriever.snapshot_diff import AuthorSnapshot
+
+    snapshot = AuthorSnapshot.from_dict(stored) if stored else AuthorSnapshot(author_id)
+    delta = snapshot.diff(retriever)
+    if delta:
+        index.write(delta)
+    stored = snapshot.to_dict()
+
+A delta is ``{}`` when nothing changed, otherwise ``author_id`` plus the keys
+that changed among:
+
+- ``profile``: the new ``author`` and ``public_access`` of the profile.
+- ``table``: the new citation table.
+- ``graph``: ``{'added': [...], 'changed': [...]}``, years of the graph as
+  ``{'year', 'citations'}``, with the ``previous`` citations for the changed ones.
+- ``articles``: ``{'added': [...], 'removed': [...], 'cited_by': [...], 'changed': [...]}``;
+  new and modified articles in full, removed ``citation_id``, and
+  ``{'citation_id', 'value', 'previous'}`` for the articles whose only change is
+  their ``cited_by.value``.
+- ``coauthors``: ``{'added': [...], 'removed': [...], 'changed': [...]}``, by ``author_id``.
+
+The articles and the co-authors must be complete lists: a record missing from
+the new result is reported as removed.
+"""
+
+import json
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+from .http_cache import content_hash
+
+
+def record_hash(record: Any) -> str:
+    """
+    Hash of a JSON record, independent of the order of its keys.
+
+    :param record: A JSON serializable value.
+    :return: A hex digest.
+    :rtype: str
+    """
+    return content_hash(
+        json.dumps(record, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    )
+
+
+def _article_fingerprint(article: Dict[str, Any]) -> Tuple[str, Any]:
+    """
+    Hash of an article without its ``cited_by.value``, and that value.
+    """
+    cited_by = dict(article.get("cited_by") or {})
+    value = cited_by.pop("value", None)
+    return record_hash({**article, "cited_by": cited_by}), value
+
+
+def _by_key(records: Iterable[Dict[str, Any]], key: str) -> Dict[str, Dict[str, Any]]:
+    # records without a key can not be followed between crawls
+    return {r[key]: r for r in records if r.get(key)}
+
+
+class AuthorSnapshot(object):
+    """
+    Content hashes of the records last seen for one author.
+
+    Snapshots are plain data: store :meth:`to_dict` (it is JSON serializable)
+    between crawls and rebuild them with :meth:`from_dict`.
+    """
+
+    def __init__(self, author_id: str) -> None:
+        """
+        Initialize an empty AuthorSnapshot object: every record is new to it.
+
+        :param author_id: The unique identifier of the author.
+        :type author_id: str
+        """
+        self.author_id = author_id
+        self.profile: str = None
+        """Hash of ``author`` and ``public_access``."""
+        self.table: str = None
+        """Hash of ``cited_by.table``."""
+        self.graph: Dict[int, int] = None
+        """Citations per year."""
+        self.articles: Dict[str, Tuple[str, Any]] = None
+        """``(hash, cited_by.value)`` by ``citation_id``."""
+        self.coauthors: Dict[str, str] = None
+        """Hash by ``author_id``."""
+
+    def diff_info(self, info: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Compare the result of :class:`~scholar_retriever.AuthorInfoRetriever`
+        and take it as the new state.
+
+        :param info: The ``get_json()`` of the retriever.
+        :type info: dict
+        :return: The ``profile``, ``table`` and ``graph`` entries of the delta that changed.
+        :rtype: dict
+        """
+        delta: Dict[str, Any] = {}
+
+        profile = {"author": info.get("author"), "public_access": info.get("public_access")}
+        profile_hash = record_hash(profile)
+        if profile_hash != self.profile:
+            delta["profile"] = profile
+            self.profile = profile_hash
+
+        cited_by = info.get("cited_by") or {}
+        table = cited_by.get("table")
+        table_hash = record_hash(table)
+        if table_hash != self.table:
+            delta["table"] = table
+            self.table = table_hash
+
+        previous = self.graph or {}
+        graph = {p["year"]: p["citations"] for p in cited_by.get("graph") or []}
+        added = [{"year": y, "citations": c} for y, c in graph.items() if y not in previous]
+        changed = [
+            {"year": y, "citations": c, "previous": previous[y]}
+            for y, c in graph.items()
+            if y in previous and previous[y] != c
+        ]
+        if added or changed:
+            delta["graph"] = {"added": added, "changed": changed}
+        self.graph = graph
+
+        return delta
+
+    def diff_articles(self, articles: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Compare the articles of :class:`~scholar_retriever.AuthorArticlesRetriever`
+        and take them as the new state.
+
+        :param articles: Every article of the author (``get_json()['publications']``).
+        :type articles: List[dict]
+        :return: The ``articles`` entry of the delta, or ``{}`` if none changed.
+        :rtype: dict
+        """
+        previous = self.articles or {}
+        current = {}
+        added, changed, cited_by = [], [], []
+
+        for citation_id, article in _by_key(articles, "citation_id").items():
+            fingerprint = _article_fingerprint(article)
+            current[citation_id] = fingerprint
+
+            old = previous.get(citation_id)
+            if old is None:
+                added.append(article)
+            elif old[0] != fingerprint[0]:
+                changed.append(article)
+            elif old[1] != fingerprint[1]:
+                cited_by.append(
+                    {"citation_id": citation_id, "value": fingerprint[1], "previous": old[1]}
+                )
+
+        removed = [citation_id for citation_id in previous if citation_id not in current]
+        self.articles = current
+
+        if not (added or removed or changed or cited_by):
+            return {}
+        return {
+            "articles": {"added": added, "removed": removed, "cited_by": cited_by, "changed": changed}
+        }
+
+    def diff_coauthors(self, coauthors: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Compare the co-authors of :class:`~scholar_retriever.CoAuthorsRetriever`
+        and take them as the new state.
+
+        :param coauthors: Every co-author (``get_json()['coauthors']``).
+        :type coauthors: List[dict]
+        :return: The ``coauthors`` entry of the delta, or ``{}`` if none changed.
+        :rtype: dict
+        """
+        previous = self.coauthors or {}
+        current = {}
+        added, changed = [], []
+
+        for author_id, coauthor in _by_key(coauthors, "author_id").items():
+            current[author_id] = record_hash(coauthor)
+            old = previous.get(author_id)
+            if old is None:
+                added.append(coauthor)
+            elif old != current[author_id]:
+                changed.append(coauthor)
+
+        removed = [author_id for author_id in previous if author_id not in current]
+        self.coauthors = current
+
+        if not (added or removed or changed):
+            return {}
+        return {"coauthors": {"added": added, "removed": removed, "changed": changed}}
+
+    def diff(self, result: Any) -> Dict[str, Any]:
+        """
+        Compare a new result of the author and take it as the new state.
+
+        The parts compared are the ones the result has: the profile (``author``
+        and ``cited_by``), the articles (``publications``) and the co-authors
+        (``coauthors``), so the results of every author retriever can be given,
+        one after the other.
+
+        :param result: A retriever that fetched the author, or its ``get_json()``.
+        :return: The delta (see :mod:`scholar_retriever.snapshot_diff`), ``{}`` if nothing changed.
+        :rtype: dict
+        """
+        if hasattr(result, "get_json"):
+            result = result.get_json()
+
+        delta: Dict[str, Any] = {}
+        if "author" in result or "cited_by" in result:
+            delta.update(self.diff_info(result))
+        if result.get("publications") is not None:
+            delta.update(self.diff_articles(result["publications"]))
+        if result.get("coauthors") is not None:
+            delta.update(self.diff_coauthors(result["coauthors"]))
+
+        if delta:
+            delta = {"author_id": self.author_id, **delta}
+        return delta
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        The snapshot as a JSON serializable dict.
+
+        :rtype: dict
+        """
+        return {
+            "author_id": self.author_id,
+            "profile": self.profile,
+            "table": self.table,
+            # JSON object keys are strings, the years are kept as numbers
+            "graph": None if self.graph is None else sorted(self.graph.items()),
+            "articles": None if self.articles is None else {k: list(v) for k, v in self.articles.items()},
+            "coauthors": self.coauthors,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "AuthorSnapshot":
+        """
+        Rebuild a snapshot stored with :meth:`to_dict`.
+
+        :param data: The stored dict.
+        :type data: dict
+        :rtype: AuthorSnapshot
+        """
+        snapshot = cls(data["author_id"])
+        snapshot.profile = data.get("profile")
+        snapshot.table = data.get("table")
+        if data.get("graph") is not None:
+            snapshot.graph = {y: c for y, c in data["graph"]}
+        if data.get("articles") is not None:
+            snapshot.articles = {k: tuple(v) for k, v in data["articles"].items()}
+        snapshot.coauthors = data.get("coauthors")
+        return snapshot
+
+
+def diff_authors(
+    snapshots: Dict[str, AuthorSnapshot], results: Iterable[Tuple[str, Any]]
+) -> Iterator[Dict[str, Any]]:
+    """
+    Compare the results of a crawl with the snapshots of the previous one.
+
+    :param snapshots: Snapshots by ``author_id``. Authors seen for the first
+        time get a new snapshot, so every record of theirs is reported as added.
+    :type snapshots: Dict[str, AuthorSnapshot]
+    :param results: ``(author_id, result)`` pairs, the results as taken by :meth:`AuthorSnapshot.diff`.
+    :type results: Iterable[Tuple[str, Any]]
+    :return: The non-empty deltas.
+    :rtype: Iterator[dict]
+    """
+    for author_id, result in results:
+        snapshot = snapshots.get(author_id)
+        if snapshot is None:
+            snapshot = snapshots[author_id] = AuthorSnapshot(author_id)
+        delta = snapshot.diff(result)
+        if delta:
+            yield delta
@@ -0,0 +1,327 @@
+"""HTTP transports used by the retrievers to send their requests.
+
+A transport sends one GET request and returns a :class:`TransportResponse`
+with the decoded body. :class:`RequestsTransport` (the default) sends every
+request with ``requests``, on its own HTTP/1.1 connection.
+:class:`HTTP2Transport` multiplexes the concurrent requests of all the
+retrievers over a few HTTP/2 connections per host. It needs ``httpx`` with
+HTTP/2 support (``pip install scholar_retriever[http2]``).
+
+Select a transport for every retriever or for one of them::
+
+    from scholar_retriever.scholar_retriever import ScholarWebRetriever
+    from scholar_retriever.transport import HTTP2Transport
+
+    ScholarWebRetriever.transport = HTTP2Transport()   # all the retrievers
+    retriever.transport = HTTP2Transport()             # only this one
+
+Both transports take the ``deadline`` of the operation of the retriever: the
+connect and read timeouts of the request are cut to the time left, and a body
+still being read when the deadline passes is dropped with its connection.
+"""
+
+import asyncio
+import concurrent.futures
+import logging
+import threading
+import time
+from http.cookiejar import CookieJar, DefaultCookiePolicy
+from logging import NullHandler
+from typing import Any, Dict, Tuple, Union
+
+import requests
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+logger.addHandler(NullHandler())
+
+
+class DeadlineExceeded(TimeoutError):
+    """
+    Raised when the time budget of an operation runs out before its request is answered.
+    """
+
+    retryable = False
+    """A retry would start with no time left."""
+
+
+def _time_left(deadline: Union[float, None], url: str) -> Union[float, None]:
+    """
+    Seconds until ``deadline`` (a :func:`time.monotonic` time), None without deadline.
+
+    :raises DeadlineExceeded: If the deadline already passed.
+    """
+    if deadline is None:
+        return None
+    left = deadline - time.monotonic()
+    if left <= 0:
+        raise DeadlineExceeded(f"Deadline exceeded for url: {url}")
+    return left
+
+
+def _clamp_timeout(timeout: Any, left: Union[float, None]) -> Any:
+    """
+    Cut a ``requests`` style timeout (seconds or a ``(connect, read)`` tuple) to ``left`` seconds.
+    """
+    if left is None:
+        return timeout
+    if timeout is None:
+        return left
+    if isinstance(timeout, tuple):
+        return tuple(left if t is None else min(t, left) for t in timeout)
+    return min(timeout, left)
+
+
+class TransportResponse(object):
+    """
+    The answer to a request, with the body already read and decoded.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        status_code: int,
+        headers: Dict[str, str],
+        content: bytes,
+        wire_bytes: int = 0,
+        http_version: str = None,
+        cookies: CookieJar = None,
+    ) -> None:
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        """Response headers, case-insensitive."""
+        self.content = content
+        self.wire_bytes = wire_bytes
+        """Bytes received on the wire, before decompression."""
+        self.http_version = http_version
+        self.cookies = cookies
+        """Cookies set by the server on this answer."""
+
+    def raise_for_status(self) -> None:
+        """
+        Raise ``requests.HTTPError`` for ``4xx`` and ``5xx`` answers, as ``requests`` does.
+        """
+        if 400 <= self.status_code < 600:
+            kind = "Client" if self.status_code < 500 else "Server"
+            raise requests.HTTPError(
+                f"{self.status_code} {kind} Error for url: {self.url}", response=self
+            )
+
+
+class Transport(object):
+    """Actuate like an interface for the transports."""
+
+    def request(
+        self,
+        url: str,
+        params: dict,
+        request_args: dict,
+        chunk_size: int = 64 * 1024,
+        deadline: float = None,
+    ) -> TransportResponse:
+        """
+        Send a GET request and read the whole (decoded) body.
+
+        :param url: The endpoint.
+        :type url: str
+        :param params: Query params.
+        :type params: dict
+        :param request_args: Extra arguments of the request, as given by the
+            ``get_request_args`` callback of the retrievers (``headers``,
+            ``proxies``, ``timeout``, ``cookies``...).
+        :type request_args: dict
+        :param chunk_size: Size of the chunks read from the response stream.
+        :type chunk_size: int, optional
+        :param deadline: :func:`time.monotonic` time by which the whole body
+            must be read. Defaults to no deadline.
+        :type deadline: float, optional
+        :raises requests.HTTPError: If the status is an error.
+        :raises DeadlineExceeded: If the deadline passed first.
+        """
+        raise Exception(
+            "This function must be implemented by classes that inherit from Transport"
+        )
+
+    def close(self) -> None:
+        """
+        Close the connections kept open by the transport.
+        """
+        pass
+
+
+class RequestsTransport(Transport):
+    """
+    Send every request with ``requests``, on a new HTTP/1.1 connection.
+    """
+
+    def request(
+        self,
+        url: str,
+        params: dict,
+        request_args: dict,
+        chunk_size: int = 64 * 1024,
+        deadline: float = None,
+    ) -> TransportResponse:
+        args = {**request_args, "stream": True}
+        left = _time_left(deadline, url)
+        if left is not None:
+            args["timeout"] = _clamp_timeout(args.get("timeout"), left)
+
+        resp = requests.request("GET", url, params=params, **args)
+        with resp:
+            resp.raise_for_status()
+            # the body is decoded chunk by chunk while it is read from the socket;
+            # the read timeout is per chunk, so the deadline is checked between them
+            chunks = []
+            for chunk in resp.iter_content(chunk_size):
+                chunks.append(chunk)
+                if deadline is not None and time.monotonic() > deadline:
+                    raise DeadlineExceeded(f"Deadline exceeded while reading url: {resp.url}")
+            content = b"".join(chunks)
+            wire_bytes = resp.raw.tell()
+
+        return TransportResponse(
+            resp.url, resp.status_code, resp.headers, content, wire_bytes, "HTTP/1.1", resp.cookies
+        )
+
+
+class HTTP2Transport(Transport):
+    """
+    Send the requests over shared HTTP/2 connections with ``httpx``.
+
+    One client is kept per proxy (and TLS verification setting), and every
+    client keeps at most ``max_connections`` connections per host. The
+    requests of all the threads run on one event loop owned by the transport,
+    where they are multiplexed as streams over those connections. As with
+    :class:`RequestsTransport`, the clients keep no cookies: only the cookies
+    of the request are sent (see :mod:`scholar_retriever.identity`).
+    """
+
+    def __init__(self, max_connections: int = 2, http1: bool = True, **client_args: Any) -> None:
+        """
+        Initialize the HTTP2Transport object.
+
+        :param max_connections: Connections per host. Defaults to 2.
+        :type max_connections: int, optional
+        :param http1: Allow HTTP/1.1 with the servers that do not negotiate HTTP/2.
+            Set it to False to talk HTTP/2 to cleartext (``http://``) servers
+            without an upgrade. Defaults to True.
+        :type http1: bool, optional
+        :param client_args: Extra arguments of ``httpx.AsyncClient``.
+        """
+        try:
+            import httpx
+        except ImportError:
+            raise ImportError(
+                "HTTP2Transport needs httpx with HTTP/2 support: pip install scholar_retriever[http2]"
+            )
+
+        self._httpx = httpx
+        self.max_connections = max_connections
+        self.http1 = http1
+        self.client_args = client_args
+        self._clients: Dict[Tuple[Any, Any], Any] = {}
+        self._lock = threading.Lock()
+        self._loop: asyncio.AbstractEventLoop = None
+
+    def _event_loop(self) -> asyncio.AbstractEventLoop:
+        # the sync httpx client is not safe to share between threads over
+        # HTTP/2, so every request runs on this loop instead
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, daemon=True).start()
+            return self._loop
+
+    def _client(self, proxy: Any, verify: Any) -> Any:
+        key = (proxy, verify)
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                limits = self._httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                )
+                client = self._httpx.AsyncClient(
+                    http1=self.http1,
+                    http2=True,
+                    limits=limits,
+                    proxy=proxy,
+                    verify=True if verify is None else verify,
+                    **self.client_args,
+                )
+                # the client is shared by every identity, so it must not keep cookies
+                client.cookies = CookieJar(policy=DefaultCookiePolicy(allowed_domains=[]))
+                self._clients[key] = client
+            return client
+
+    @staticmethod
+    def _proxy(proxies: Dict[str, str], url: str) -> Any:
+        if not proxies:
+            return None
+        scheme = url.split(":", 1)[0]
+        return proxies.get(scheme) or proxies.get("all")
+
+    @staticmethod
+    async def _get(client, url: str, params: dict, headers: dict, kwargs: dict, chunk_size: int) -> TransportResponse:
+        async with client.stream("GET", url, params=params, headers=headers, **kwargs) as resp:
+            response = TransportResponse(
+                str(resp.url), resp.status_code, resp.headers, b"", 0, resp.http_version, resp.cookies.jar
+            )
+            response.raise_for_status()
+            response.content = b"".join([chunk async for chunk in resp.aiter_bytes(chunk_size)])
+            response.wire_bytes = resp.num_bytes_downloaded
+        return response
+
+    def _timeout(self, timeout: Any) -> Any:
+        # httpx takes a (connect, read, write, pool) tuple or an httpx.Timeout
+        if isinstance(timeout, tuple) and len(timeout) == 2:
+            connect, read = timeout
+            return self._httpx.Timeout(read, connect=connect)
+        return timeout
+
+    def request(
+        self,
+        url: str,
+        params: dict,
+        request_args: dict,
+        chunk_size: int = 64 * 1024,
+        deadline: float = None,
+    ) -> TransportResponse:
+        left = _time_left(deadline, url)
+        args = dict(request_args)
+        headers = dict(args.pop("headers", None) or {})
+        cookies = args.pop("cookies", None)
+        if cookies:
+            # per request cookies, without touching the shared client jar
+            headers["Cookie"] = "; ".join(f"{k}={v}" for k, v in dict(cookies).items())
+
+        client = self._client(self._proxy(args.pop("proxies", None), url), args.pop("verify", None))
+
+        # requests follows redirects by default, httpx does not
+        kwargs = {"follow_redirects": args.pop("allow_redirects", True)}
+        if "timeout" in args or left is not None:
+            kwargs["timeout"] = self._timeout(_clamp_timeout(args.pop("timeout", None), left))
+        if args:
+            logger.info(f"HTTP2Transport ignores the request args {sorted(args)}")
+
+        future = asyncio.run_coroutine_threadsafe(
+            self._get(client, url, params, headers, kwargs, chunk_size), self._event_loop()
+        )
+        try:
+            return future.result(left)
+        except concurrent.futures.TimeoutError:
+            # cancelling the task closes its stream; the connection stays usable
+            future.cancel()
+            raise DeadlineExceeded(f"Deadline exceeded for url: {url}")
+
+    def close(self) -> None:
+        with self._lock:
+            clients, self._clients = self._clients, {}
+            loop, self._loop = self._loop, None
+        if loop is None:
+            return
+        for client in clients.values():
+            asyncio.run_coroutine_threadsafe(client.aclose(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
@@ -0,0 +1,344 @@
+"""Concurrency helpers shared by the retrievers."""
+
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import Executor, Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Tuple
+
+
+class SingleFlight(object):
+    """
+    Collapse concurrent calls with the same key into a single execution.
+
+    The first caller of a key (the leader) runs the function; every caller that
+    arrives while it is running waits and receives the same result (or the same
+    exception). Once the call finishes the key is forgotten, so later calls run
+    the function again. Threads and asyncio tasks share the same in-flight table.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = {}
+        self._executions = 0
+        self._shared = 0
+
+    def _join(self, key: Hashable) -> Tuple[Future, bool]:
+        with self._lock:
+            fut = self._calls.get(key)
+            if fut is not None:
+                self._shared += 1
+                return fut, False
+
+            fut = Future()
+            self._calls[key] = fut
+            self._executions += 1
+            return fut, True
+
+    def _run(self, key: Hashable, fut: Future, fn: Callable[[], Any]) -> None:
+        try:
+            result = fn()
+        except BaseException as e:
+            with self._lock:
+                del self._calls[key]
+            fut.set_exception(e)
+        else:
+            with self._lock:
+                del self._calls[key]
+            fut.set_result(result)
+
+    def do(self, key: Hashable, fn: Callable[[], Any], timeout: float = None) -> Any:
+        """
+        Run ``fn`` or wait for the identical call already in flight.
+
+        :param key: Identifies identical calls.
+        :type key: Hashable
+        :param fn: The function to run. It takes no arguments.
+        :type fn: Callable[[], Any]
+        :param timeout: Maximum seconds to wait for a call run by another
+            caller. The call goes on for the others. Defaults to waiting as long as needed.
+        :type timeout: float, optional
+        :return: The result of ``fn``. Exceptions raised by ``fn`` are raised on every caller.
+        :raises TimeoutError: If the call in flight did not finish within ``timeout``.
+        """
+        fut, leader = self._join(key)
+        if leader:
+            self._run(key, fut, fn)
+        try:
+            return fut.result(timeout)
+        except FutureTimeoutError:
+            if fut.done():
+                # raised by fn
+                raise
+            raise TimeoutError(f"The call in flight did not finish within {timeout}s")
+
+    async def do_async(
+        self, key: Hashable, fn: Callable[[], Any], executor: Executor = None, timeout: float = None
+    ) -> Any:
+        """
+        Asynchronous version of :meth:`do`.
+
+        The leader runs the blocking ``fn`` on ``executor`` (the default
+        executor of the running loop if None). Cancelling one waiter, or its
+        ``timeout`` running out, does not cancel the shared call.
+        """
+        fut, leader = self._join(key)
+        if leader:
+            asyncio.get_running_loop().run_in_executor(
+                executor, self._run, key, fut, fn
+            )
+        shared = asyncio.wrap_future(fut)
+        try:
+            return await asyncio.wait_for(asyncio.shield(shared), timeout)
+        except asyncio.TimeoutError:
+            if fut.done():
+                raise
+            # nobody waits for the outcome on this loop any more
+            shared.add_done_callback(lambda f: f.cancelled() or f.exception())
+            raise TimeoutError(f"The call in flight did not finish within {timeout}s")
+
+    def in_flight(self) -> int:
+        """
+        Number of calls currently running.
+        """
+        with self._lock:
+            return len(self._calls)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Number of real executions and of calls that reused an in-flight execution.
+        """
+        with self._lock:
+            return {"executions": self._executions, "shared": self._shared}
+
+
+class RateLimiter(object):
+    """
+    A thread-safe token bucket shared by the retrievers.
+
+    ``rate`` requests per second are allowed on average, with bursts of up to
+    ``burst`` requests. Callers that exceed it wait their turn in arrival order.
+    """
+
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        """
+        Initialize the RateLimiter object.
+
+        :param rate: Requests per second.
+        :type rate: float
+        :param burst: Requests allowed at once after an idle period. Defaults to 1.
+        :type burst: int, optional
+        """
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(
+            self.burst, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    def acquire(self, timeout: float = None) -> bool:
+        """
+        Wait until a request is allowed.
+
+        :param timeout: Maximum seconds to wait. Defaults to waiting as long as needed.
+        :type timeout: float, optional
+        :return: ``False`` if the request would have to wait more than ``timeout``.
+        :rtype: bool
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            wait = (1 - self._tokens) / self.rate if self._tokens < 1 else 0.0
+            if timeout is not None and wait > timeout:
+                return False
+            # reserve the token now; a negative balance queues later callers
+            self._tokens -= 1
+
+        if wait > 0:
+            time.sleep(wait)
+        return True
+
+    def backoff(self, seconds: float) -> None:
+        """
+        Hold every request for ``seconds`` from now, on top of the ones already waiting.
+
+        :param seconds: The pause, for example after a ``429`` or a blocked page.
+        :type seconds: float
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self._tokens, 0.0) - seconds * self.rate
+
+
+class _Waiter(object):
+    __slots__ = ("priority", "key", "event", "granted", "cancelled", "queued_at")
+
+    def __init__(self, priority: str, key: Tuple[float, int]) -> None:
+        self.priority = priority
+        self.key = key
+        self.event = threading.Event()
+        self.granted = False
+        self.cancelled = False
+        self.queued_at = time.monotonic()
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return self.key < other.key
+
+
+class PriorityScheduler(object):
+    """
+    Admit at most ``max_concurrency`` calls at once, choosing the next call by
+    priority class.
+
+    Every class gets a share of the slots that free up while its calls wait
+    (stride scheduling): with shares ``interactive=16`` and ``batch=1`` an
+    interactive call waits for at most a few slots however many batch calls are
+    queued, and the batch calls take every slot the other classes leave. A
+    class can also be capped to ``limits[class]`` running calls, which keeps
+    slots free for the others. Within a class, calls with the earliest deadline
+    go first, then in arrival order; a call still waiting at its deadline gives up.
+    """
+
+    DEFAULT_SHARES = {"interactive": 16, "normal": 4, "batch": 1}
+    """Share of every class when none are given."""
+
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        shares: Dict[str, float] = None,
+        limits: Dict[str, int] = None,
+    ) -> None:
+        """
+        Initialize the PriorityScheduler object.
+
+        :param max_concurrency: Calls running at once. Defaults to 8.
+        :type max_concurrency: int, optional
+        :param shares: Relative share of the slots by class. Defaults to :attr:`DEFAULT_SHARES`.
+        :type shares: dict[str, float], optional
+        :param limits: Maximum running calls of some classes. Defaults to no limit.
+        :type limits: dict[str, int], optional
+        """
+        self.max_concurrency = max_concurrency
+        self.shares = dict(shares or self.DEFAULT_SHARES)
+        self.limits = dict(limits or {})
+
+        self._lock = threading.Lock()
+        self._seq = itertools.count()
+        self._waiting: Dict[str, List[_Waiter]] = {c: [] for c in self.shares}
+        self._pass: Dict[str, float] = {c: 0.0 for c in self.shares}
+        self._virtual = 0.0
+        self._running: Dict[str, int] = {c: 0 for c in self.shares}
+        self._admitted: Dict[str, int] = {c: 0 for c in self.shares}
+        self._expired: Dict[str, int] = {c: 0 for c in self.shares}
+        self._waited: Dict[str, float] = {c: 0.0 for c in self.shares}
+
+    def _pending(self, priority: str) -> bool:
+        heap = self._waiting[priority]
+        while heap and heap[0].cancelled:
+            heapq.heappop(heap)
+        return bool(heap)
+
+    def _dispatch(self) -> None:
+        # called with the lock held: hand the free slots to the waiting calls
+        while sum(self._running.values()) < self.max_concurrency:
+            ready = [
+                c
+                for c in self._waiting
+                if self._pending(c) and self._running[c] < self.limits.get(c, self.max_concurrency)
+            ]
+            if not ready:
+                return
+
+            priority = min(ready, key=lambda c: self._pass[c])
+            self._virtual = self._pass[priority]
+            self._pass[priority] += 1.0 / self.shares[priority]
+
+            waiter = heapq.heappop(self._waiting[priority])
+            waiter.granted = True
+            self._running[priority] += 1
+            self._admitted[priority] += 1
+            self._waited[priority] += time.monotonic() - waiter.queued_at
+            waiter.event.set()
+
+    def acquire(self, priority: str = "normal", deadline: float = None) -> bool:
+        """
+        Wait for a slot.
+
+        :param priority: The class of the call.
+        :type priority: str, optional
+        :param deadline: Give up at this :func:`time.monotonic` time. Defaults to waiting as long as needed.
+        :type deadline: float, optional
+        :return: ``False`` if the deadline passed before a slot was free.
+        :rtype: bool
+        :raises ValueError: If the class is unknown.
+        """
+        if priority not in self.shares:
+            raise ValueError(f"Unknown priority class: {priority}")
+
+        key = (deadline if deadline is not None else float("inf"), next(self._seq))
+        waiter = _Waiter(priority, key)
+        with self._lock:
+            if not self._pending(priority):
+                # an idle class does not bank the turns it did not use
+                self._pass[priority] = max(self._pass[priority], self._virtual)
+            heapq.heappush(self._waiting[priority], waiter)
+            self._dispatch()
+
+        timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+        if waiter.event.wait(timeout):
+            return True
+
+        with self._lock:
+            if waiter.granted:
+                return True
+            waiter.cancelled = True
+            self._expired[priority] += 1
+            return False
+
+    def release(self, priority: str = "normal") -> None:
+        """
+        Free the slot of a call of class ``priority``.
+        """
+        with self._lock:
+            self._running[priority] -= 1
+            self._dispatch()
+
+    @contextmanager
+    def slot(self, priority: str = "normal", deadline: float = None) -> Iterator[None]:
+        """
+        Hold a slot while the block runs.
+
+        :raises TimeoutError: If the deadline passed before a slot was free.
+        """
+        if not self.acquire(priority, deadline):
+            raise TimeoutError(f"No {priority} slot was free before the deadline")
+        try:
+            yield
+        finally:
+            self.release(priority)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        By class: calls ``running`` and ``waiting`` now, calls ``admitted`` and
+        ``expired`` so far, and the mean seconds admitted calls waited (``mean_wait``).
+        """
+        with self._lock:
+            return {
+                c: {
+                    "running": self._running[c],
+                    "waiting": sum(1 for w in self._waiting[c] if not w.cancelled),
+                    "admitted": self._admitted[c],
+                    "expired": self._expired[c],
+                    "mean_wait": self._waited[c] / self._admitted[c] if self._admitted[c] else 0.0,
+                }
+                for c in self.shares
+            }
@@ -0,0 +1,607 @@
+"""A local stand-in for Google Scholar, for tests and load tests.
+
+:class:`MockScholarServer` answers ``/citations`` requests like Google Scholar
+with pages built from the bundled test pages (:mod:`.html_test` and
+:mod:`.html_test_author`):
+
+- profile searches (``view_op=search_authors`` or ``view_op=view_org``) with
+  ``after_author`` pagination over ``search_pages`` pages;
+- author pages with ``articles_per_author`` articles paginated by ``cstart``
+  and ``pagesize``;
+- co-author lists (``view_op=list_colleagues``) drawn from a pool of
+  ``author_pool`` authors, so lists of different authors overlap;
+- lists of citing articles (``/scholar?cites=``) of ``citing_per_article``
+  results, paginated by ``start`` ten at a time;
+- article pages (``view_op=view_citation``) built from the ``citation_for_view`` id.
+
+Successful answers carry an ``ETag`` of their body, and a request with a
+matching ``If-None-Match`` gets a ``304`` without body, so conditional requests
+can be tested. Latency, server errors, ``429`` answers and ``200`` CAPTCHA pages can be injected. The server can also
+run as a recording proxy, saving real responses to a directory, and replay them
+later::
+
+    with MockScholarServer(latency=0.05, throttle_rate=0.01) as server:
+        retriever = AuthorInfoRetriever("M0000001AAAJ")
+        retriever.URL_ENDPOINT = server.endpoint
+        retriever.fetch()
+
+:class:`MockTransport` answers with the same pages in process, without a socket.
+"""
+
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from collections import Counter
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Tuple, Union
+from urllib.parse import parse_qs, urlencode, urlparse
+
+from requests.structures import CaseInsensitiveDict
+
+from ..transport import Transport, TransportResponse
+from . import html_test, html_test_author
+
+_FIXTURE_AUTHOR_ID = "0YLthRAAAAAJ"
+_FIXTURE_TOKEN = "rZlDAYUe__8J"
+
+_ROW = re.compile(r'<tr class="gsc_a_tr">.*?</tr>', re.S)
+_TBODY = re.compile(r'(<tbody id="gsc_a_b">).*?(</tbody>)', re.S)
+_CITATION_ID = re.compile(_FIXTURE_AUTHOR_ID + r":[\w-]+")
+_USER = re.compile(r"user=([\w-]{12})")
+_NEXT_ONCLICK = re.compile(r"onclick=\"window\.location='[^']*after_author=[^']*'\"")
+
+_CAPTCHA_PAGE = b"""<!doctype html><html><head><title>Google Scholar</title></head><body>
+<div id="gs_captcha_ccl"><h1>Please show you&#39;re not a robot</h1>
+<form id="gs_captcha_f" method="post"><div class="g-recaptcha"></div></form></div></body></html>"""
+
+_EMPTY_ROW = '<tr class="gsc_a_e"><td class="gsc_a_e" colspan="3">There are no articles in this profile.</td></tr>'
+
+_COLLEAGUES_PAGE = """<!doctype html><html><head><title>Co-authors</title>
+<meta http-equiv="Content-Type" content="text/html;charset=UTF-8"></head><body>
+<div id="gsc_codb_content">{entries}</div></body></html>"""
+
+_COLLEAGUE = """<div class="gs_ai gs_scl"><span class="gs_rimg gs_pp_sm"><img src="{thumbnail}"></span>\
+<div class="gs_ai_t"><h3 class="gs_ai_name"><a href="/citations?user={author_id}&amp;hl=en">{name}</a></h3>\
+<div class="gs_ai_aff">{affiliation}</div><div class="gs_ai_eml">{email}</div></div></div>"""
+
+
+_RESULTS_PAGE = """<!doctype html><html><head><title>Google Scholar</title>
+<meta http-equiv="Content-Type" content="text/html;charset=UTF-8"></head><body>
+<div id="gs_ab_md"><div class="gs_ab_mdw">{summary}</div></div>
+<div id="gs_res_ccl"><div id="gs_res_ccl_mid">{results}</div></div>
+<div id="gs_n" role="navigation"><center><table><tr>{pager}</tr></table></center></div></body></html>"""
+
+_RESULT = """<div class="gs_r gs_or gs_scl" data-cid="{cid}" data-rp="{rank}">\
+<div class="gs_ggs gs_fl"><div class="gs_ggsd"><div class="gs_or_ggsm">\
+<a href="https://example.org/{cid}.pdf"><span class="gs_ctg2">[PDF]</span> example.org</a></div></div></div>\
+<div class="gs_ri"><h3 class="gs_rt"><span class="gs_ctc"><span class="gs_ct1">[PDF]</span></span> \
+<a id="{cid}" href="https://example.org/{cid}">Citing article {n} of {cites}</a></h3>\
+<div class="gs_a">A Author, B Author\xa0- Journal of Tests, {year}\xa0- example.org</div>\
+<div class="gs_rs">Synthetic result {n}.</div>\
+<div class="gs_fl gs_flb"><a href="/scholar?cites={child}&amp;as_sdt=2005&amp;sciodt=0,5&amp;hl=en">Cited by {cited_by}</a> \
+<a href="/scholar?q=related:{cid}:scholar.google.com/&amp;hl=en">Related articles</a> \
+<a href="/scholar?cluster={child}&amp;hl=en" class="gs_nph">All {versions} versions</a></div></div></div>"""
+
+_ARTICLE_PAGE = """<!doctype html><html><head><title>Article</title>
+<meta http-equiv="Content-Type" content="text/html;charset=UTF-8"></head><body>
+<div id="gsc_oci_title_wrapper"><div id="gsc_oci_title_gg"><div class="gsc_oci_title_ggi">\
+<a href="https://example.org/{digest}.pdf"><span class="gsc_vcd_title_ggt">[PDF]</span> from example.org</a></div></div>
+<div id="gsc_oci_title"><a class="gsc_oci_title_link" href="https://example.org/{digest}">Article {citation_id}</a></div></div>
+<div id="gsc_oci_table">
+<div class="gs_scl"><div class="gsc_oci_field">Authors</div><div class="gsc_oci_value">A Author, B Author, C Author</div></div>
+<div class="gs_scl"><div class="gsc_oci_field">Publication date</div><div class="gsc_oci_value">{year}/3/1</div></div>
+<div class="gs_scl"><div class="gsc_oci_field">Journal</div><div class="gsc_oci_value">Journal of Tests</div></div>
+<div class="gs_scl"><div class="gsc_oci_field">Volume</div><div class="gsc_oci_value">{volume}</div></div>
+<div class="gs_scl"><div class="gsc_oci_field">Pages</div><div class="gsc_oci_value">1-12</div></div>
+<div class="gs_scl"><div class="gsc_oci_field">Publisher</div><div class="gsc_oci_value">Test Press</div></div>
+<div class="gs_scl"><div class="gsc_oci_field">Description</div><div class="gsc_oci_value" id="gsc_oci_descr">\
+<div class="gsh_small"><div class="gsh_csp">Synthetic abstract of {citation_id}.</div></div></div></div>
+<div class="gs_scl"><div class="gsc_oci_field">Total citations</div><div class="gsc_oci_value">\
+<div style="margin-bottom:1em"><a href="https://scholar.google.com/scholar?oi=bibs&amp;hl=en&amp;cites={cites}">Cited by {total}</a></div>\
+<div id="gsc_oci_graph_wrapper"><div id="gsc_oci_graph_bars">{bars}</div></div></div></div>
+</div></body></html>"""
+
+_NEXT_CELL = """<td align="left" nowrap><a href="/scholar?start={start}&amp;hl=en&amp;cites={cites}">\
+<span class="gs_ico gs_ico_nav_next"></span><b>Next</b></a></td>"""
+
+
+def synthetic_author_id(n: int) -> str:
+    """
+    The author id the mock server uses for the n-th author of its pool.
+    """
+    return f"M{n:07d}AAAJ"
+
+
+class MockScholarServer(object):
+    """
+    A threaded HTTP server that imitates the Google Scholar ``citations`` pages.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        captcha_rate: float = 0.0,
+        search_pages: int = 5,
+        articles_per_author: int = 120,
+        coauthors_per_author: int = 20,
+        citing_per_article: int = 45,
+        author_pool: int = 1000,
+        mode: str = "synthetic",
+        record_dir: str = None,
+        upstream: str = "https://scholar.google.com",
+        seed: int = None,
+    ) -> None:
+        """
+        Initialize the MockScholarServer object.
+
+        :param host: Address to listen on. Defaults to 127.0.0.1.
+        :type host: str, optional
+        :param port: Port to listen on; 0 picks a free one. Defaults to 0.
+        :type port: int, optional
+        :param latency: Seconds added to every answer. Defaults to 0.
+        :type latency: float, optional
+        :param jitter: Up to this many random seconds are added to ``latency``. Defaults to 0.
+        :type jitter: float, optional
+        :param error_rate: Fraction of requests answered with ``500``. Defaults to 0.
+        :type error_rate: float, optional
+        :param throttle_rate: Fraction of requests answered with ``429``. Defaults to 0.
+        :type throttle_rate: float, optional
+        :param captcha_rate: Fraction of requests answered with a CAPTCHA page and a ``200``. Defaults to 0.
+        :type captcha_rate: float, optional
+        :param search_pages: Pages of every profile search. Defaults to 5.
+        :type search_pages: int, optional
+        :param articles_per_author: Articles of every author. Defaults to 120.
+        :type articles_per_author: int, optional
+        :param coauthors_per_author: Co-authors of every author. Defaults to 20.
+        :type coauthors_per_author: int, optional
+        :param citing_per_article: Results of every list of citing articles. Defaults to 45.
+        :type citing_per_article: int, optional
+        :param author_pool: Number of distinct co-authors. Defaults to 1000.
+        :type author_pool: int, optional
+        :param mode: ``synthetic`` (build pages), ``record`` (proxy ``upstream`` and save answers to ``record_dir``) or ``replay`` (serve answers saved in ``record_dir``). Defaults to ``synthetic``.
+        :type mode: str, optional
+        :param record_dir: Directory of recorded answers. Required by ``record`` and ``replay``.
+        :type record_dir: str, optional
+        :param upstream: Site proxied in ``record`` mode. Defaults to https://scholar.google.com.
+        :type upstream: str, optional
+        :param seed: Seed of the fault injection. Defaults to None.
+        :type seed: int, optional
+        """
+        if mode not in ("synthetic", "record", "replay"):
+            raise ValueError(f"Unknown mode: {mode}")
+        if mode != "synthetic" and record_dir is None:
+            raise ValueError(f"Mode {mode} needs a record_dir")
+
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.captcha_rate = captcha_rate
+        self.search_pages = search_pages
+        self.articles_per_author = articles_per_author
+        self.coauthors_per_author = coauthors_per_author
+        self.citing_per_article = citing_per_article
+        self.author_pool = author_pool
+        self.mode = mode
+        self.record_dir = record_dir
+        self.upstream = upstream.rstrip("/")
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._stats: Counter = Counter()
+        self._connections = 0
+
+        self._author_page = html_test_author.html_text
+        self._article_rows = _ROW.findall(self._author_page)
+        self._search_page = html_test.html_text
+        self._search_ids = list(dict.fromkeys(_USER.findall(self._search_page)))
+        self._profiles = self._fixture_profiles()
+
+        if record_dir is not None:
+            os.makedirs(record_dir, exist_ok=True)
+
+        self._httpd = _MockHTTPServer((host, port), _MockHandler)
+        self._httpd.mock = self
+        self._thread = None
+
+    @staticmethod
+    def _fixture_profiles() -> List[Dict[str, str]]:
+        from ..profile_parser import profiles_search_parser
+
+        return profiles_search_parser(html_test.html_text)["profiles"]
+
+    ### lifecycle
+
+    @property
+    def url(self) -> str:
+        """
+        Base url of the server.
+        """
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def endpoint(self) -> str:
+        """
+        Url to use as ``URL_ENDPOINT`` of the retrievers.
+        """
+        return self.url + "/citations"
+
+    @property
+    def scholar_endpoint(self) -> str:
+        """
+        Url to use as ``URL_ENDPOINT`` of the retrievers of ``/scholar`` pages.
+        """
+        return self.url + "/scholar"
+
+    def start(self) -> "MockScholarServer":
+        """
+        Serve requests on a background thread.
+        """
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """
+        Stop serving and close the socket.
+        """
+        if self._thread is not None:
+            self._httpd.shutdown()
+            self._thread = None
+        self._httpd.server_close()
+
+    def __enter__(self) -> "MockScholarServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Number of answered requests by ``"<page>:<status>"``, plus the number of
+        accepted ``connections``.
+        """
+        with self._lock:
+            ret = dict(self._stats)
+            ret["connections"] = self._connections
+            return ret
+
+    def _count(self, page: str, status: int) -> None:
+        with self._lock:
+            self._stats[f"{page}:{status}"] += 1
+
+    ### fault injection
+
+    def _fault(self) -> Union[Tuple[int, bytes], None]:
+        with self._lock:
+            delay = self.latency + self._random.random() * self.jitter
+            draw = self._random.random()
+
+        if delay > 0:
+            time.sleep(delay)
+
+        if draw < self.throttle_rate:
+            return 429, b"<html><body>Injected failure</body></html>"
+        draw -= self.throttle_rate
+        if draw < self.error_rate:
+            return 500, b"<html><body>Injected failure</body></html>"
+        draw -= self.error_rate
+        if draw < self.captcha_rate:
+            return 200, _CAPTCHA_PAGE
+        return None
+
+    ### synthetic pages
+
+    def _page_kind(self, params: Dict[str, List[str]]) -> str:
+        view_op = params.get("view_op", [""])[0]
+        if view_op in ("search_authors", "view_org"):
+            return "search"
+        if view_op == "list_colleagues":
+            return "coauthors"
+        if view_op == "view_citation":
+            return "article"
+        if "cites" in params:
+            return "citing"
+        if "user" in params:
+            return "author"
+        return "unknown"
+
+    def search_page(self, params: Dict[str, List[str]]) -> bytes:
+        """
+        A page of profiles. ``after_author`` tokens encode the page number.
+        """
+        token = params.get("after_author", [""])[0]
+        page = int(token[1:]) if token.startswith("P") and token[1:].isdigit() else 0
+        page = min(page, self.search_pages - 1)
+
+        ids = {
+            old: synthetic_author_id((page * len(self._search_ids) + i) % self.author_pool)
+            for i, old in enumerate(self._search_ids)
+        }
+        html = _USER.sub(lambda m: "user=" + ids.get(m.group(1), m.group(1)), self._search_page)
+
+        if page + 1 < self.search_pages:
+            query = "&".join(
+                f"{k}={v[0]}" for k, v in params.items() if k not in ("after_author", "astart")
+            )
+            link = f"/citations?{query}&after_author=P{page + 1:011d}&astart={(page + 1) * 10}"
+            html = _NEXT_ONCLICK.sub(lambda m: f"onclick=\"window.location='{link}'\"", html)
+        else:
+            html = _NEXT_ONCLICK.sub('disabled=""', html)
+
+        return html.encode("utf-8")
+
+    def author_page(self, params: Dict[str, List[str]]) -> bytes:
+        """
+        An author page with the articles from ``cstart`` to ``cstart + pagesize``.
+        """
+        user = params["user"][0]
+        cstart = int(params.get("cstart", ["0"])[0])
+        pagesize = int(params.get("pagesize", ["20"])[0])
+
+        rows = []
+        for n in range(cstart, min(cstart + pagesize, self.articles_per_author)):
+            row = self._article_rows[n % len(self._article_rows)]
+            rows.append(_CITATION_ID.sub(f"{user}:{n:012d}", row))
+
+        body = "".join(rows) if rows else _EMPTY_ROW
+        html = _TBODY.sub(lambda m: m.group(1) + body + m.group(2), self._author_page, count=1)
+        return html.replace(_FIXTURE_AUTHOR_ID, user).encode("utf-8")
+
+    def coauthors_page(self, params: Dict[str, List[str]]) -> bytes:
+        """
+        The co-authors list of an author, drawn deterministically from the pool.
+        """
+        user = params["user"][0]
+        rnd = random.Random(user)
+        entries = []
+        for n in rnd.sample(range(self.author_pool), min(self.coauthors_per_author, self.author_pool)):
+            profile = self._profiles[n % len(self._profiles)]
+            entries.append(
+                _COLLEAGUE.format(
+                    author_id=synthetic_author_id(n),
+                    name=escape(profile["name"]),
+                    affiliation=escape(profile["affiliations"]),
+                    email=escape(profile["email"]),
+                    thumbnail=escape(profile["thumbnail"]),
+                )
+            )
+        return _COLLEAGUES_PAGE.format(entries="".join(entries)).encode("utf-8")
+
+    def citing_page(self, params: Dict[str, List[str]]) -> bytes:
+        """
+        Ten results of the list of articles citing ``cites``, from ``start``.
+        """
+        cites = params["cites"][0]
+        start = int(params.get("start", ["0"])[0])
+        end = min(start + 10, self.citing_per_article)
+
+        results = []
+        for n in range(start, end):
+            digest = hashlib.sha1(f"{cites}:{n}".encode("utf-8")).hexdigest()
+            results.append(
+                _RESULT.format(
+                    cid=digest[:12],
+                    rank=n,
+                    n=n,
+                    cites=escape(cites),
+                    year=1990 + int(digest[12:14], 16) % 35,
+                    child=int(digest[14:29], 16),
+                    cited_by=int(digest[29:33], 16) % 500 + 1,
+                    versions=int(digest[33:35], 16) % 9 + 2,
+                )
+            )
+
+        summary = f"About {self.citing_per_article:,} results (<b>0.02</b> sec)"
+        if start > 0:
+            summary = f"Page {start // 10 + 1} of a" + summary[1:]
+        pager = _NEXT_CELL.format(start=end, cites=escape(cites)) if end < self.citing_per_article else "<td></td>"
+        return _RESULTS_PAGE.format(summary=summary, results="".join(results), pager=pager).encode("utf-8")
+
+    def article_page(self, params: Dict[str, List[str]]) -> bytes:
+        """
+        The page of the article ``citation_for_view``, with a citation graph
+        that skips some years.
+        """
+        citation_id = params.get("citation_for_view", [""])[0]
+        digest = hashlib.sha1(citation_id.encode("utf-8")).hexdigest()
+        year = 1995 + int(digest[:2], 16) % 25
+
+        years, bars, total = [], [], 0
+        for i, y in enumerate(range(year + 1, 2025)):
+            years.append(f'<span class="gsc_oci_g_t" style="left:{i * 32}px">{y}</span>')
+            count = int(digest[i % 40], 16) * 3
+            if count:
+                total += count
+                bars.append(
+                    f'<a href="/scholar?as_ylo={y}&amp;as_yhi={y}&amp;hl=en&amp;cites={int(digest[:15], 16)}" '
+                    f'class="gsc_oci_g_a" style="left:{i * 32 + 8}px;height:{count % 64}px">'
+                    f'<span class="gsc_oci_g_al">{count}</span></a>'
+                )
+
+        return _ARTICLE_PAGE.format(
+            digest=digest[:12],
+            citation_id=escape(citation_id),
+            year=year,
+            volume=int(digest[2:4], 16),
+            cites=int(digest[:15], 16),
+            total=total,
+            bars="".join(years) + "".join(bars),
+        ).encode("utf-8")
+
+    def synthesize(self, path: str) -> Tuple[int, bytes]:
+        """
+        Build the answer of a request path.
+        """
+        parsed = urlparse(path)
+        params = parse_qs(parsed.query)
+        kind = self._page_kind(params)
+
+        if parsed.path == "/scholar" and kind == "citing":
+            return 200, self.citing_page(params)
+        if parsed.path != "/citations" or kind in ("unknown", "citing"):
+            return 404, b"<html><body>Not found</body></html>"
+        if kind == "search":
+            return 200, self.search_page(params)
+        if kind == "coauthors":
+            return 200, self.coauthors_page(params)
+        if kind == "article":
+            return 200, self.article_page(params)
+        return 200, self.author_page(params)
+
+    ### record / replay
+
+    def _record_path(self, path: str) -> str:
+        return os.path.join(self.record_dir, hashlib.sha1(path.encode("utf-8")).hexdigest())
+
+    def replay(self, path: str) -> Tuple[int, bytes]:
+        """
+        The recorded answer of a request path, or a ``404``.
+        """
+        base = self._record_path(path)
+        try:
+            with open(base + ".json") as f:
+                meta = json.load(f)
+            with open(base + ".html", "rb") as f:
+                return meta["status"], f.read()
+        except OSError:
+            return 404, b"<html><body>Not recorded</body></html>"
+
+    def record(self, path: str, headers: Dict[str, str]) -> Tuple[int, bytes]:
+        """
+        Forward a request to ``upstream`` and save the answer.
+        """
+        import requests
+
+        forwarded = {
+            k: v for k, v in headers.items() if k.lower() in ("user-agent", "accept", "accept-language", "cookie")
+        }
+        resp = requests.get(self.upstream + path, headers=forwarded, timeout=30)
+
+        base = self._record_path(path)
+        with open(base + ".html", "wb") as f:
+            f.write(resp.content)
+        with open(base + ".json", "w") as f:
+            json.dump({"path": path, "status": resp.status_code}, f)
+
+        return resp.status_code, resp.content
+
+
+def _etags(header: Union[str, None]) -> List[str]:
+    """
+    The entity tags of an ``If-None-Match`` header, weak ones as strong ones.
+    """
+    if not header:
+        return []
+    tags = [t.strip() for t in header.split(",")]
+    return [t[2:] if t.startswith("W/") else t for t in tags]
+
+
+class MockTransport(Transport):
+    """
+    Answers the requests of the retrievers with the synthetic pages of a
+    :class:`MockScholarServer`, in process: no socket, no latency and no
+    injected faults, so only the client side is measured. The server does not
+    need to be started::
+
+        retriever.transport = MockTransport(MockScholarServer())
+    """
+
+    def __init__(self, server: MockScholarServer) -> None:
+        """
+        Initialize the MockTransport object.
+
+        :param server: Builds the pages.
+        :type server: MockScholarServer
+        """
+        self.server = server
+        self.requests = 0
+
+    def request(
+        self,
+        url: str,
+        params: dict,
+        request_args: dict,
+        chunk_size: int = 64 * 1024,
+        deadline: float = None,
+    ) -> TransportResponse:
+        query = urlencode({k: v for k, v in params.items() if v is not None})
+        path = f"{urlparse(url).path}?{query}"
+        status, body = self.server.synthesize(path)
+        self.server._count(self.server._page_kind(parse_qs(query)), status)
+        with self.server._lock:
+            self.requests += 1
+
+        resp = TransportResponse(
+            f"{url}?{query}",
+            status,
+            CaseInsensitiveDict({"Content-Type": "text/html; charset=utf-8"}),
+            body,
+            len(body),
+            "HTTP/1.1",
+        )
+        resp.raise_for_status()
+        return resp
+
+
+class _MockHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # load tests open many connections at once; the default backlog is 5
+    request_queue_size = 128
+
+    def process_request(self, request, client_address):
+        with self.mock._lock:
+            self.mock._connections += 1
+        super().process_request(request, client_address)
+
+
+class _MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        mock: MockScholarServer = self.server.mock
+        params = parse_qs(urlparse(self.path).query)
+        page = mock._page_kind(params)
+
+        fault = mock._fault()
+        if fault is not None:
+            status, body = fault
+        elif mock.mode == "replay":
+            status, body = mock.replay(self.path)
+        elif mock.mode == "record":
+            status, body = mock.record(self.path, dict(self.headers))
+        else:
+            status, body = mock.synthesize(self.path)
+
+        etag = None
+        if status == 200:
+            etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+            if etag in _etags(self.headers.get("If-None-Match")):
+                status, body = 304, b""
+
+        mock._count(page, status)
+
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        if etag is not None:
+            self.send_header("ETag", etag)
+        if status != 304:
+            self.send_header("Content-Length", str(len(body)))
+        if status == 429:
+            self.send_header("Retry-After", "1")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
@@ -1,5 +1,48 @@
-from urllib.parse import parse_qs, urlparse
-from typing import AnyStr, Dict,List
+import re
+from functools import lru_cache
+from urllib.parse import parse_qs, unquote, urlparse
+from typing import AnyStr, Dict, Iterable, List, Optional
+
+from urllib3.util.request import ACCEPT_ENCODING
+
+
+def _url_query( url: str ):
+	"""
+	The query of the url as ``urlparse(url).query`` returns it, or None for the
+	unusual urls (whitespace, control characters) that need urlparse itself.
+	"""
+	if url[:1] <= ' ' or '\t' in url or '\r' in url or '\n' in url:
+		return None
+
+	url = url.partition('#')[0]
+	return url.partition('?')[2]
+
+
+def _unquote_field( field: str ) -> str:
+	if '+' in field:
+		field = field.replace('+', ' ')
+	if '%' in field:
+		field = unquote(field)
+	return field
+
+
+@lru_cache(maxsize=65536)
+def _extract_get_param( url: str, param: str ):
+	query = _url_query(url)
+	if query is None:
+		p = parse_qs( urlparse(url).query ).get(param)
+		return p[0] if p is not None else None
+
+	# same rules as parse_qs: fields without '=' or with empty values are skipped
+	for field in query.split('&'):
+		name, sep, value = field.partition('=')
+		if not sep or not value:
+			continue
+		if _unquote_field(name) == param:
+			return _unquote_field(value)
+
+	return None
+
 
 class UrlUtilities:
 
@@ -14,15 +57,98 @@ class UrlUtilities:
 	def url_extract_get_param( url: str, param: str ):
 		"""
 		Returns a parameter of a GET request from the url
+
+		It returns the same as ``url_extract_get_params(url).get(param)[0]``
+		without building the dict of all the parameters. Results are memoized,
+		since the same urls (pagination, co-authors) come back often.
+		"""
+		return _extract_get_param( url, param )
+
+	@staticmethod
+	def url_extract_get_param_many( url: str, params: Iterable[str] ) -> Dict[str, Optional[str]]:
 		"""
-		p = UrlUtilities.url_extract_get_params(url).get(param)
-		if p is not None:
-			p = p[0]
-		
-		return p
+		Returns several parameters of a GET request from the url in one pass.
+
+		Every requested parameter is in the result, None if it is missing.
+		"""
+		ret = dict.fromkeys(params)
+		query = _url_query(url)
+		if query is None:
+			all_params = parse_qs( urlparse(url).query )
+			for k in ret:
+				if k in all_params:
+					ret[k] = all_params[k][0]
+			return ret
+
+		missing = len(ret)
+		for field in query.split('&'):
+			name, sep, value = field.partition('=')
+			if not sep or not value:
+				continue
+			name = _unquote_field(name)
+			if name in ret and ret[name] is None:
+				ret[name] = _unquote_field(value)
+				missing -= 1
+				if missing == 0:
+					break
+
+		return ret
+
+
+# digits, optionally grouped by thousands with the separator of any language:
+# 1,234 (en)  1.234 (es, de)  1 234 (fr, ru)  1'234 (de-CH)
+_NUMBER = re.compile( r"\d{1,3}([,.'\u2019\u00a0\u202f ])\d{3}(?:\1\d{3})*(?!\d)|\d+" )
+_NOT_DIGIT = re.compile( r"\D" )
+
+
+class NumberUtilities:
+
+	@staticmethod
+	def parse_int( text: Optional[str] ) -> Optional[int]:
+		"""
+		Returns the first integer shown in a text, or None if there is none.
+
+		Counts are shown with the thousands separator of the page language
+		(``29,251``, ``29.251``, ``29 251``...). Google Scholar never shows
+		decimals in them, so any separator between groups of three digits is
+		taken as a thousands separator, whatever the ``hl`` of the page.
+		"""
+		if not text:
+			return None
+
+		m = _NUMBER.search( text )
+		if m is None:
+			return None
+
+		number = m.group(0)
+		if m.group(1) is not None:
+			number = _NOT_DIGIT.sub( '', number )
+		return int( number )
+
+	@staticmethod
+	def parse_ints( text: Optional[str] ) -> List[int]:
+		"""
+		Returns all the integers shown in a text, as :meth:`parse_int` reads them.
+		"""
+		if not text:
+			return []
+
+		return [
+			int( _NOT_DIGIT.sub( '', m.group(0) ) if m.group(1) is not None else m.group(0) )
+			for m in _NUMBER.finditer( text )
+		]
 
 
 class HttpHeadersTemplate(object):
+
+	ACCEPT_ENCODING = ACCEPT_ENCODING.replace(',', ', ')
+	"""
+	Content codings the fetch layer can decode, as urllib3 (the decoder under
+	requests) lists them: gzip and deflate, plus br and zstd when urllib3 finds
+	their packages. It is sent on every request
+	whatever the template, so the templates do not set Accept-Encoding.
+	"""
+
 	DEFAULT_TEMPLATES = [
 
 		# Brave (Linux)
@@ -50,7 +176,6 @@ class HttpHeadersTemplate(object):
 			'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64; rv:121.0) Gecko/20100101 Firefox/121.0',
 			'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8',
 			'Accept-Language': 'es-ES,es;q=0.8,en-US;q=0.5,en;q=0.3',
-			# 'Accept-Encoding': 'gzip, deflate, br',
 			'DNT': '1',
 			'Sec-GPC': '1',
 			'Connection': 'keep-alive',
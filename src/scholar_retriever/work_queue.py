@@ -0,0 +1,468 @@
+"""Work queues for sharing one crawl between several worker processes or nodes.
+
+A crawl is split into small tasks (one author profile, one page of an
+organization listing). Workers *lease* a task, process it and *ack* it. A
+lease that is not acknowledged before its visibility timeout expires makes the
+task visible again, so a crashed worker never loses work. Each task is unique by
+``(kind, key)``, so several producers can enqueue the same author without
+causing duplicate fetches.
+
+:class:`WorkQueue` defines the interface; :class:`SQLiteWorkQueue` is the
+default backend and works across processes on the same host (or on a shared
+filesystem). Other services (e.g. Redis) can be slotted in by implementing the
+same methods.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from enum import Enum
+from logging import NullHandler
+from typing import Any, Callable, Dict, Iterable, List, Union
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+logger.addHandler(NullHandler())
+
+
+class TaskKind(Enum):
+    """
+    Kinds of tasks known by the crawl workers.
+    """
+
+    AUTHOR = "author"
+    """Retrieve the data of one author. The key is the ``author_id``."""
+
+    ORG_PAGE = "org_page"
+    """Retrieve one page of an organization listing. The key is ``org_id`` or ``org_id:after_author``."""
+
+
+class Task(object):
+    """
+    A leased unit of work.
+    """
+
+    def __init__(
+        self,
+        task_id: Any,
+        kind: str,
+        key: str,
+        payload: Dict[str, Any],
+        attempts: int,
+        max_attempts: int,
+        lease_token: str,
+        lease_expires: float,
+    ) -> None:
+        self.task_id = task_id
+        self.kind = kind
+        self.key = key
+        self.payload = payload
+        self.attempts = attempts
+        self.max_attempts = max_attempts
+        self.lease_token = lease_token
+        self.lease_expires = lease_expires
+
+    def __repr__(self) -> str:
+        return f"Task({self.kind!r}, {self.key!r}, attempts={self.attempts})"
+
+
+def _kind_value(kind: Union[TaskKind, str]) -> str:
+    return kind.value if isinstance(kind, TaskKind) else kind
+
+
+class WorkQueue(object):
+    """
+    Interface of a work queue with lease/ack semantics.
+
+    Backends must guarantee that a task is leased by at most one worker at a
+    time and that tasks are unique by ``(kind, key)``.
+    """
+
+    DEFAULT_VISIBILITY_TIMEOUT = 300.0
+    """Seconds a leased task stays invisible to other workers."""
+
+    DEFAULT_MAX_ATTEMPTS = 5
+    """Number of leases after which a failing task is moved to the dead state."""
+
+    def put(
+        self,
+        kind: Union[TaskKind, str],
+        key: str,
+        payload: Dict[str, Any] = None,
+        max_attempts: int = None,
+    ) -> bool:
+        """
+        Add a task to the queue.
+
+        :param kind: The kind of task.
+        :type kind: TaskKind or str
+        :param key: Unique key of the task inside its kind (e.g. the author id).
+        :type key: str
+        :param payload: Extra JSON serializable data for the worker. Defaults to None.
+        :type payload: dict, optional
+        :param max_attempts: Leases allowed before the task is dead. Defaults to DEFAULT_MAX_ATTEMPTS.
+        :type max_attempts: int, optional
+        :return: ``True`` if the task was added, ``False`` if it was already known.
+        :rtype: bool
+        """
+        raise Exception(
+            "This function must be implemented by classes that inherit from WorkQueue"
+        )
+
+    def put_many(
+        self,
+        kind: Union[TaskKind, str],
+        keys: Iterable[str],
+        max_attempts: int = None,
+    ) -> int:
+        """
+        Add several tasks of the same kind.
+
+        :return: The number of tasks actually added.
+        :rtype: int
+        """
+        return sum(1 for k in keys if self.put(kind, k, max_attempts=max_attempts))
+
+    def lease(
+        self,
+        kinds: Iterable[Union[TaskKind, str]] = None,
+        visibility_timeout: float = None,
+    ) -> Union[Task, None]:
+        """
+        Lease the next available task.
+
+        :param kinds: Only lease tasks of these kinds. Defaults to any kind.
+        :type kinds: Iterable[TaskKind], optional
+        :param visibility_timeout: Seconds until the lease expires. Defaults to DEFAULT_VISIBILITY_TIMEOUT.
+        :type visibility_timeout: float, optional
+        :return: The leased task or None if nothing is available.
+        :rtype: Task or None
+        """
+        raise Exception(
+            "This function must be implemented by classes that inherit from WorkQueue"
+        )
+
+    def ack(self, task: Task) -> bool:
+        """
+        Mark a leased task as done.
+
+        :return: ``False`` if the lease was lost (expired and taken by another worker).
+        :rtype: bool
+        """
+        raise Exception(
+            "This function must be implemented by classes that inherit from WorkQueue"
+        )
+
+    def nack(self, task: Task, error: str = "", delay: float = 0.0) -> bool:
+        """
+        Release a leased task after a failure so it can be retried.
+
+        The task becomes dead once it has been leased ``max_attempts`` times.
+
+        :param error: Reason of the failure, kept for inspection.
+        :type error: str, optional
+        :param delay: Seconds before the task is visible again. Defaults to 0.
+        :type delay: float, optional
+        :return: ``False`` if the lease was lost.
+        :rtype: bool
+        """
+        raise Exception(
+            "This function must be implemented by classes that inherit from WorkQueue"
+        )
+
+    def extend(self, task: Task, visibility_timeout: float = None) -> bool:
+        """
+        Extend the lease of a long running task.
+
+        :return: ``False`` if the lease was lost.
+        :rtype: bool
+        """
+        raise Exception(
+            "This function must be implemented by classes that inherit from WorkQueue"
+        )
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Number of tasks on each state (``pending``, ``leased``, ``done``, ``dead``).
+        """
+        raise Exception(
+            "This function must be implemented by classes that inherit from WorkQueue"
+        )
+
+
+class SQLiteWorkQueue(WorkQueue):
+    """
+    A :class:`WorkQueue` stored in a SQLite database file.
+
+    Every process (and thread) opens its own connection to the same file, so
+    workers only need to agree on the path.
+    """
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS tasks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind TEXT NOT NULL,
+            key TEXT NOT NULL,
+            payload TEXT,
+            state TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            max_attempts INTEGER NOT NULL,
+            lease_token TEXT,
+            lease_expires REAL,
+            available_at REAL NOT NULL DEFAULT 0,
+            last_error TEXT,
+            UNIQUE (kind, key)
+        );
+        CREATE INDEX IF NOT EXISTS tasks_ready ON tasks (state, available_at);
+    """
+
+    def __init__(
+        self,
+        path: str,
+        visibility_timeout: float = WorkQueue.DEFAULT_VISIBILITY_TIMEOUT,
+        max_attempts: int = WorkQueue.DEFAULT_MAX_ATTEMPTS,
+    ) -> None:
+        """
+        Initialize the SQLiteWorkQueue object.
+
+        :param path: Path of the database file. It is created if missing.
+        :type path: str
+        :param visibility_timeout: Default lease duration in seconds.
+        :type visibility_timeout: float, optional
+        :param max_attempts: Default number of leases before a task is dead.
+        :type max_attempts: int, optional
+        """
+        self.path = path
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self._local = threading.local()
+
+        self._conn().executescript(self._SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def close(self) -> None:
+        """
+        Close the connection of the calling thread.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def put(self, kind, key, payload=None, max_attempts=None) -> bool:
+        cur = self._conn().execute(
+            "INSERT OR IGNORE INTO tasks (kind, key, payload, max_attempts) VALUES (?, ?, ?, ?)",
+            (
+                _kind_value(kind),
+                key,
+                json.dumps(payload) if payload is not None else None,
+                max_attempts or self.max_attempts,
+            ),
+        )
+        return cur.rowcount == 1
+
+    def put_many(self, kind, keys, max_attempts=None) -> int:
+        conn = self._conn()
+        rows = [
+            (_kind_value(kind), k, max_attempts or self.max_attempts) for k in keys
+        ]
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO tasks (kind, key, max_attempts) VALUES (?, ?, ?)",
+                rows,
+            )
+            added = conn.total_changes - before
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return added
+
+    def lease(self, kinds=None, visibility_timeout=None) -> Union[Task, None]:
+        conn = self._conn()
+        now = time.time()
+        timeout = visibility_timeout or self.visibility_timeout
+
+        kind_filter = ""
+        args: List[Any] = [now, now]
+        if kinds is not None:
+            kinds = [_kind_value(k) for k in kinds]
+            kind_filter = f"AND kind IN ({','.join('?' * len(kinds))})"
+            args.extend(kinds)
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # leases that expired on their last attempt will never be acked
+            conn.execute(
+                "UPDATE tasks SET state = 'dead', last_error = 'lease expired' "
+                "WHERE state = 'leased' AND lease_expires <= ? AND attempts >= max_attempts",
+                (now,),
+            )
+            row = conn.execute(
+                "SELECT id, kind, key, payload, attempts, max_attempts FROM tasks "
+                "WHERE ((state = 'pending' AND available_at <= ?) "
+                "OR (state = 'leased' AND lease_expires <= ?)) "
+                f"{kind_filter} ORDER BY available_at, id LIMIT 1",
+                args,
+            ).fetchone()
+
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+
+            task_id, kind, key, payload, attempts, max_attempts = row
+            token = uuid.uuid4().hex
+            expires = now + timeout
+            conn.execute(
+                "UPDATE tasks SET state = 'leased', attempts = attempts + 1, "
+                "lease_token = ?, lease_expires = ? WHERE id = ?",
+                (token, expires, task_id),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+        return Task(
+            task_id,
+            kind,
+            key,
+            json.loads(payload) if payload else {},
+            attempts + 1,
+            max_attempts,
+            token,
+            expires,
+        )
+
+    def ack(self, task: Task) -> bool:
+        cur = self._conn().execute(
+            "UPDATE tasks SET state = 'done', lease_token = NULL, lease_expires = NULL "
+            "WHERE id = ? AND lease_token = ? AND state = 'leased'",
+            (task.task_id, task.lease_token),
+        )
+        return cur.rowcount == 1
+
+    def nack(self, task: Task, error: str = "", delay: float = 0.0) -> bool:
+        cur = self._conn().execute(
+            "UPDATE tasks SET "
+            "state = CASE WHEN attempts >= max_attempts THEN 'dead' ELSE 'pending' END, "
+            "lease_token = NULL, lease_expires = NULL, available_at = ?, last_error = ? "
+            "WHERE id = ? AND lease_token = ? AND state = 'leased'",
+            (time.time() + delay, str(error), task.task_id, task.lease_token),
+        )
+        return cur.rowcount == 1
+
+    def extend(self, task: Task, visibility_timeout: float = None) -> bool:
+        expires = time.time() + (visibility_timeout or self.visibility_timeout)
+        cur = self._conn().execute(
+            "UPDATE tasks SET lease_expires = ? "
+            "WHERE id = ? AND lease_token = ? AND state = 'leased'",
+            (expires, task.task_id, task.lease_token),
+        )
+        if cur.rowcount == 1:
+            task.lease_expires = expires
+            return True
+        return False
+
+    def stats(self) -> Dict[str, int]:
+        ret = {"pending": 0, "leased": 0, "done": 0, "dead": 0}
+        for state, count in self._conn().execute(
+            "SELECT state, COUNT(*) FROM tasks GROUP BY state"
+        ):
+            ret[state] = count
+        return ret
+
+
+class QueueWorker(object):
+    """
+    Run task handlers over the tasks leased from a :class:`WorkQueue`.
+
+    A handler receives the queue and the task. It may enqueue new tasks and must
+    return a tuple ``(success, reason)`` like the retrievers do. Failed tasks are
+    released for retry; exceptions are treated as failures.
+    """
+
+    def __init__(
+        self,
+        queue: WorkQueue,
+        handlers: Dict[Union[TaskKind, str], Callable[[WorkQueue, Task], Any]],
+        retry_delay: float = 5.0,
+    ) -> None:
+        """
+        Initialize the QueueWorker object.
+
+        :param queue: The shared queue.
+        :type queue: WorkQueue
+        :param handlers: A handler for every kind of task this worker processes.
+        :type handlers: Dict[TaskKind, Callable[[WorkQueue, Task], Tuple[bool, str]]]
+        :param retry_delay: Seconds a failed task waits before being leased again. Defaults to 5.
+        :type retry_delay: float, optional
+        """
+        self.queue = queue
+        self.handlers = {_kind_value(k): h for k, h in handlers.items()}
+        self.retry_delay = retry_delay
+
+    def run_once(self) -> bool:
+        """
+        Lease and process one task.
+
+        :return: ``False`` if there was no task available.
+        :rtype: bool
+        """
+        task = self.queue.lease(kinds=list(self.handlers))
+        if task is None:
+            return False
+
+        try:
+            success, reason = self.handlers[task.kind](self.queue, task)
+        except Exception as e:
+            success, reason = False, repr(e)
+
+        if success:
+            self.queue.ack(task)
+        else:
+            logger.info(f"Task {task} failed: {reason}")
+            self.queue.nack(task, reason, self.retry_delay * task.attempts)
+        return True
+
+    def run(self, max_tasks: int = None, idle_timeout: float = 10.0, poll: float = 0.5) -> int:
+        """
+        Process tasks until the queue stays empty for ``idle_timeout`` seconds.
+
+        :param max_tasks: Stop after this number of tasks. Defaults to no limit.
+        :type max_tasks: int, optional
+        :param idle_timeout: Seconds without available tasks before returning. Defaults to 10.
+        :type idle_timeout: float, optional
+        :param poll: Seconds between polls while the queue is empty. Defaults to 0.5.
+        :type poll: float, optional
+        :return: The number of processed tasks.
+        :rtype: int
+        """
+        done = 0
+        idle_since = None
+        while max_tasks is None or done < max_tasks:
+            if self.run_once():
+                done += 1
+                idle_since = None
+                continue
+
+            if idle_since is None:
+                idle_since = time.monotonic()
+            elif time.monotonic() - idle_since >= idle_timeout:
+                break
+            time.sleep(poll)
+
+        return done
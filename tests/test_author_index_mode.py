@@ -0,0 +1,34 @@
+"""The index published by :class:`AuthorIndexWriter` is readable by other users.
+
+Run from the repository root with ``PYTHONPATH=src python -m unittest discover tests``.
+"""
+
+import os
+import tempfile
+import unittest
+
+from scholar_retriever.author_index import AuthorIndex, AuthorIndexWriter
+
+
+@unittest.skipUnless(hasattr(os, "fchmod"), "POSIX file modes")
+class AuthorIndexModeTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "crawl.idx")
+        self.umask = os.umask(0o022)
+
+    def tearDown(self):
+        os.umask(self.umask)
+        self.dir.cleanup()
+
+    def test_mode_follows_umask(self):
+        with AuthorIndexWriter(self.path) as writer:
+            writer.add("AAAAAAAAAAAA", info={"author": {"name": "A"}})
+
+        self.assertEqual(os.stat(self.path).st_mode & 0o777, 0o644)
+        with AuthorIndex(self.path) as index:
+            self.assertEqual(index.info("AAAAAAAAAAAA"), {"author": {"name": "A"}})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+"""Clusters of :class:`ArticleDedupIndex` across the profiles of several authors.
+
+Run from the repository root with ``PYTHONPATH=src python -m unittest discover tests``.
+"""
+
+import os
+import tempfile
+import unittest
+
+from scholar_retriever.dedup_index import ArticleDedupIndex
+
+
+def article(citation_id, title, year=2020, cites_id=None):
+    return {
+        "citation_id": citation_id,
+        "title": title,
+        "year": year,
+        "cited_by": {"value": 1 if cites_id else None, "cites_id": cites_id},
+    }
+
+
+class ArticleDedupIndexTest(unittest.TestCase):
+    def test_paper_suffix_is_not_a_key(self):
+        # the <paper> part is numbered within a profile: the same suffix in two
+        # profiles is two unrelated papers
+        index = ArticleDedupIndex()
+        a = article("AAAAAAAAAAAA:u5HHmVD_uO8C", "Acoustic lenses for focused ultrasound", cites_id="111")
+        b = article("BBBBBBBBBBBB:u5HHmVD_uO8C", "Graph neural networks for traffic", cites_id="222")
+        c = article("CCCCCCCCCCCC:u5HHmVD_uO8C", "A survey of piezoelectric sensors")
+
+        self.assertEqual([index.add(x)[1] for x in (a, b, c)], [True, True, True])
+        self.assertEqual(len(index), 3)
+        self.assertEqual(list(index.iter_new([a, b, c])), [])
+
+    def test_copies_across_profiles(self):
+        index = ArticleDedupIndex()
+        first, new = index.add(article("AAAAAAAAAAAA:d1gkVwhDpl0C", "Acoustic lenses for focused ultrasound", cites_id="111"))
+        self.assertTrue(new)
+
+        # a co-author lists it with another citation_id and the same cites_id
+        cluster, new = index.add(article("BBBBBBBBBBBB:9yKSN-GCB0IC", "Acoustic lenses for focused ultrasound", cites_id="111"))
+        self.assertEqual((cluster, new), (first, False))
+
+        # without citations, the title and the year
+        cluster, new = index.add(article("CCCCCCCCCCCC:2osOgNQ5qMEC", "Acoustic Lenses for Focused Ultrasound!"))
+        self.assertEqual((cluster, new), (first, False))
+
+        # the same copy again, after its title was edited
+        cluster, new = index.add(article("AAAAAAAAAAAA:d1gkVwhDpl0C", "Acoustic lenses for HIFU", cites_id="111"))
+        self.assertEqual((cluster, new), (first, False))
+        self.assertEqual(len(index), 1)
+
+    def test_save_and_load(self):
+        index = ArticleDedupIndex(capacity=4)
+        for i in range(100):
+            index.add(article(f"AAAAAAAAAAAA:{i:012d}", f"Paper number {i} of the author", cites_id=str(i)))
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "dedup.idx")
+            index.save(path)
+            loaded = ArticleDedupIndex.load(path)
+
+        self.assertEqual(len(loaded), 100)
+        self.assertEqual(loaded.stats()["keys"], index.stats()["keys"])
+        self.assertIn(article("BBBBBBBBBBBB:000000000007", "Other", cites_id="7"), loaded)
+        self.assertNotIn(article("BBBBBBBBBBBB:000000000007", "Other title of a paper"), loaded)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+"""The fast article table extraction gives the articles of the tree parser, or falls back to it.
+
+Run from the repository root with ``PYTHONPATH=src python -m unittest discover tests``.
+The timings are in ``src/examples/benchmarks/articles_fast_extraction.py``.
+"""
+
+import os
+import re
+import unittest
+
+from scholar_retriever import fast_extract
+from scholar_retriever.author_parser import AuthorArticlesParser
+from scholar_retriever.utils import html_test_author
+
+PAGE = html_test_author.html_text
+ROWS = re.findall(r'<tr class="gsc_a_tr">.*?</tr>', PAGE, re.S)
+
+PROFILE_SEARCH_PAGE = os.path.join(os.path.dirname(html_test_author.__file__), "Profil.html")
+
+
+def parse(page, fast, typed=False):
+    parser = AuthorArticlesParser(page.encode("utf-8"), "utf-8")
+    parser.fast_extraction = fast
+    parser.typed_numbers = typed
+    return parser.parse()
+
+
+class FastExtractTest(unittest.TestCase):
+    def test_same_articles_as_the_tree_parser(self):
+        variants = {
+            "bundled page": PAGE,
+            "no citations": re.sub(
+                r'<td class="gsc_a_c">.*?</td>',
+                '<td class="gsc_a_c"><a href="javascript:void(0)" class="gsc_a_ac gs_ibl gsc_a_acm"></a></td>',
+                PAGE,
+                count=1,
+            ),
+            "no year": re.sub(r'(<td class="gsc_a_y"><span class="[^"]*">)\d+(</span>)', r"\1\2", PAGE, count=1),
+            "entities and tags": PAGE.replace(
+                'class="gsc_a_at">The ATLAS', 'class="gsc_a_at"><b>R&amp;D</b> &lt;of&gt; The ATLAS', 1
+            ),
+        }
+        for name, page in variants.items():
+            for typed in (False, True):
+                with self.subTest(name, typed_numbers=typed):
+                    rows = fast_extract.article_rows(page, typed)
+                    self.assertIsNotNone(rows)
+                    self.assertEqual(len(rows), len(ROWS))
+                    self.assertEqual(rows, parse(page, fast=False, typed=typed))
+                    self.assertEqual(parse(page, fast=True, typed=typed), rows)
+
+        years = [a["year"] for a in fast_extract.article_rows(PAGE, typed_numbers=True)]
+        self.assertTrue(all(isinstance(y, int) for y in years))
+        self.assertTrue(all(isinstance(a["year"], str) for a in fast_extract.article_rows(PAGE)))
+
+    def test_fallback_to_the_tree_parser(self):
+        variants = {
+            # text between two rows
+            "rows not adjacent": PAGE.replace(ROWS[0], ROWS[0] + "\n", 1),
+            # the pattern spans two rows: fewer matches than rows
+            "row count": PAGE.replace(ROWS[0], ROWS[0].replace('<td class="gsc_a_y">', '<td class="gsc_a_y" dir="ltr">'), 1),
+            "comment in table": PAGE.replace('</a><div class="gs_gray">', '</a><!-- x --><div class="gs_gray">', 1),
+        }
+        for name, page in variants.items():
+            with self.subTest(name):
+                self.assertIsNone(fast_extract.article_rows(page))
+                expected = parse(page, fast=False)
+                self.assertEqual(len(expected), len(ROWS))
+                self.assertEqual(parse(page, fast=True), expected)
+
+    def test_page_without_articles(self):
+        # a profile search page has no article table
+        with open(PROFILE_SEARCH_PAGE, encoding="utf-8") as f:
+            self.assertIsNone(fast_extract.article_rows(f.read()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+"""The memory of a long crawl stays flat in ``low_memory`` mode.
+
+A batch worker creates one retriever per page and keeps the last few alive. Once
+that window is full, what the crawl holds must not grow with the pages fetched:
+a ``tracemalloc`` snapshot taken after a warm-up is compared with one taken
+after the same number of retrievers again. Pages are answered in process by
+:class:`~scholar_retriever.utils.mock_server.MockTransport`.
+
+Run from the repository root with ``PYTHONPATH=src python -m unittest discover tests``.
+The long crawl is ``src/examples/benchmarks/low_memory_crawl.py``.
+"""
+
+import gc
+import tracemalloc
+import unittest
+from collections import deque
+
+from scholar_retriever import (
+    AuthorArticlesRetriever,
+    AuthorInfoRetriever,
+    CoAuthorsRetriever,
+    ProfileSearch,
+)
+from scholar_retriever.utils.mock_server import MockScholarServer, MockTransport, synthetic_author_id
+
+KINDS = (AuthorInfoRetriever, AuthorArticlesRetriever, CoAuthorsRetriever, ProfileSearch)
+WINDOW = 8
+# a multiple of len(KINDS): both snapshots are taken at the same point of the cycle
+ROUND = 12
+
+
+class LowMemoryCrawlTest(unittest.TestCase):
+    def _crawl(self, low_memory):
+        """
+        Traced memory after the warm-up round and after two more rounds, and
+        the growth between the snapshots of the first two.
+        """
+        transport = MockTransport(MockScholarServer(articles_per_author=20, search_pages=2))
+        alive = deque(maxlen=WINDOW)
+
+        def fetch_round(start):
+            for n in range(start, start + ROUND):
+                cls = KINDS[n % len(KINDS)]
+                retriever = cls() if cls is ProfileSearch else cls(synthetic_author_id(n))
+                retriever.transport = transport
+                retriever.low_memory = low_memory
+                if cls is ProfileSearch:
+                    success, reason = retriever.search_by_organization(str(n))
+                    for _ in retriever.iter_pages():
+                        pass
+                else:
+                    success, reason = retriever.fetch()
+                self.assertTrue(success, f"{cls.__name__}: {reason}")
+                alive.append(retriever)
+
+        gc.collect()
+        tracemalloc.start()
+        try:
+            fetch_round(0)
+            gc.collect()
+            warm = tracemalloc.take_snapshot()
+            warm_size = tracemalloc.get_traced_memory()[0]
+
+            fetch_round(ROUND)
+            gc.collect()
+            growth = sum(s.size_diff for s in tracemalloc.take_snapshot().compare_to(warm, "filename"))
+
+            fetch_round(2 * ROUND)
+            gc.collect()
+            last_size = tracemalloc.get_traced_memory()[0]
+        finally:
+            tracemalloc.stop()
+
+        self.assertEqual(transport.requests, 3 * ROUND * 5 // 4)
+        return warm_size, last_size, growth
+
+    def test_steady_state(self):
+        default_size, _, _ = self._crawl(False)
+        warm_size, last_size, growth = self._crawl(True)
+
+        # no leak: a few KB of interned strings and caches at most
+        self.assertLess(growth, 64 * 1024)
+        self.assertLess(last_size - warm_size, 64 * 1024)
+        # the window holds the results, not the parsed pages
+        self.assertLess(warm_size, default_size / 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
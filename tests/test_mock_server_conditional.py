@@ -0,0 +1,53 @@
+"""Conditional requests against :class:`MockScholarServer` and the validator cache.
+
+Run from the repository root with ``PYTHONPATH=src python -m unittest discover tests``.
+"""
+
+import unittest
+
+import requests
+
+from scholar_retriever import AuthorInfoRetriever
+from scholar_retriever.http_cache import ValidatorCache
+from scholar_retriever.utils.mock_server import MockScholarServer, synthetic_author_id
+
+
+class MockServerConditionalTest(unittest.TestCase):
+    def setUp(self):
+        self.server = MockScholarServer().start()
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_etag_and_not_modified(self):
+        params = {"user": synthetic_author_id(1)}
+        resp = requests.get(self.server.endpoint, params=params)
+        etag = resp.headers["ETag"]
+
+        resp = requests.get(self.server.endpoint, params=params, headers={"If-None-Match": f"W/{etag}"})
+        self.assertEqual(resp.status_code, 304)
+        self.assertEqual(resp.content, b"")
+
+        resp = requests.get(self.server.endpoint, params=params, headers={"If-None-Match": '"other"'})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.headers["ETag"], etag)
+
+    def test_retriever_revalidates(self):
+        cache = ValidatorCache()
+        results = []
+        for _ in range(2):
+            retriever = AuthorInfoRetriever(synthetic_author_id(1))
+            retriever.URL_ENDPOINT = self.server.endpoint
+            retriever.validator_cache = cache
+            success, reason = retriever.fetch()
+            self.assertTrue(success, reason)
+            results.append((retriever.not_modified, retriever.get_json()))
+
+        self.assertFalse(results[0][0])
+        self.assertTrue(results[1][0])
+        self.assertEqual(results[0][1], results[1][1])
+        self.assertEqual(self.server.stats()["author:304"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
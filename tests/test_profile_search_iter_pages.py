@@ -0,0 +1,94 @@
+"""Errors and read-ahead of :meth:`ProfileSearch.iter_pages`.
+
+Run from the repository root with ``PYTHONPATH=src python -m unittest discover tests``.
+"""
+
+import threading
+import time
+import unittest
+
+from scholar_retriever import ProfileSearch
+from scholar_retriever.http_cache import ValidatorCache
+from scholar_retriever.transport import RequestsTransport
+from scholar_retriever.utils.mock_server import MockScholarServer
+
+
+class PageFailure(Exception):
+    retryable = False
+
+
+class RecordingTransport(RequestsTransport):
+    """
+    Records the ``after_author`` of every request, failing the ones in ``fail``.
+    """
+
+    def __init__(self, fail=()):
+        self.fail = set(fail)
+        self.tokens = []
+        self._lock = threading.Lock()
+
+    def request(self, url, params, request_args, chunk_size=64 * 1024, deadline=None):
+        token = params.get("after_author")
+        with self._lock:
+            self.tokens.append(token)
+        if token in self.fail:
+            raise PageFailure(f"no page {token}")
+        return super().request(url, params, request_args, chunk_size, deadline)
+
+
+class IterPagesTest(unittest.TestCase):
+    def setUp(self):
+        self.server = MockScholarServer(search_pages=5).start()
+
+    def tearDown(self):
+        self.server.stop()
+
+    def _search(self, transport):
+        search = ProfileSearch()
+        search.URL_ENDPOINT = self.server.endpoint
+        search.transport = transport
+        success, reason = search.search_by_organization("1")
+        self.assertTrue(success, reason)
+        return search
+
+    def test_fetch_error_is_raised(self):
+        search = self._search(RecordingTransport(fail={"P00000000002"}))
+
+        pages = []
+        with self.assertRaisesRegex(Exception, "no page P00000000002"):
+            for page in search.iter_pages(prefetch=2):
+                pages.append(page)
+        self.assertEqual(len(pages), 2)
+
+    def test_prefetch_bounds_read_ahead(self):
+        for prefetch in (1, 2):
+            transport = RecordingTransport()
+            search = self._search(transport)
+
+            pages = search.iter_pages(prefetch=prefetch)
+            next(pages)
+            next(pages)
+            # the consumer holds page 2, the producer may only be ``prefetch`` pages ahead
+            time.sleep(0.5)
+            self.assertEqual(len(transport.tokens), 2 + prefetch)
+            pages.close()
+
+    def test_enriched_retrievers_get_the_search_settings(self):
+        transport = RecordingTransport()
+        search = self._search(transport)
+        search.validator_cache = ValidatorCache()
+        search.low_memory = True
+
+        # the details come from the endpoint of the search, through its transport
+        profiles = list(search.iter_enriched(max_pages=2))
+        self.assertEqual(len(profiles), 20)
+        for profile in profiles:
+            self.assertIsNotNone(profile["details"], profile.get("details_error"))
+
+        self.assertEqual(len(transport.tokens), 2 + 20)
+        # the authors and the second page of the search
+        self.assertEqual(search.validator_cache.stats()["entries"], 20 + 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
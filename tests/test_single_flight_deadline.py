@@ -0,0 +1,68 @@
+"""A shared request that runs out of the time of its leader must not fail the
+waiters that have time left.
+
+Run from the repository root with ``PYTHONPATH=src python -m unittest discover tests``.
+"""
+
+import threading
+import time
+import unittest
+
+from scholar_retriever import AuthorInfoRetriever
+from scholar_retriever.utils.concurrency import PriorityScheduler, SingleFlight
+from scholar_retriever.utils.mock_server import MockScholarServer, synthetic_author_id
+
+
+class SingleFlightDeadlineTest(unittest.TestCase):
+    def setUp(self):
+        self.server = MockScholarServer(latency=1.0).start()
+        self.scheduler = PriorityScheduler(max_concurrency=1)
+
+    def tearDown(self):
+        self.server.stop()
+
+    def _retriever(self, n, operation_timeout=None):
+        retriever = AuthorInfoRetriever(synthetic_author_id(n))
+        retriever.URL_ENDPOINT = self.server.endpoint
+        retriever.scheduler = self.scheduler
+        retriever.single_flight = self.single_flight
+        retriever.operation_timeout = operation_timeout
+        return retriever
+
+    def test_waiter_without_deadline_survives_leader_deadline(self):
+        self.single_flight = SingleFlight()
+        results = {}
+
+        def run(name, retriever):
+            start = time.monotonic()
+            results[name] = (retriever.fetch(), time.monotonic() - start)
+
+        # the blocker holds the only scheduler slot (key Z) for about 1s
+        blocker = threading.Thread(target=run, args=("Z", self._retriever(1)))
+        blocker.start()
+        time.sleep(0.1)
+
+        # the leader of key Y waits for the slot with 0.8s, the waiter joins it with no deadline
+        leader = threading.Thread(target=run, args=("leader", self._retriever(2, operation_timeout=0.8)))
+        leader.start()
+        time.sleep(0.1)
+        waiter = threading.Thread(target=run, args=("waiter", self._retriever(2)))
+        waiter.start()
+
+        for t in (blocker, leader, waiter):
+            t.join(timeout=30)
+
+        (success, reason), elapsed = results["leader"]
+        self.assertFalse(success)
+        self.assertIn("Deadline exceeded", reason)
+        self.assertLess(elapsed, 1.0)
+
+        (success, reason), _ = results["waiter"]
+        self.assertTrue(success, reason)
+        self.assertTrue(results["Z"][0][0])
+        # the waiter joined the leader, then sent the request again
+        self.assertEqual(self.single_flight.stats()["shared"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
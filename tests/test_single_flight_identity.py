@@ -0,0 +1,61 @@
+"""Identical requests in flight are only shared by the callers of the same identity.
+
+Run from the repository root with ``PYTHONPATH=src python -m unittest discover tests``.
+"""
+
+import threading
+import unittest
+
+from scholar_retriever import AuthorInfoRetriever
+from scholar_retriever.identity import IdentityManager
+from scholar_retriever.utils.concurrency import SingleFlight
+from scholar_retriever.utils.mock_server import MockScholarServer, synthetic_author_id
+
+
+class SingleFlightIdentityTest(unittest.TestCase):
+    def setUp(self):
+        self.server = MockScholarServer(latency=0.5).start()
+        self.single_flight = SingleFlight()
+
+    def tearDown(self):
+        self.server.stop()
+
+    def _fetch_together(self, manager):
+        results = []
+
+        def run():
+            retriever = AuthorInfoRetriever(synthetic_author_id(1))
+            retriever.URL_ENDPOINT = self.server.endpoint
+            retriever.single_flight = self.single_flight
+            retriever.identity_manager = manager
+            results.append(retriever.fetch())
+
+        threads = [threading.Thread(target=run) for _ in range(2)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(timeout=30)
+
+        self.assertEqual(len(results), 2)
+        for success, reason in results:
+            self.assertTrue(success, reason)
+
+    def test_different_identities_are_not_shared(self):
+        manager = IdentityManager(pool_size=2, seed=1)
+        self._fetch_together(manager)
+
+        self.assertEqual(self.single_flight.stats()["shared"], 0)
+        self.assertEqual(self.server.stats()["author:200"], 2)
+        for identity in manager.identities():
+            self.assertEqual((identity.requests, identity.successes), (1, 1))
+
+    def test_same_identity_is_shared(self):
+        manager = IdentityManager(pool_size=1, seed=1)
+        self._fetch_together(manager)
+
+        self.assertEqual(self.single_flight.stats()["shared"], 1)
+        self.assertEqual(self.server.stats()["author:200"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
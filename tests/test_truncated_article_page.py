@@ -0,0 +1,81 @@
+"""Article pages with their style sheet but not their content are not parsed as empty.
+
+Run from the repository root with ``PYTHONPATH=src python -m unittest discover tests``.
+"""
+
+import unittest
+
+from scholar_retriever.article_retriever import ArticleDetailRetriever, CitingArticlesRetriever
+from scholar_retriever.page_classifier import PageKind, classify_page
+from scholar_retriever.transport import RequestsTransport
+from scholar_retriever.utils.mock_server import MockScholarServer, synthetic_author_id
+
+# Google Scholar pages style their containers by id in the <head>
+_STYLE = b"<head><style>#gs_res_ccl{width:100%}#gsc_oci_title{font-size:20px}</style>"
+
+
+def head_only(content):
+    content = content.replace(b"<head>", _STYLE, 1)
+    return content[: content.index(b"<body")]
+
+
+def empty_body(content):
+    return head_only(content) + b"<body></body></html>"
+
+
+class HeadOnlyTransport(RequestsTransport):
+    """
+    Cuts the first answer after its ``<head>``.
+    """
+
+    def __init__(self):
+        self.requests = 0
+
+    def request(self, url, params, request_args, chunk_size=64 * 1024, deadline=None):
+        resp = super().request(url, params, request_args, chunk_size, deadline)
+        self.requests += 1
+        if self.requests == 1:
+            resp.content = head_only(resp.content)
+        return resp
+
+
+class TruncatedArticlePageTest(unittest.TestCase):
+    def setUp(self):
+        self.server = MockScholarServer().start()
+
+    def tearDown(self):
+        self.server.stop()
+
+    def _check(self, retriever, page, **fetch_args):
+        markers = retriever.PAGE_MARKERS
+        self.assertEqual(classify_page(page, None, markers), PageKind.OK)
+        self.assertEqual(classify_page(head_only(page), None, markers), PageKind.TRUNCATED)
+        self.assertEqual(classify_page(empty_body(page), None, markers), PageKind.NOT_FOUND)
+
+        transport = HeadOnlyTransport()
+        retriever.transport = transport
+        success, reason = retriever.fetch(**fetch_args)
+        self.assertTrue(success, reason)
+        self.assertEqual(transport.requests, 2)
+        return retriever.get_json()
+
+    def test_citing_articles(self):
+        retriever = CitingArticlesRetriever("1234567890")
+        retriever.URL_ENDPOINT = self.server.scholar_endpoint
+        page = self.server.synthesize("/scholar?cites=1234567890")[1]
+
+        result = self._check(retriever, page, max_results=10)
+        self.assertTrue(result["articles"])
+
+    def test_article_detail(self):
+        citation_id = f"{synthetic_author_id(1)}:u5HHmVD_uO8C"
+        retriever = ArticleDetailRetriever(citation_id)
+        retriever.URL_ENDPOINT = self.server.endpoint
+        page = self.server.synthesize(f"/citations?view_op=view_citation&citation_for_view={citation_id}")[1]
+
+        result = self._check(retriever, page)
+        self.assertTrue(result["title"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+"""Author pages cut short or missing a part are retried, not parsed.
+
+Run from the repository root with ``PYTHONPATH=src python -m unittest discover tests``.
+"""
+
+import re
+import unittest
+
+from scholar_retriever import (
+    AuthorArticlesRetriever,
+    AuthorInfoRetriever,
+    AuthorRetriever,
+    CoAuthorsRetriever,
+)
+from scholar_retriever.author_parser import AuthorArticlesParser, AuthorInfoParser, CoAuthorsParser
+from scholar_retriever.http_cache import ValidatorCache
+from scholar_retriever.page_classifier import PageError, PageKind, classify_page
+from scholar_retriever.transport import RequestsTransport
+from scholar_retriever.utils.mock_server import MockScholarServer, synthetic_author_id
+
+
+def without_table(content):
+    # the profile without its citation table
+    return re.sub(rb'<table id="gsc_rsb_st">.*?</table>', b"", content, flags=re.S)
+
+
+def head_only(content):
+    # the body cut right after <head>, style sheet and scripts included
+    return content[: content.index(b"<body")]
+
+
+class MangledTransport(RequestsTransport):
+    """
+    Applies ``mangle`` to the body of the first ``count`` answers.
+    """
+
+    def __init__(self, mangle, count=1):
+        self.mangle = mangle
+        self.count = count
+        self.requests = 0
+
+    def request(self, url, params, request_args, chunk_size=64 * 1024, deadline=None):
+        resp = super().request(url, params, request_args, chunk_size, deadline)
+        self.requests += 1
+        if self.requests <= self.count:
+            resp.content = self.mangle(resp.content)
+        return resp
+
+
+class TruncatedAuthorPageTest(unittest.TestCase):
+    def setUp(self):
+        self.server = MockScholarServer(articles_per_author=20).start()
+        self.page = self.server.synthesize(f"/citations?user={synthetic_author_id(1)}")[1]
+
+    def tearDown(self):
+        self.server.stop()
+
+    def _retriever(self, cls, transport):
+        retriever = cls(synthetic_author_id(1))
+        retriever.URL_ENDPOINT = self.server.endpoint
+        retriever.transport = transport
+        return retriever
+
+    def test_classify(self):
+        for cls in (AuthorInfoRetriever, AuthorArticlesRetriever):
+            markers, required = cls.PAGE_MARKERS, cls.PAGE_REQUIRED
+            self.assertEqual(classify_page(self.page, None, markers, required), PageKind.OK)
+            self.assertEqual(classify_page(head_only(self.page), None, markers, required), PageKind.TRUNCATED)
+
+        markers, required = AuthorInfoRetriever.PAGE_MARKERS, AuthorInfoRetriever.PAGE_REQUIRED
+        self.assertEqual(classify_page(without_table(self.page), None, markers, required), PageKind.TRUNCATED)
+        # the ids are in the scripts of the profile, not the co-author list
+        self.assertEqual(classify_page(self.page, None, CoAuthorsRetriever.PAGE_MARKERS), PageKind.NOT_FOUND)
+
+    def test_parsers_raise_page_error(self):
+        pages = [
+            (AuthorInfoParser, without_table(self.page)),
+            (AuthorArticlesParser, head_only(self.page)),
+            (CoAuthorsParser, self.page),
+        ]
+        for parser, page in pages:
+            with self.assertRaises(PageError) as cm:
+                parser(page).parse()
+            self.assertEqual(cm.exception.kind, PageKind.TRUNCATED)
+            self.assertTrue(cm.exception.retryable)
+
+    def test_retrievers_retry(self):
+        for cls, mangle in [
+            (AuthorInfoRetriever, without_table),
+            (AuthorInfoRetriever, head_only),
+            (AuthorArticlesRetriever, head_only),
+            (CoAuthorsRetriever, head_only),
+        ]:
+            transport = MangledTransport(mangle)
+            success, reason = self._retriever(cls, transport).fetch()
+            self.assertTrue(success, f"{cls.__name__}: {reason}")
+            self.assertEqual(transport.requests, 2)
+
+    def test_retrievers_fail_cleanly(self):
+        for cls in (AuthorInfoRetriever, AuthorArticlesRetriever, CoAuthorsRetriever, AuthorRetriever):
+            success, reason = self._retriever(cls, MangledTransport(head_only, count=3)).fetch()
+            self.assertFalse(success)
+            self.assertIn("truncated", reason)
+
+    def test_author_retriever_first_page_not_cached(self):
+        transport = MangledTransport(without_table)
+        retriever = self._retriever(AuthorRetriever, transport)
+        retriever.validator_cache = ValidatorCache()
+
+        success, reason = retriever.fetch()
+        self.assertTrue(success, reason)
+        self.assertEqual(transport.requests, 2)
+        self.assertIsNotNone(retriever.get_json()["cited_by"])
+
+        entry = retriever.validator_cache.get(retriever._request_key(retriever.params))
+        self.assertIn(b' id="gsc_rsb_st"', entry.body)
+
+
+if __name__ == "__main__":
+    unittest.main()
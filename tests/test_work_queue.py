@@ -0,0 +1,194 @@
+"""Leases of :class:`SQLiteWorkQueue`, and a crawl shared by several worker processes.
+
+Run from the repository root with ``PYTHONPATH=src python -m unittest discover tests``.
+"""
+
+import multiprocessing
+import os
+import tempfile
+import time
+import unittest
+from collections import Counter
+
+from scholar_retriever import AuthorInfoRetriever, ProfileSearch
+from scholar_retriever.utils.mock_server import MockScholarServer, synthetic_author_id
+from scholar_retriever.work_queue import QueueWorker, SQLiteWorkQueue, TaskKind
+
+
+def crawl_worker(path, endpoint, log, visibility_timeout=30.0, hang=False):
+    """
+    A worker process of the crawl of an organization: every author handled is
+    written to ``log`` with the attempt it took.
+    """
+
+    def handle_org_page(queue, task):
+        org_id, _, after_author = task.key.partition(":")
+        search = ProfileSearch()
+        search.URL_ENDPOINT = endpoint
+        success, reason = search.search_by_organization(org_id, after_author=after_author or None)
+        if not success:
+            return success, reason
+
+        results = search.get_json()
+        queue.put_many(TaskKind.AUTHOR, [p["author_id"] for p in results["profiles"]])
+        token = results["pagination"].get("next_page_token")
+        if token is not None:
+            queue.put(TaskKind.ORG_PAGE, f"{org_id}:{token}")
+        return True, "Success"
+
+    def handle_author(queue, task):
+        if hang:
+            # killed while holding the lease
+            time.sleep(60)
+        retriever = AuthorInfoRetriever(task.key)
+        retriever.URL_ENDPOINT = endpoint
+        success, reason = retriever.fetch()
+        if success:
+            with open(log, "a") as f:
+                f.write(f"{task.key} {task.attempts}\n")
+        return success, reason
+
+    queue = SQLiteWorkQueue(path, visibility_timeout=visibility_timeout)
+    QueueWorker(queue, {TaskKind.ORG_PAGE: handle_org_page, TaskKind.AUTHOR: handle_author}, retry_delay=0.1).run(
+        idle_timeout=2.0, poll=0.05
+    )
+
+
+class SQLiteWorkQueueTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.queue = SQLiteWorkQueue(os.path.join(self.tmp.name, "queue.sqlite"), max_attempts=2)
+
+    def tearDown(self):
+        self.queue.close()
+        self.tmp.cleanup()
+
+    def test_lease_and_ack(self):
+        self.assertTrue(self.queue.put(TaskKind.AUTHOR, "a", {"depth": 1}))
+        self.assertFalse(self.queue.put(TaskKind.AUTHOR, "a"))
+        self.assertEqual(self.queue.put_many(TaskKind.AUTHOR, ["a", "b"]), 1)
+
+        task = self.queue.lease(kinds=[TaskKind.AUTHOR])
+        self.assertEqual((task.key, task.payload, task.attempts), ("a", {"depth": 1}, 1))
+        self.assertIsNone(self.queue.lease(kinds=[TaskKind.ORG_PAGE]))
+        self.assertEqual(self.queue.lease().key, "b")
+        self.assertIsNone(self.queue.lease())
+
+        self.assertTrue(self.queue.ack(task))
+        self.assertFalse(self.queue.ack(task))
+        self.assertEqual(self.queue.stats(), {"pending": 0, "leased": 1, "done": 1, "dead": 0})
+
+    def test_nack(self):
+        self.queue.put(TaskKind.AUTHOR, "a")
+
+        task = self.queue.lease()
+        self.assertTrue(self.queue.nack(task, "failed", delay=0.2))
+        self.assertIsNone(self.queue.lease())
+        time.sleep(0.3)
+
+        task = self.queue.lease()
+        self.assertEqual(task.attempts, 2)
+        # the last attempt
+        self.assertTrue(self.queue.nack(task, "failed"))
+        self.assertIsNone(self.queue.lease())
+        self.assertEqual(self.queue.stats()["dead"], 1)
+
+    def test_expired_lease_is_redelivered(self):
+        self.queue.put(TaskKind.AUTHOR, "a")
+
+        lost = self.queue.lease(visibility_timeout=0.1)
+        time.sleep(0.2)
+        task = self.queue.lease()
+        self.assertEqual((task.key, task.attempts), ("a", 2))
+
+        # the first worker lost its lease
+        self.assertFalse(self.queue.extend(lost))
+        self.assertFalse(self.queue.ack(lost))
+        self.assertFalse(self.queue.nack(lost))
+        self.assertTrue(self.queue.ack(task))
+
+    def test_expired_last_attempt_is_dead(self):
+        self.queue.put(TaskKind.AUTHOR, "a")
+        self.queue.nack(self.queue.lease())
+
+        self.queue.lease(visibility_timeout=0.1)
+        time.sleep(0.2)
+        self.assertIsNone(self.queue.lease())
+        self.assertEqual(self.queue.stats()["dead"], 1)
+
+    def test_extend(self):
+        self.queue.put(TaskKind.AUTHOR, "a")
+
+        task = self.queue.lease(visibility_timeout=0.2)
+        self.assertTrue(self.queue.extend(task, 5.0))
+        time.sleep(0.3)
+        self.assertIsNone(self.queue.lease())
+        self.assertTrue(self.queue.ack(task))
+
+
+@unittest.skipUnless("fork" in multiprocessing.get_all_start_methods(), "needs fork")
+class QueueWorkerProcessesTest(unittest.TestCase):
+    WORKERS = 4
+
+    def setUp(self):
+        self.context = multiprocessing.get_context("fork")
+        self.server = MockScholarServer(search_pages=3).start()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "queue.sqlite")
+        self.log = os.path.join(self.tmp.name, "done.log")
+        self.queue = SQLiteWorkQueue(self.path)
+
+    def tearDown(self):
+        self.queue.close()
+        self.tmp.cleanup()
+        self.server.stop()
+
+    def _start(self, **kwargs):
+        p = self.context.Process(target=crawl_worker, args=(self.path, self.server.endpoint, self.log), kwargs=kwargs)
+        p.start()
+        return p
+
+    def _join(self, processes):
+        for p in processes:
+            p.join(timeout=60)
+            self.assertEqual(p.exitcode, 0)
+
+    def _handled(self):
+        with open(self.log) as f:
+            return [line.split() for line in f]
+
+    def test_every_task_done_once(self):
+        self.queue.put(TaskKind.ORG_PAGE, "1234")
+        self._join([self._start() for _ in range(self.WORKERS)])
+
+        handled = self._handled()
+        authors = Counter(key for key, _ in handled)
+        self.assertTrue(authors)
+        self.assertEqual(set(authors.values()), {1})
+        self.assertEqual(self.queue.stats(), {"pending": 0, "leased": 0, "done": len(authors) + 3, "dead": 0})
+
+        stats = self.server.stats()
+        self.assertEqual(stats["search:200"], 3)
+        self.assertEqual(stats["author:200"], len(authors))
+
+    def test_lease_of_killed_worker_is_redelivered(self):
+        keys = [synthetic_author_id(n) for n in range(6)]
+        self.queue.put_many(TaskKind.AUTHOR, keys)
+
+        hanging = self._start(visibility_timeout=0.5, hang=True)
+        deadline = time.monotonic() + 10
+        while self.queue.stats()["leased"] == 0 and time.monotonic() < deadline:
+            time.sleep(0.02)
+        hanging.kill()
+        hanging.join()
+
+        self._join([self._start() for _ in range(2)])
+
+        handled = self._handled()
+        self.assertEqual(sorted(key for key, _ in handled), sorted(keys))
+        self.assertEqual(sorted(int(attempts) for _, attempts in handled), [1] * 5 + [2])
+        self.assertEqual(self.queue.stats()["done"], len(keys))
+
+
+if __name__ == "__main__":
+    unittest.main()